@@ -0,0 +1,168 @@
+# blog_cli.py
+"""Headless command line access to the Bogapp log store. Never imports PySide6 or pandas.
+
+    python blog_cli.py append --start 2025/6/2 --end 2025/6/3 --task "..." [--notes "..."]
+    python blog_cli.py append --stdin < rows.csv       # 期日,任务,备注 rows, header optional
+    python blog_cli.py query [--from 2025/6/1] [--to 2025/6/30] [--contains text]
+    python blog_cli.py count [--from ...] [--to ...] [--contains text]
+    python blog_cli.py compress [--codec gzip|zstd|none]  # convert existing month partitions
+    python blog_cli.py compact [--all]                   # apply edit/delete journals to their partitions
+"""
+import argparse
+import csv
+import datetime
+import os
+import sys
+
+# The common package at the repository root is shared with word_recorder
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from blog_storage import BlogStorage, COMPACT_DEAD_SHARE, DATE_FORMAT, format_date_range, parse_date_range
+from common.compressed_io import EXTENSION_FOR_CODEC
+
+HEADERS = ["期日", "任务", "备注"]
+
+
+def _parse_date(text):
+    try:
+        return datetime.datetime.strptime(text, DATE_FORMAT).date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{text}', expected yyyy/M/d")
+
+
+def _open_storage(args):
+    storage = BlogStorage(args.data_dir, HEADERS, legacy_csv=args.legacy_csv, compression=args.compression)
+    migrated = storage.open()
+    if migrated:
+        print(f"migrated {migrated} rows from {args.legacy_csv} into {args.data_dir}/", file=sys.stderr)
+    return storage
+
+
+def _matching_rows(storage, args):
+    if args.date_from or args.date_to:
+        rows = storage.iter_rows_between(args.date_from, args.date_to)
+    else:
+        rows = storage.iter_rows()
+    if args.contains:
+        needle = args.contains.casefold()
+        rows = (row for row in rows if any(needle in field.casefold() for field in row[1:]))
+    return rows
+
+
+def cmd_append(args):
+    storage = _open_storage(args)
+    if args.stdin:
+        rows = []
+        for row_data in csv.reader(sys.stdin):
+            if row_data == HEADERS or not any(field.strip() for field in row_data):
+                continue
+            if parse_date_range(row_data[0]) is None:
+                print(f"skipping row with invalid 期日: {row_data[0]!r}", file=sys.stderr)
+                continue
+            rows.append((row_data + ["", ""])[:3])
+    else:
+        if not args.start or not args.task:
+            print("append needs --start and --task, or --stdin", file=sys.stderr)
+            return 2
+        end = args.end or args.start
+        if args.start > end:
+            print("start date is after end date", file=sys.stderr)
+            return 2
+        rows = [[format_date_range(args.start, end), args.task.strip(), (args.notes or "").strip()]]
+    appended = storage.append_rows(rows)
+    print(appended)
+    return 0
+
+
+def cmd_query(args):
+    storage = _open_storage(args)
+    writer = csv.writer(sys.stdout)
+    if not args.no_header:
+        writer.writerow(HEADERS)
+    for row_data in _matching_rows(storage, args):
+        writer.writerow(row_data)
+    return 0
+
+
+def cmd_count(args):
+    storage = _open_storage(args)
+    if not (args.date_from or args.date_to or args.contains):
+        print(storage.total_rows())  # Answered from the manifest without reading any partition
+    else:
+        print(sum(1 for _ in _matching_rows(storage, args)))
+    return 0
+
+
+def cmd_compress(args):
+    storage = _open_storage(args)
+    codec = None if args.codec == "none" else args.codec
+    before = sum(os.path.getsize(storage.partition_path(key)) for key in storage.partition_keys())
+    rewritten = storage.compress_partitions(codec)
+    after = sum(os.path.getsize(storage.partition_path(key)) for key in storage.partition_keys())
+    print(f"rewrote {rewritten} partitions, {before} -> {after} bytes")
+    return 0
+
+
+def cmd_compact(args):
+    storage = _open_storage(args)
+    compacted = 0
+    for key in storage.partition_keys():
+        if storage.journal(key).record_count and (args.all or storage.needs_compaction(key, args.threshold)):
+            removed = storage.compact_partition(key)
+            print(f"{key}: removed {removed} deleted rows", file=sys.stderr)
+            compacted += 1
+    print(f"compacted {compacted} partitions")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Bogapp 日志命令行工具")
+    parser.add_argument("--data-dir", default="blogs", help="partition directory (default: blogs)")
+    parser.add_argument("--legacy-csv", default="blogs.csv", help="legacy single-file log to migrate")
+    parser.add_argument("--compression", choices=sorted(EXTENSION_FOR_CODEC),
+                        help="format of new month partitions (default: same as the newest partition)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    append_parser = subparsers.add_parser("append", help="append log rows")
+    append_parser.add_argument("--start", type=_parse_date)
+    append_parser.add_argument("--end", type=_parse_date)
+    append_parser.add_argument("--task")
+    append_parser.add_argument("--notes")
+    append_parser.add_argument("--stdin", action="store_true", help="read 期日,任务,备注 CSV rows from stdin")
+    append_parser.set_defaults(func=cmd_append)
+
+    for name, func, help_text in (("query", cmd_query, "print matching rows as CSV"),
+                                  ("count", cmd_count, "print the number of matching rows")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--from", dest="date_from", type=_parse_date)
+        sub.add_argument("--to", dest="date_to", type=_parse_date)
+        sub.add_argument("--contains", help="case-insensitive text in 任务 or 备注")
+        if name == "query":
+            sub.add_argument("--no-header", action="store_true")
+        sub.set_defaults(func=func)
+
+    compress_parser = subparsers.add_parser("compress", help="rewrite existing partitions with another codec")
+    compress_parser.add_argument("--codec", choices=sorted(EXTENSION_FOR_CODEC) + ["none"], default="gzip")
+    compress_parser.set_defaults(func=cmd_compress)
+
+    compact_parser = subparsers.add_parser("compact", help="rewrite partitions with their edit/delete journal applied")
+    compact_parser.add_argument("--all", action="store_true", help="compact every partition that has a journal")
+    compact_parser.add_argument("--threshold", type=float, default=COMPACT_DEAD_SHARE,
+                                help=f"share of dead records that triggers compaction (default: {COMPACT_DEAD_SHARE})")
+    compact_parser.set_defaults(func=cmd_compact)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (IOError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
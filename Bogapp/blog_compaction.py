@@ -0,0 +1,35 @@
+# blog_compaction.py
+from PySide6.QtCore import QThread, Signal
+
+from blog_storage import BlogStorage
+
+
+class CompactionWorker(QThread):
+    """Compacts partitions in the background through its own BlogStorage.
+
+    A separate instance works like another process would (the files are shared under their
+    locks), so the GUI's storage is never touched from this thread; it only needs refresh() afterwards.
+    """
+    compacted = Signal(str, int)  # partition key, rows removed
+    failed = Signal(str, str)     # partition key, error message
+
+    def __init__(self, data_dir, headers, keys, parent=None):
+        super().__init__(parent)
+        self.data_dir = data_dir
+        self.headers = list(headers)
+        self.keys = list(keys)
+
+    def run(self):
+        storage = BlogStorage(self.data_dir, self.headers, legacy_csv=None)
+        try:
+            storage.open()
+        except OSError as e:
+            self.failed.emit("", str(e))
+            return
+        for key in self.keys:
+            if key not in storage.partitions:
+                continue
+            try:
+                self.compacted.emit(key, storage.compact_partition(key))
+            except Exception as e:
+                self.failed.emit(key, str(e))
@@ -0,0 +1,177 @@
+# blog_journal.py
+import bisect
+import json
+import os
+
+JOURNAL_EXTENSION = ".journal"
+
+
+class PartitionJournal:
+    """Edits and deletions of one month partition, kept as append-only JSON lines next to it.
+
+    Partition files are never edited in place; changing a row appends one small record:
+
+        {"row": 12, "old": ["2025/6/2至2025/6/3", "周报", ""], "new": ["2025/6/2至2025/6/3", "整理周报", ""]}
+        {"row": 13, "old": [...], "new": null}    # deleted
+
+    "row" counts the partition's data rows from 0 (as TableFile.iter_rows yields them) and "old" is
+    that row as stored in the partition, so a record written against another version of the file
+    (e.g. by an instance that had not seen a compaction yet) is ignored instead of changing the
+    wrong row. The newest record for a row wins. Compaction applies the journal to the partition
+    and starts it over (see BlogStorage.compact_partition).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.changes = {}  # row -> (stored row, replacement or None if deleted), newest record only
+        self.record_count = 0
+        self.loaded_bytes = 0  # Journal bytes read so far
+        self._inode = None
+
+    def _reset(self):
+        self.changes = {}
+        self.record_count = 0
+        self.loaded_bytes = 0
+        self._inode = None
+
+    def load(self):
+        """Read records appended since the last load; start over if the journal was replaced or removed."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return self
+        if stat.st_ino != self._inode or stat.st_size < self.loaded_bytes:
+            self._reset()
+            self._inode = stat.st_ino
+        if stat.st_size > self.loaded_bytes:
+            with open(self.path, "rb") as file:
+                file.seek(self.loaded_bytes)
+                data = file.read(stat.st_size - self.loaded_bytes)
+            complete = data.rfind(b"\n") + 1  # Records are appended whole, but only read complete lines
+            for line in data[:complete].splitlines():
+                try:
+                    record = json.loads(line)
+                    self.changes[int(record["row"])] = (record["old"], record["new"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # A damaged line only loses its own change
+                self.record_count += 1
+            self.loaded_bytes += complete
+        return self
+
+    def append(self, row, old, new):
+        """Record that data row `row`, stored as `old`, now reads `new` (None: deleted). Call under the partition's lock."""
+        record = {"row": row, "old": list(old), "new": None if new is None else list(new)}
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        self.load()
+
+    def apply(self, row, stored):
+        """The row as it should be shown: its replacement, None if deleted, or `stored` if unchanged."""
+        change = self.changes.get(row)
+        if change is None or change[0] != list(stored):
+            return stored
+        return change[1]
+
+    def deleted_count(self):
+        return sum(1 for _, new in self.changes.values() if new is None)
+
+    def replacements(self):
+        return [new for _, new in self.changes.values() if new is not None]
+
+    def rebase(self, applied_bytes, applied):
+        """Start the journal over after compaction rewrote the partition (call under its exclusive lock).
+
+        Records before `applied_bytes` were applied or are void. Later ones, written while the
+        compaction ran, are kept for the compacted file: `applied` maps each changed row to what was
+        written for it (None if removed), which becomes the record's "old", and rows are renumbered
+        past the removed ones.
+        """
+        removed = sorted(row for row, new in applied.items() if new is None)
+        lines = []
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as file:
+                file.seek(applied_bytes)
+                data = file.read()
+            for line in data[:data.rfind(b"\n") + 1].splitlines():
+                try:
+                    record = json.loads(line)
+                    row = int(record["row"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if row in applied:
+                    if applied[row] is None:
+                        continue  # Changed after being deleted: the deletion wins
+                    record["old"] = applied[row]
+                record["row"] = row - bisect.bisect_left(removed, row)
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        if lines:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, mode="w", encoding="utf-8", newline="") as file:
+                file.writelines(lines)
+            os.replace(tmp_path, self.path)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+        self._reset()
+        self.load()
+
+
+class JournaledRowIndex:
+    """A partition's CsvRowIndex seen through its journal: deleted rows hidden, edited rows replaced.
+
+    Has the len()/read_rows() interface of CsvRowIndex, so BlogTableModel can use either.
+    `lock` is the partition's FileLock (TableFile.lock).
+    """
+
+    def __init__(self, row_index, journal, lock):
+        self.row_index = row_index
+        self.journal = journal
+        self.lock = lock
+        self._changes = {}  # stored row -> replacement or None, only those matching the file
+        self._visible = None  # Stored row numbers shown, or None when no row is deleted
+
+    def __len__(self):
+        return len(self.row_index) if self._visible is None else len(self._visible)
+
+    def load(self):
+        import numpy as np  # Not at module level: blog_cli imports this module through blog_storage
+        # Journal rows are numbered for one version of the file; compaction replaces both under the exclusive lock
+        with self.lock.shared():
+            self.row_index.load()
+            self.journal.load()
+            self._changes = {}
+            for row in sorted(self.journal.changes):
+                if row < len(self.row_index):
+                    stored = self.row_index.read_rows(row, 1)[0]
+                    change = self.journal.apply(row, stored)
+                    if change is not stored:
+                        self._changes[row] = change
+        deleted = [row for row, change in self._changes.items() if change is None]
+        self._visible = np.delete(np.arange(len(self.row_index)), deleted) if deleted else None
+        return self
+
+    def stored_row_number(self, row):
+        return row if self._visible is None else int(self._visible[row])
+
+    def read_stored_row(self, row):
+        """(row number in the partition, row as stored in the file) for visible row `row`."""
+        number = self.stored_row_number(row)
+        return number, self.row_index.read_rows(number, 1)[0]
+
+    def read_rows(self, first, count):
+        last = min(first + count, len(self)) - 1
+        if last < first:
+            return []
+        first_stored, last_stored = self.stored_row_number(first), self.stored_row_number(last)
+        stored_rows = self.row_index.read_rows(first_stored, last_stored - first_stored + 1)
+        rows = []
+        for row in range(first, last + 1):
+            number = self.stored_row_number(row)
+            rows.append(self._changes.get(number, stored_rows[number - first_stored]))
+        return rows
@@ -0,0 +1,122 @@
+# blog_stats.py
+import datetime
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from blog_storage import DATE_RANGE_SEPARATOR, DATE_FORMAT, parse_date_range
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def _day_number(day):
+    return (day - _EPOCH).days
+
+
+def _day_from_number(number):
+    return _EPOCH + datetime.timedelta(days=int(number))
+
+
+class LogStatistics:
+    """Aggregates over the 期日 column: tasks per week/month, logged days and streaks.
+
+    The full history is aggregated once with vectorized pandas/NumPy ops (from_date_strings);
+    afterwards every submitted log is folded in with add_entry() without touching the history.
+    """
+
+    def __init__(self):
+        self.week_counts = Counter()   # (iso_year, iso_week) -> tasks starting that week
+        self.month_counts = Counter()  # (year, month) -> tasks starting that month
+        self.total_tasks = 0
+        self.unparsed_rows = 0
+        self.longest_streak = 0
+        self._days = set()  # logged days as day numbers since 1970-01-01
+
+    @classmethod
+    def from_date_strings(cls, date_strings):
+        stats = cls()
+        values = pd.Series(list(date_strings), dtype=str)
+        if values.empty:
+            return stats
+
+        parts = values.str.split(DATE_RANGE_SEPARATOR, n=1, expand=True)
+        start = pd.to_datetime(parts[0].str.strip(), format=DATE_FORMAT, errors="coerce")
+        if parts.shape[1] > 1:
+            has_end = parts[1].notna()
+            end = pd.to_datetime(parts[1].str.strip(), format=DATE_FORMAT, errors="coerce")
+        else:
+            has_end = pd.Series(False, index=values.index)
+            end = start.copy()
+
+        # Same rules as parse_date_range: an end date after the separator must parse too
+        valid = start.notna() & (end.notna() | ~has_end)
+        stats.unparsed_rows = int((~valid).sum())
+        start = start[valid]
+        end = end[valid].fillna(start)  # No separator: a one-day task
+        stats.total_tasks = int(valid.sum())
+        if not stats.total_tasks:
+            return stats
+
+        iso = start.dt.isocalendar()
+        week_keys = iso["year"].astype("int64") * 100 + iso["week"].astype("int64")
+        for key, count in week_keys.value_counts().items():
+            stats.week_counts[(int(key) // 100, int(key) % 100)] = int(count)
+        month_keys = start.dt.year.astype("int64") * 100 + start.dt.month.astype("int64")
+        for key, count in month_keys.value_counts().items():
+            stats.month_counts[(int(key) // 100, int(key) % 100)] = int(count)
+
+        # Expand every [start, end] range into its individual days without a Python loop
+        start_days = start.values.astype("datetime64[D]").astype(np.int64)
+        end_days = end.values.astype("datetime64[D]").astype(np.int64)
+        lengths = np.maximum(end_days - start_days, 0) + 1
+        range_offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        all_days = np.repeat(start_days, lengths) + (np.arange(lengths.sum()) - range_offsets)
+        days = np.unique(all_days)
+
+        breaks = np.flatnonzero(np.diff(days) != 1)
+        run_lengths = np.diff(np.concatenate(([-1], breaks, [len(days) - 1])))
+        stats.longest_streak = int(run_lengths.max())
+        stats._days = set(days.tolist())
+        return stats
+
+    def add_entry(self, date_str):
+        """Fold one newly written log into the aggregates. Returns False if the date is malformed."""
+        parsed = parse_date_range(date_str)
+        if parsed is None:
+            self.unparsed_rows += 1
+            return False
+        start, end = parsed
+
+        self.total_tasks += 1
+        iso_year, iso_week, _ = start.isocalendar()
+        self.week_counts[(iso_year, iso_week)] += 1
+        self.month_counts[(start.year, start.month)] += 1
+
+        first, last = _day_number(start), _day_number(end)
+        self._days.update(range(first, last + 1))
+        # Adding days can only merge runs, so the longest streak is at least the run around the new range
+        while first - 1 in self._days:
+            first -= 1
+        while last + 1 in self._days:
+            last += 1
+        self.longest_streak = max(self.longest_streak, last - first + 1)
+        return True
+
+    @property
+    def logged_days(self):
+        return len(self._days)
+
+    def current_streak(self, today=None):
+        """Consecutive logged days ending today (or yesterday, if today is not logged yet)."""
+        day = _day_number(today or datetime.date.today())
+        if day not in self._days:
+            day -= 1
+        streak = 0
+        while day in self._days:
+            streak += 1
+            day -= 1
+        return streak
+
+    def last_logged_day(self):
+        return _day_from_number(max(self._days)) if self._days else None
@@ -0,0 +1,405 @@
+# blog_storage.py
+import datetime
+import itertools
+import json
+import os
+
+from blog_journal import JOURNAL_EXTENSION, PartitionJournal
+from common.compressed_io import EXTENSION_FOR_CODEC, strip_codec_extension
+from common.file_lock import FileLock
+from common.table_store import CHANGE_APPENDED, Column, TableConflictError, TableFile, TableSchema
+
+DATE_RANGE_SEPARATOR = "至"
+DATE_FORMAT = "%Y/%m/%d"
+UNDATED_PARTITION = "undated"  # Rows whose 期日 cannot be parsed; sorted before every month
+PARTITION_EXTENSION = ".csv"  # Optionally followed by .gz / .zst for compressed partitions
+COMPACT_DEAD_SHARE = 0.2  # Compact a partition once this share of its records is dead (deleted or superseded)
+
+
+def parse_date_range(date_str):
+    """Parse a "yyyy/M/d至yyyy/M/d" cell into (start, end) dates, or None if malformed."""
+    parts = str(date_str).split(DATE_RANGE_SEPARATOR, 1)
+    try:
+        start = datetime.datetime.strptime(parts[0].strip(), DATE_FORMAT).date()
+        end = datetime.datetime.strptime(parts[1].strip(), DATE_FORMAT).date() if len(parts) > 1 else start
+    except ValueError:
+        return None
+    return start, max(start, end)
+
+
+def format_date_range(start, end):
+    """Format dates the way the input form does, e.g. "2025/6/2至2025/6/3"."""
+    return f"{start.year}/{start.month}/{start.day}{DATE_RANGE_SEPARATOR}{end.year}/{end.month}/{end.day}"
+
+
+def partition_key_for(date_str):
+    parsed = parse_date_range(date_str)
+    if parsed is None:
+        return UNDATED_PARTITION
+    return f"{parsed[0].year:04d}-{parsed[0].month:02d}"
+
+
+class BlogStorage:
+    """Log rows stored as one CSV per month (by start date) plus a manifest.json.
+
+    The manifest records, per partition, its file name, row count, byte size and date
+    bounds, so callers can pick the partitions a view needs without opening the others.
+
+    Partitions may be gzip/zstd compressed ("2025-06.csv.gz"); appends add a new compressed
+    frame instead of rewriting the month. New partitions use `compression` ("gzip", "zstd"),
+    or, when it is None, the format of the newest existing partition.
+
+    Several instances (the GUI, blog_cli.py) may append at the same time: rows are appended as
+    whole records without waiting on each other, and the manifest is merged under a lock.
+    Row counts of partitions another instance wrote to are recounted.
+
+    Rows are edited and deleted through a per-partition journal ("2025-06.journal", see
+    PartitionJournal) that every read applies; the manifest's "rows" counts rows as stored.
+    compact_partition() rewrites a partition with its journal applied once enough of it is dead.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    MANIFEST_VERSION = 1
+
+    def __init__(self, data_dir="blogs", headers=("期日", "任务", "备注"), legacy_csv="blogs.csv",
+                 compression=None):
+        if compression is not None and compression not in EXTENSION_FOR_CODEC:
+            raise ValueError(f"unsupported compression: {compression}")
+        self.data_dir = data_dir
+        self.compression = compression
+        self.headers = list(headers)
+        # 期日 parses to a (start, end) date range; rows of other widths are kept as they are
+        self.schema = TableSchema([Column(self.headers[0], parse_date_range)] +
+                                  [Column(name) for name in self.headers[1:]], strict_width=False)
+        self.legacy_csv = legacy_csv
+        self.manifest_path = os.path.join(self.data_dir, self.MANIFEST_NAME)
+        self.partitions = {}  # key -> {"file", "rows", "bytes", "min_date", "max_date"}
+        self._journals = {}  # key -> PartitionJournal
+
+    # --- Setup / Migration ---
+    def open(self):
+        """Create the data directory, load (or repair) the manifest and migrate a legacy blogs.csv.
+
+        Returns the number of rows migrated from the legacy single-file log (0 if none).
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        self._load_manifest()
+        self._refresh_stale_partitions()
+        migrated = 0
+        if self.legacy_csv and os.path.exists(self.legacy_csv):
+            migrated = self._migrate_legacy()
+        return migrated
+
+    def refresh(self):
+        """Reload the manifest, e.g. after another instance compacted or created partitions."""
+        self._load_manifest()
+        self._refresh_stale_partitions()
+
+    def _migrate_legacy(self):
+        migrated = 0
+        # Chunked so a large legacy file is never held in memory at once
+        for chunk in TableFile(self.legacy_csv, self.schema).iter_chunks():
+            grouped = {}
+            for row_data in chunk:
+                grouped.setdefault(partition_key_for(row_data[0]), []).append(row_data)
+            for key, rows in grouped.items():
+                self._append_rows_to_partition(key, rows)
+            migrated += len(chunk)
+        self._save_manifest()
+        # Keep the original next to the partitions instead of deleting user data
+        os.replace(self.legacy_csv, os.path.join(self.data_dir, os.path.basename(self.legacy_csv) + ".migrated"))
+        return migrated
+
+    # --- Manifest ---
+    def _load_manifest(self):
+        self.partitions = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, mode='r', encoding='utf-8') as file:
+                    manifest = json.load(file)
+                if manifest.get("version") == self.MANIFEST_VERSION:
+                    self.partitions = manifest.get("partitions", {})
+            except (OSError, ValueError):
+                self.partitions = {}
+        # Pick up partition files the manifest does not know about (e.g. lost manifest)
+        for file_name in os.listdir(self.data_dir):
+            key, ext = os.path.splitext(strip_codec_extension(file_name))
+            if ext == PARTITION_EXTENSION and key not in self.partitions:
+                self.partitions[key] = {"file": file_name, "rows": 0, "bytes": -1,
+                                        "min_date": None, "max_date": None}
+
+    def _save_manifest(self):
+        with FileLock(self.manifest_path).exclusive():
+            self._merge_saved_partitions()
+            tmp_path = self.manifest_path + ".tmp"
+            with open(tmp_path, mode='w', encoding='utf-8') as file:
+                json.dump({"version": self.MANIFEST_VERSION, "partitions": self.partitions},
+                          file, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+
+    def _merge_saved_partitions(self):
+        """Keep partitions another instance created since this one loaded the manifest."""
+        try:
+            with open(self.manifest_path, mode='r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") != self.MANIFEST_VERSION:
+            return
+        for key, info in manifest.get("partitions", {}).items():
+            if key not in self.partitions and os.path.exists(os.path.join(self.data_dir, info["file"])):
+                self.partitions[key] = info
+
+    def _refresh_stale_partitions(self):
+        """Recount partitions whose size on disk no longer matches the manifest."""
+        changed = False
+        for key, info in list(self.partitions.items()):
+            path = os.path.join(self.data_dir, info["file"])
+            if not os.path.exists(path):
+                del self.partitions[key]
+                changed = True
+            elif os.path.getsize(path) != info.get("bytes"):
+                self._rescan_partition(key)
+                changed = True
+        if changed:
+            self._save_manifest()
+
+    def _rescan_partition(self, key):
+        info = self.partitions[key]
+        info.update(rows=0, min_date=None, max_date=None)
+        for typed_row in self.table(key).iter_rows(typed=True):
+            self._track_row(info, typed_row[0])
+        for row_data in self.journal(key).replacements():  # Edited dates may lie outside the stored ones
+            self._widen_dates(info, parse_date_range(row_data[0]) if row_data else None)
+        info["bytes"] = os.path.getsize(self.partition_path(key))
+
+    @classmethod
+    def _track_row(cls, info, parsed):
+        """Count a row and widen the partition's date bounds by its parsed 期日 (None if unparsed)."""
+        info["rows"] += 1
+        cls._widen_dates(info, parsed)
+
+    @staticmethod
+    def _widen_dates(info, parsed):
+        if parsed is None:
+            return
+        start, end = parsed[0].isoformat(), parsed[1].isoformat()
+        if info["min_date"] is None or start < info["min_date"]:
+            info["min_date"] = start
+        if info["max_date"] is None or end > info["max_date"]:
+            info["max_date"] = end
+
+    # --- Writing ---
+    def append_row(self, row_data):
+        key = partition_key_for(row_data[0])
+        self._append_rows_to_partition(key, [row_data])
+        self._save_manifest()
+        return key
+
+    def append_rows(self, rows):
+        """Bulk append: one open per touched partition and a single manifest write."""
+        grouped = {}
+        for row_data in rows:
+            grouped.setdefault(partition_key_for(row_data[0]), []).append(row_data)
+        for key, partition_rows in grouped.items():
+            self._append_rows_to_partition(key, partition_rows)
+        if grouped:
+            self._save_manifest()
+        return sum(len(partition_rows) for partition_rows in grouped.values())
+
+    def _new_partition_file(self, key):
+        compression = self.compression
+        if compression is None and self.partitions:
+            newest = self.partitions[self.partition_keys()[-1]]["file"]
+            compression = self.table_for_file(newest).codec
+        return key + PARTITION_EXTENSION + EXTENSION_FOR_CODEC.get(compression, "")
+
+    def _append_rows_to_partition(self, key, rows):
+        if key not in self.partitions:
+            self.partitions[key] = {"file": self._new_partition_file(key), "rows": 0, "bytes": 0,
+                                    "min_date": None, "max_date": None}
+        info = self.partitions[key]
+        table = self.table(key)
+        stamp = table.stamp()
+        table.append_rows(rows)
+        if (stamp.size if stamp else 0) != info["bytes"]:
+            self._rescan_partition(key)  # Another instance wrote to this partition too
+            return
+        for row_data in rows:
+            self._track_row(info, parse_date_range(row_data[0]) if row_data else None)
+        info["bytes"] = os.path.getsize(self.partition_path(key))
+
+    def compress_partitions(self, compression):
+        """Rewrite every partition not already stored with `compression` (None for plain CSV).
+
+        Each partition is written and recorded in the manifest before the old file is removed,
+        so an interrupted run leaves every row readable. Rows are copied as stored, so journals
+        stay valid. Returns the number of partitions rewritten.
+        """
+        rewritten = 0
+        for key in self.partition_keys():
+            info = self.partitions[key]
+            old_table = self.table(key)
+            if old_table.codec == compression:
+                continue
+            new_file = key + PARTITION_EXTENSION + EXTENSION_FOR_CODEC.get(compression, "")
+            new_table = self.table_for_file(new_file)
+            if new_file != info["file"] and new_table.exists():
+                os.remove(new_table.file_path)  # Left over from an interrupted run
+            # A headerless partition gains the standard header; its rows stay the same
+            stamp = old_table.stamp()
+            new_table.rewrite_rows(old_table.iter_rows(stop=stamp.size))
+            with old_table.lock.exclusive():  # Rows appended meanwhile move over before the old file goes
+                if old_table.changes_since(stamp) == CHANGE_APPENDED:
+                    new_table.append_rows(old_table.iter_rows(start=stamp.size))
+                old_file, info["file"] = info["file"], new_file
+                info["bytes"] = os.path.getsize(new_table.file_path)
+                self._save_manifest()
+                if old_file != new_file:
+                    os.remove(old_table.file_path)
+            rewritten += 1
+        return rewritten
+
+    # --- Editing ---
+    def journal_path(self, key):
+        return os.path.join(self.data_dir, key + JOURNAL_EXTENSION)
+
+    def journal(self, key):
+        """The partition's journal, brought up to date (only records appended since the last call are read)."""
+        journal = self._journals.get(key)
+        if journal is None:
+            journal = self._journals[key] = PartitionJournal(self.journal_path(key))
+        return journal.load()
+
+    def _check_stored_row(self, key, row, stored_row):
+        """Raise TableConflictError unless data row `row` of the partition still reads `stored_row`."""
+        current = next(itertools.islice(self.table(key).iter_rows(), row, None), None)
+        if current != list(stored_row):
+            raise TableConflictError(f"partition {key} changed since it was read (compacted by another instance?)")
+
+    def replace_row(self, key, row, stored_row, new_row):
+        """Replace data row `row` of a partition, stored as `stored_row`. Returns the key the row ends up in.
+
+        A new 期日 in another month moves the row: it is appended to that partition (before the
+        deletion here, so an interruption duplicates the row rather than losing it).
+        """
+        new_key = partition_key_for(new_row[0])
+        table = self.table(key)
+        with table.lock.shared():  # Compaction renumbers rows under the exclusive lock
+            self._check_stored_row(key, row, stored_row)
+            if new_key != key:
+                self._append_rows_to_partition(new_key, [new_row])
+                self.journal(key).append(row, stored_row, None)
+            else:
+                self.journal(key).append(row, stored_row, new_row)
+                self._widen_dates(self.partitions[key], parse_date_range(new_row[0]))
+        self._save_manifest()
+        return new_key
+
+    def delete_row(self, key, row, stored_row):
+        with self.table(key).lock.shared():
+            self._check_stored_row(key, row, stored_row)
+            self.journal(key).append(row, stored_row, None)
+
+    def dead_share(self, key):
+        """Share of the partition's records that are dead: deleted rows and superseded versions."""
+        records = self.journal(key).record_count
+        return records / (self.partitions[key]["rows"] + records) if records else 0.0
+
+    def needs_compaction(self, key, threshold=COMPACT_DEAD_SHARE):
+        return key in self.partitions and self.dead_share(key) >= threshold
+
+    def compact_partition(self, key):
+        """Rewrite a partition with its journal applied and start the journal over. Returns the rows removed.
+
+        The partition is replaced atomically; rows appended meanwhile are carried over, and journal
+        records written meanwhile are renumbered for the new file under the same lock (see
+        PartitionJournal.rebase). Raises TableConflictError if another instance compacted it first.
+        """
+        table = self.table(key)
+        journal = self.journal(key)
+        stamp = table.stamp()
+        applied_bytes = journal.loaded_bytes
+        applied = {}  # row -> what was written for it (None if removed)
+
+        def live_rows():
+            for row, stored in enumerate(table.iter_rows(stop=stamp.size)):
+                shown = journal.apply(row, stored)
+                if shown is not stored:
+                    applied[row] = shown
+                if shown is not None:
+                    yield shown
+
+        table.rewrite_rows(live_rows(), expected=stamp, on_replaced=lambda: journal.rebase(applied_bytes, applied))
+        self._rescan_partition(key)
+        self._save_manifest()
+        return sum(1 for shown in applied.values() if shown is None)
+
+    # --- Reading ---
+    def partition_path(self, key):
+        return os.path.join(self.data_dir, self.partitions[key]["file"])
+
+    def table(self, key):
+        return TableFile(self.partition_path(key), self.schema)
+
+    def table_for_file(self, file_name):
+        return TableFile(os.path.join(self.data_dir, file_name), self.schema)
+
+    def row_index_cache_path(self, key):
+        return os.path.join(self.data_dir, ".rowindex", f"{key}.npz")
+
+    def partition_keys(self):
+        """All partition keys, oldest first (undated rows sort before every month)."""
+        return sorted(self.partitions, key=lambda key: (key != UNDATED_PARTITION, key))
+
+    def partition_row_count(self, key):
+        return self.partitions[key]["rows"] - self.journal(key).deleted_count()
+
+    def total_rows(self):
+        return sum(self.partition_row_count(key) for key in self.partitions)
+
+    def keys_between(self, start_date=None, end_date=None):
+        """Partition keys whose date bounds overlap [start_date, end_date] (ISO date strings)."""
+        keys = []
+        for key in self.partition_keys():
+            info = self.partitions[key]
+            if info["min_date"] is None:
+                continue
+            if end_date is not None and info["min_date"] > end_date:
+                continue
+            if start_date is not None and info["max_date"] < start_date:
+                continue
+            keys.append(key)
+        return keys
+
+    def read_partition(self, key):
+        # A headerless partition (e.g. written by another tool) keeps its first row as data
+        table = self.table(key)
+        with table.lock.shared():  # The journal must match the file read (compaction replaces both)
+            journal = self.journal(key)
+            rows = table.iter_rows()
+            if not journal.changes:
+                return list(rows)
+            shown_rows = []
+            for row, stored in enumerate(rows):
+                shown = journal.apply(row, stored)
+                if shown is not None:
+                    shown_rows.append(shown)
+        return shown_rows
+
+    def iter_rows(self, keys=None):
+        for key in (self.partition_keys() if keys is None else keys):
+            yield from self.read_partition(key)
+
+    def iter_rows_between(self, start_date=None, end_date=None):
+        """Rows whose date range overlaps [start_date, end_date] (datetime.date), reading only matching partitions."""
+        keys = self.keys_between(start_date and start_date.isoformat(), end_date and end_date.isoformat())
+        for row_data in self.iter_rows(keys):
+            parsed = parse_date_range(row_data[0])
+            if parsed is None:
+                continue
+            if start_date is not None and parsed[1] < start_date:
+                continue
+            if end_date is not None and parsed[0] > end_date:
+                continue
+            yield row_data
@@ -0,0 +1,110 @@
+# blog_table_model.py
+import bisect
+from collections import OrderedDict
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+ROW_CACHE_SIZE = 2000  # Parsed rows kept in memory
+READ_AHEAD_ROWS = 64   # Rows parsed after a cache miss (a few are read behind it as well)
+READ_BEHIND_ROWS = 16
+
+
+class BlogTableModel(QAbstractTableModel):
+    """Virtual table over one row index (CsvRowIndex or JournaledRowIndex) per loaded partition, oldest first.
+
+    Only rows the view asks for are parsed, a read-ahead window at a time, and kept in a
+    bounded LRU cache keyed by (partition, row) so prepending older partitions keeps it valid.
+    """
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self._segments = []        # [(partition_key, CsvRowIndex)]
+        self._segment_starts = []  # First global row of each segment
+        self._row_count = 0
+        self._row_cache = OrderedDict()
+
+    # --- Segments ---
+    def set_segments(self, segments):
+        self.beginResetModel()
+        self._segments = list(segments)
+        self._row_cache.clear()
+        self._rebuild_offsets()
+        self.endResetModel()
+
+    def prepend_segment(self, key, row_index):
+        if not len(row_index):
+            self._segments.insert(0, (key, row_index))
+            self._rebuild_offsets()
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(row_index) - 1)
+        self._segments.insert(0, (key, row_index))
+        self._rebuild_offsets()
+        self.endInsertRows()
+
+    def refresh_segment(self, key):
+        """Reload a segment after its rows were edited, deleted or compacted."""
+        self.beginResetModel()
+        for segment_key, row_index in self._segments:
+            if segment_key == key:
+                row_index.load()
+        for cache_key in [cache_key for cache_key in self._row_cache if cache_key[0] == key]:
+            del self._row_cache[cache_key]
+        self._rebuild_offsets()
+        self.endResetModel()
+
+    def segment_keys(self):
+        return [key for key, _ in self._segments]
+
+    def _rebuild_offsets(self):
+        self._segment_starts = []
+        total = 0
+        for _, row_index in self._segments:
+            self._segment_starts.append(total)
+            total += len(row_index)
+        self._row_count = total
+
+    def _locate(self, row):
+        segment = bisect.bisect_right(self._segment_starts, row) - 1
+        return segment, row - self._segment_starts[segment]
+
+    def segment_row(self, row):
+        """(partition key, its row index, row within the partition's segment) for a table row."""
+        segment, local_row = self._locate(row)
+        key, row_index = self._segments[segment]
+        return key, row_index, local_row
+
+    def row_data(self, row):
+        segment, local_row = self._locate(row)
+        key, row_index = self._segments[segment]
+        cache_key = (key, local_row)
+        cached = self._row_cache.get(cache_key)
+        if cached is not None:
+            self._row_cache.move_to_end(cache_key)
+            return cached
+
+        first = max(local_row - READ_BEHIND_ROWS, 0)
+        for offset, row_data in enumerate(row_index.read_rows(first, READ_BEHIND_ROWS + READ_AHEAD_ROWS)):
+            self._row_cache[(key, first + offset)] = row_data
+            self._row_cache.move_to_end((key, first + offset))
+        while len(self._row_cache) > ROW_CACHE_SIZE:
+            self._row_cache.popitem(last=False)
+        return self._row_cache.get(cache_key, [])
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        row_data = self.row_data(index.row())
+        return row_data[index.column()] if index.column() < len(row_data) else ""
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return None
@@ -1,129 +1,317 @@
-# blog_widgets.py
-from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QDateEdit, QTextEdit,
-    QPushButton, QFormLayout, QSizePolicy, QTableWidget, QTableWidgetItem,
-    QHeaderView
-)
-from PySide6.QtCore import QDate, Qt
-
-
-# from PySide6.QtGui import QFontMetrics # Not strictly needed if using a good fixed width
-
-class InputFormWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self._setup_ui()
-
-    def _setup_ui(self):
-        main_v_layout = QVBoxLayout(self)
-        main_v_layout.setContentsMargins(15, 15, 15, 15)
-        main_v_layout.setSpacing(15)
-
-        # --- Date QHBoxLayout ---
-        date_h_layout = QHBoxLayout()
-        date_h_layout.setSpacing(10)
-
-        start_date_label = QLabel("起始日期*:")
-        self.start_date_edit = QDateEdit(calendarPopup=True)
-        self.start_date_edit.setDate(QDate(2025, 6, 2))
-        self.start_date_edit.setDisplayFormat("yyyy/M/d")
-        # Set a fixed width to ensure enough space for text and make components same size
-        self.start_date_edit.setFixedWidth(135)  # Adjusted width
-
-        end_date_label = QLabel("结束日期*:")
-        self.end_date_edit = QDateEdit(calendarPopup=True)
-        self.end_date_edit.setDate(QDate(2025, 6, 3))  # Default end date
-        self.end_date_edit.setDisplayFormat("yyyy/M/d")
-        # Set a fixed width to ensure enough space for text and make components same size
-        self.end_date_edit.setFixedWidth(135)  # Adjusted width
-
-        date_h_layout.addWidget(start_date_label)
-        date_h_layout.addWidget(self.start_date_edit)
-        date_h_layout.addSpacing(25)
-        date_h_layout.addWidget(end_date_label)
-        date_h_layout.addWidget(self.end_date_edit)
-        date_h_layout.addStretch(1)  # Keeps date components aligned to the left
-        main_v_layout.addLayout(date_h_layout)
-
-        # --- Task/Notes QFormLayout ---
-        task_notes_form_layout = QFormLayout()
-        task_notes_form_layout.setSpacing(10)
-        task_notes_form_layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapAllRows)
-
-        self.task_edit = QTextEdit()
-        self.task_edit.setPlaceholderText("请输入详细的任务内容 (必填)")
-        self.task_edit.setMinimumHeight(120)
-        self.task_edit.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        task_notes_form_layout.addRow("任务*:", self.task_edit)
-
-        self.notes_edit = QTextEdit()
-        self.notes_edit.setPlaceholderText("请输入备注信息 (可选)")
-        self.notes_edit.setMinimumHeight(80)
-        self.notes_edit.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        task_notes_form_layout.addRow("备注:", self.notes_edit)
-        main_v_layout.addLayout(task_notes_form_layout)
-
-        # --- Submit Button ---
-        self.submit_button = QPushButton("提交日志")
-        self.submit_button.setStyleSheet("padding: 10px; font-size: 16px; margin-top: 10px;")
-        self.submit_button.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-
-        button_h_layout = QHBoxLayout()
-        button_h_layout.addStretch()
-        button_h_layout.addWidget(self.submit_button)
-        button_h_layout.addStretch()
-        main_v_layout.addLayout(button_h_layout)
-
-        main_v_layout.setStretchFactor(date_h_layout, 0)
-        main_v_layout.setStretchFactor(task_notes_form_layout, 1)
-        main_v_layout.setStretchFactor(button_h_layout, 0)
-
-    def get_form_data(self):
-        return {
-            "start_date": self.start_date_edit.date(),
-            "end_date": self.end_date_edit.date(),
-            "task": self.task_edit.toPlainText().strip(),
-            "notes": self.notes_edit.toPlainText().strip()
-        }
-
-    def clear_fields(self):
-        # self.start_date_edit.setDate(QDate(2025, 6, 2)) # Optionally reset dates
-        # self.end_date_edit.setDate(QDate(2025, 6, 3))
-        self.task_edit.clear()
-        self.notes_edit.clear()
-
-
-class TableViewWidget(QWidget):
-    def __init__(self, headers, parent=None):
-        super().__init__(parent)
-        self.headers = headers
-        self._setup_ui()
-
-    def _setup_ui(self):
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(10, 10, 10, 10)
-        self.table_widget = QTableWidget()
-        self.table_widget.setColumnCount(len(self.headers))
-        self.table_widget.setHorizontalHeaderLabels(self.headers)
-        self.table_widget.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table_widget.setAlternatingRowColors(True)
-        self.table_widget.verticalHeader().setVisible(False)
-        self.table_widget.setShowGrid(True)
-        self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        layout.addWidget(self.table_widget)
-
-    def load_data_rows(self, data_rows):
-        self.table_widget.setRowCount(0)
-        for row_idx, row_data in enumerate(data_rows):
-            self.table_widget.insertRow(row_idx)
-            for col_idx, cell_data in enumerate(row_data):
-                self.table_widget.setItem(row_idx, col_idx, QTableWidgetItem(str(cell_data)))
-
-        self.table_widget.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        self.table_widget.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.table_widget.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)
-
-    def set_headers(self, headers):
-        self.headers = headers
-        self.table_widget.setColumnCount(len(self.headers))
-        self.table_widget.setHorizontalHeaderLabels(self.headers)
\ No newline at end of file
+# blog_widgets.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QDateEdit, QTextEdit,
+    QPushButton, QFormLayout, QSizePolicy, QTableWidget, QTableWidgetItem,
+    QHeaderView, QComboBox, QTableView, QAbstractItemView, QDialog, QDialogButtonBox, QMenu
+)
+from PySide6.QtCore import QDate, Qt, Signal, Slot
+
+from blog_table_model import BlogTableModel
+from common.text_delegate import CachedTextDelegate
+
+
+# from PySide6.QtGui import QFontMetrics # Not strictly needed if using a good fixed width
+
+class InputFormWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._setup_ui()
+
+    def _setup_ui(self):
+        main_v_layout = QVBoxLayout(self)
+        main_v_layout.setContentsMargins(15, 15, 15, 15)
+        main_v_layout.setSpacing(15)
+
+        # --- Date QHBoxLayout ---
+        date_h_layout = QHBoxLayout()
+        date_h_layout.setSpacing(10)
+
+        start_date_label = QLabel("起始日期*:")
+        self.start_date_edit = QDateEdit(calendarPopup=True)
+        self.start_date_edit.setDate(QDate(2025, 6, 2))
+        self.start_date_edit.setDisplayFormat("yyyy/M/d")
+        # Set a fixed width to ensure enough space for text and make components same size
+        self.start_date_edit.setFixedWidth(135)  # Adjusted width
+
+        end_date_label = QLabel("结束日期*:")
+        self.end_date_edit = QDateEdit(calendarPopup=True)
+        self.end_date_edit.setDate(QDate(2025, 6, 3))  # Default end date
+        self.end_date_edit.setDisplayFormat("yyyy/M/d")
+        # Set a fixed width to ensure enough space for text and make components same size
+        self.end_date_edit.setFixedWidth(135)  # Adjusted width
+
+        date_h_layout.addWidget(start_date_label)
+        date_h_layout.addWidget(self.start_date_edit)
+        date_h_layout.addSpacing(25)
+        date_h_layout.addWidget(end_date_label)
+        date_h_layout.addWidget(self.end_date_edit)
+        date_h_layout.addStretch(1)  # Keeps date components aligned to the left
+        main_v_layout.addLayout(date_h_layout)
+
+        # --- Task/Notes QFormLayout ---
+        task_notes_form_layout = QFormLayout()
+        task_notes_form_layout.setSpacing(10)
+        task_notes_form_layout.setRowWrapPolicy(QFormLayout.RowWrapPolicy.WrapAllRows)
+
+        self.task_edit = QTextEdit()
+        self.task_edit.setPlaceholderText("请输入详细的任务内容 (必填)")
+        self.task_edit.setMinimumHeight(120)
+        self.task_edit.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        task_notes_form_layout.addRow("任务*:", self.task_edit)
+
+        self.notes_edit = QTextEdit()
+        self.notes_edit.setPlaceholderText("请输入备注信息 (可选)")
+        self.notes_edit.setMinimumHeight(80)
+        self.notes_edit.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        task_notes_form_layout.addRow("备注:", self.notes_edit)
+        main_v_layout.addLayout(task_notes_form_layout)
+
+        # --- Submit Button ---
+        self.submit_button = QPushButton("提交日志")
+        self.submit_button.setStyleSheet("padding: 10px; font-size: 16px; margin-top: 10px;")
+        self.submit_button.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+
+        button_h_layout = QHBoxLayout()
+        button_h_layout.addStretch()
+        button_h_layout.addWidget(self.submit_button)
+        button_h_layout.addStretch()
+        main_v_layout.addLayout(button_h_layout)
+
+        main_v_layout.setStretchFactor(date_h_layout, 0)
+        main_v_layout.setStretchFactor(task_notes_form_layout, 1)
+        main_v_layout.setStretchFactor(button_h_layout, 0)
+
+    def get_form_data(self):
+        return {
+            "start_date": self.start_date_edit.date(),
+            "end_date": self.end_date_edit.date(),
+            "task": self.task_edit.toPlainText().strip(),
+            "notes": self.notes_edit.toPlainText().strip()
+        }
+
+    def clear_fields(self):
+        # self.start_date_edit.setDate(QDate(2025, 6, 2)) # Optionally reset dates
+        # self.end_date_edit.setDate(QDate(2025, 6, 3))
+        self.task_edit.clear()
+        self.notes_edit.clear()
+
+
+class LogEditDialog(QDialog):
+    """The input form in a dialog, filled with an existing log row."""
+
+    def __init__(self, date_range, task, notes, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("编辑日志")
+        self.resize(600, 420)
+        layout = QVBoxLayout(self)
+        self.form = InputFormWidget()
+        self.form.submit_button.hide()
+        if date_range is not None:  # Unparsed 期日 keeps the form's default dates
+            self.form.start_date_edit.setDate(QDate(date_range[0].year, date_range[0].month, date_range[0].day))
+            self.form.end_date_edit.setDate(QDate(date_range[1].year, date_range[1].month, date_range[1].day))
+        self.form.task_edit.setPlainText(task)
+        self.form.notes_edit.setPlainText(notes)
+        layout.addWidget(self.form)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Save | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+
+class TableViewWidget(QWidget):
+    # Emitted when the user scrolls to the top and older partitions may be loaded
+    older_rows_requested = Signal()
+    # Emitted with a partition key, or "" for all months
+    month_filter_changed = Signal(str)
+    # Emitted with the table row to edit / delete
+    edit_requested = Signal(int)
+    delete_requested = Signal(int)
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.has_older_rows = False
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+
+        filter_h_layout = QHBoxLayout()
+        filter_h_layout.addWidget(QLabel("月份:"))
+        self.month_filter_combo = QComboBox()
+        self.month_filter_combo.setMinimumWidth(140)
+        self.month_filter_combo.currentIndexChanged.connect(self._on_month_filter_changed)
+        filter_h_layout.addWidget(self.month_filter_combo)
+        filter_h_layout.addStretch(1)
+        self.edit_button = QPushButton("编辑")
+        self.edit_button.clicked.connect(lambda: self._request_for_selection(self.edit_requested))
+        self.delete_button = QPushButton("删除")
+        self.delete_button.clicked.connect(lambda: self._request_for_selection(self.delete_requested))
+        filter_h_layout.addWidget(self.edit_button)
+        filter_h_layout.addWidget(self.delete_button)
+        layout.addLayout(filter_h_layout)
+
+        self.table_model = BlogTableModel(self.headers, self)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table_view.doubleClicked.connect(lambda index: self.edit_requested.emit(index.row()))
+        self.table_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.table_view.customContextMenuRequested.connect(self._show_context_menu)
+        self.table_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerItem)
+        self.table_view.setAlternatingRowColors(True)
+        self.table_view.verticalHeader().setVisible(False)
+        self.table_view.setShowGrid(True)
+        header = self.table_view.horizontalHeader()
+        # ResizeToContents would make the view query every row; the date column has a fixed format instead
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        header.resizeSection(0, self.table_view.fontMetrics().horizontalAdvance("0000/00/00至0000/00/00") + 16)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)
+        self.table_view.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        # Multi-line 任务/备注 wrap in place; row heights are fitted for the visible rows only
+        self.text_delegate = CachedTextDelegate(self.table_view)
+        layout.addWidget(self.table_view)
+        self.table_model.modelReset.connect(self._update_edit_buttons)
+        self.table_view.selectionModel().selectionChanged.connect(self._update_edit_buttons)
+        self._update_edit_buttons()
+
+    @Slot()
+    def _update_edit_buttons(self):
+        has_selection = self.selected_row() is not None
+        self.edit_button.setEnabled(has_selection)
+        self.delete_button.setEnabled(has_selection)
+
+    def selected_row(self):
+        rows = self.table_view.selectionModel().selectedRows()
+        return rows[0].row() if rows else None
+
+    def _request_for_selection(self, signal):
+        row = self.selected_row()
+        if row is not None:
+            signal.emit(row)
+
+    @Slot(object)
+    def _show_context_menu(self, position):
+        index = self.table_view.indexAt(position)
+        if not index.isValid():
+            return
+        self.table_view.selectRow(index.row())
+        menu = QMenu(self)
+        menu.addAction("编辑...", lambda: self.edit_requested.emit(index.row()))
+        menu.addAction("删除", lambda: self.delete_requested.emit(index.row()))
+        menu.exec(self.table_view.viewport().mapToGlobal(position))
+
+    def set_month_options(self, options, current_key=""):
+        """options: list of (partition_key, label) shown after the "全部月份" entry."""
+        self.month_filter_combo.blockSignals(True)
+        self.month_filter_combo.clear()
+        self.month_filter_combo.addItem("全部月份", "")
+        for key, label in options:
+            self.month_filter_combo.addItem(label, key)
+        index = self.month_filter_combo.findData(current_key)
+        self.month_filter_combo.setCurrentIndex(max(index, 0))
+        self.month_filter_combo.blockSignals(False)
+
+    @Slot(int)
+    def _on_month_filter_changed(self, index):
+        self.month_filter_changed.emit(self.month_filter_combo.itemData(index) or "")
+
+    @Slot(int)
+    def _on_scrolled(self, value):
+        if self.has_older_rows and value == self.table_view.verticalScrollBar().minimum():
+            self.older_rows_requested.emit()
+
+    def prepend_segment(self, key, row_index):
+        """Insert an older partition above the current rows, keeping the visible rows in place."""
+        scroll_bar = self.table_view.verticalScrollBar()
+        distance_from_bottom = scroll_bar.maximum() - scroll_bar.value()
+        self.table_model.prepend_segment(key, row_index)
+        self.table_view.updateGeometries()  # Refresh the scroll range before restoring the position
+        scroll_bar.setValue(scroll_bar.maximum() - distance_from_bottom)
+
+    def show_segments(self, segments):
+        """segments: list of (partition_key, CsvRowIndex), oldest first. Scrolls to the newest row."""
+        self.table_model.set_segments(segments)
+        self.table_view.scrollToBottom()
+
+    def refresh_segment(self, key, select_row=None):
+        """Reload one partition's rows after an edit, deletion or compaction, keeping the scroll position."""
+        scroll_bar = self.table_view.verticalScrollBar()
+        position = scroll_bar.value()
+        self.table_model.refresh_segment(key)
+        self.table_view.updateGeometries()
+        scroll_bar.setValue(min(position, scroll_bar.maximum()))
+        if select_row is not None and select_row < self.table_model.rowCount():
+            self.table_view.selectRow(select_row)
+
+    def row_count(self):
+        return self.table_model.rowCount()
+
+
+class StatsViewWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(10)
+
+        # --- Summary QFormLayout ---
+        summary_layout = QFormLayout()
+        summary_layout.setSpacing(8)
+        self.total_tasks_label = QLabel("0")
+        self.logged_days_label = QLabel("0")
+        self.longest_streak_label = QLabel("0 天")
+        self.current_streak_label = QLabel("0 天")
+        summary_layout.addRow("任务总数:", self.total_tasks_label)
+        summary_layout.addRow("记录天数:", self.logged_days_label)
+        summary_layout.addRow("最长连续记录:", self.longest_streak_label)
+        summary_layout.addRow("当前连续记录:", self.current_streak_label)
+        layout.addLayout(summary_layout)
+
+        # --- Week / Month tables side by side ---
+        tables_h_layout = QHBoxLayout()
+        tables_h_layout.setSpacing(10)
+        self.week_table = self._create_count_table(["周", "任务数"])
+        self.month_table = self._create_count_table(["月份", "任务数"])
+        tables_h_layout.addWidget(self.week_table)
+        tables_h_layout.addWidget(self.month_table)
+        layout.addLayout(tables_h_layout, 1)
+
+    def _create_count_table(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setAlternatingRowColors(True)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        return table
+
+    def show_statistics(self, stats):
+        self.total_tasks_label.setText(str(stats.total_tasks))
+        self.logged_days_label.setText(str(stats.logged_days))
+        self.longest_streak_label.setText(f"{stats.longest_streak} 天")
+        self.current_streak_label.setText(f"{stats.current_streak()} 天")
+
+        # Newest periods first; aggregates are tiny compared to the log itself
+        weeks = sorted(stats.week_counts.items(), reverse=True)
+        self._fill_count_table(self.week_table, [(f"{year}年 第{week}周", count) for (year, week), count in weeks])
+        months = sorted(stats.month_counts.items(), reverse=True)
+        self._fill_count_table(self.month_table, [(f"{year}年{month}月", count) for (year, month), count in months])
+
+    def _fill_count_table(self, table, rows):
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for row_idx, (label, count) in enumerate(rows):
+            table.setItem(row_idx, 0, QTableWidgetItem(label))
+            count_item = QTableWidgetItem(str(count))
+            count_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            table.setItem(row_idx, 1, count_item)
+        table.setUpdatesEnabled(True)
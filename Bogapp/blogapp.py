@@ -1,195 +1,482 @@
-# blogapp.py
-import sys
-import csv
-import os
-from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
-    QMessageBox, QStackedWidget, QStatusBar
-)
-from PySide6.QtCore import QDate, Qt, Slot
-from PySide6.QtGui import QIcon
-
-# Import custom widgets from blog_widgets.py
-from blog_widgets import InputFormWidget, TableViewWidget
-
-
-class BlogApp(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Jay的日志记录器")
-        self.setGeometry(100, 100, 850, 700)  # Adjusted size for overall comfort
-
-        self.csv_file = "blogs.csv"
-        self.csv_headers = ["期日", "任务", "备注"]
-        self._init_csv()
-
-        # --- Main Central Widget and Layout ---
-        self.central_area_widget = QWidget()  # A container for layout
-        self.setCentralWidget(self.central_area_widget)
-        self.main_layout = QVBoxLayout(self.central_area_widget)
-        self.main_layout.setContentsMargins(10, 10, 10, 10)  # Overall margins
-        self.main_layout.setSpacing(10)  # Spacing between toggle button and stacked_widget
-
-        # --- Toggle Button ---
-        self.toggle_button = QPushButton("查看日志数据")
-        self.toggle_button.setMinimumHeight(35)  # Make button a bit taller
-        self.toggle_button.setStyleSheet("font-size: 14px; padding: 5px;")
-        self.toggle_button.clicked.connect(self._toggle_view)
-        self.main_layout.addWidget(self.toggle_button)
-
-        # --- Stacked Widget for Input Form and Table View ---
-        self.stacked_widget = QStackedWidget()
-
-        self.input_form_page = InputFormWidget()
-        # Apply QDateEdit stylesheet after InputFormWidget is created
-        self._apply_dateedit_styles(self.input_form_page)
-        self.input_form_page.submit_button.clicked.connect(self._handle_submit)  # Connect here
-
-        self.table_view_page = TableViewWidget(headers=self.csv_headers)
-
-        self.stacked_widget.addWidget(self.input_form_page)
-        self.stacked_widget.addWidget(self.table_view_page)
-        self.main_layout.addWidget(self.stacked_widget)  # Stacked widget takes most space
-
-        # --- Status Bar ---
-        self.status_bar = QStatusBar()
-        self.setStatusBar(self.status_bar)
-        self.status_bar.showMessage("就绪", 3000)
-
-        # Set initial view
-        self.stacked_widget.setCurrentWidget(self.input_form_page)
-
-    def _apply_dateedit_styles(self, input_form):
-        date_edit_stylesheet = """
-            QDateEdit {
-                background-color: #FFFFFF; 
-                color: #222222;            
-                border: 1px solid #B0B0B0; 
-                padding: 4px;              
-                border-radius: 4px;        
-                min-height: 22px;          
-            }
-            QDateEdit:focus {
-                border: 1px solid #0078D7; 
-                background-color: #FBFEFF; 
-            }
-            QDateEdit::down-button {
-                background-color: #E0EAF5; 
-                border: none;              
-                border-left: 1px solid #B0B0B0; 
-                border-top-right-radius: 3px; 
-                border-bottom-right-radius: 3px;
-                border-top-left-radius: 0px;    
-                border-bottom-left-radius: 0px; 
-                min-width: 30px;           
-                padding: 0px 2px 0px 2px;  
-            }
-            QDateEdit::down-button:hover {
-                background-color: #D0DDEC; 
-            }
-            QDateEdit::down-button:pressed {
-                background-color: #C0D0E2; 
-            }
-        """
-        input_form.start_date_edit.setStyleSheet(date_edit_stylesheet)
-        input_form.end_date_edit.setStyleSheet(date_edit_stylesheet)
-
-    def _init_csv(self):
-        if not os.path.exists(self.csv_file):
-            try:
-                with open(self.csv_file, mode='w', newline='', encoding='utf-8-sig') as file:
-                    writer = csv.writer(file)
-                    writer.writerow(self.csv_headers)
-            except IOError as e:
-                QMessageBox.critical(self, "文件错误", f"无法创建CSV文件: {self.csv_file}\n{e}")
-
-    @Slot()
-    def _handle_submit(self):
-        form_data = self.input_form_page.get_form_data()
-        start_date = form_data["start_date"]
-        end_date = form_data["end_date"]
-        task = form_data["task"]
-        notes = form_data["notes"]
-
-        if not task:
-            QMessageBox.warning(self, "输入错误", "任务内容为必填项，不能为空！")
-            self.input_form_page.task_edit.setFocus()
-            return
-
-        if start_date > end_date:
-            QMessageBox.warning(self, "日期错误", "起始日期不能晚于结束日期！")
-            return
-
-        date_str = f"{start_date.toString('yyyy/M/d')}至{end_date.toString('yyyy/M/d')}"
-
-        try:
-            with open(self.csv_file, mode='a', newline='', encoding='utf-8-sig') as file:
-                writer = csv.writer(file)
-                writer.writerow([date_str, task, notes])
-
-            self.status_bar.showMessage("日志写入完成！", 3000)  # Use status bar
-            QMessageBox.information(self, "成功", "日志写入完成！")  # Keep popup for explicit confirmation
-            self.input_form_page.clear_fields()  # Clear fields after successful submission
-
-        except IOError as e:
-            QMessageBox.critical(self, "写入错误", f"无法写入到CSV文件: {self.csv_file}\n{e}")
-        except Exception as e:
-            QMessageBox.critical(self, "未知错误", f"发生意外错误: {e}")
-
-    @Slot()
-    def _load_csv_data_to_table(self):
-        if not os.path.exists(self.csv_file):
-            self.status_bar.showMessage(f"日志文件 {self.csv_file} 不存在或为空。", 3000)
-            self.table_view_page.load_data_rows([])  # Pass empty list
-            return
-
-        data_rows = []
-        try:
-            with open(self.csv_file, mode='r', newline='', encoding='utf-8-sig') as file:
-                reader = csv.reader(file)
-                header_from_file = next(reader, None)
-
-                if header_from_file != self.csv_headers and header_from_file is not None:
-                    QMessageBox.warning(self, "文件警告", "CSV文件头与预期不符。可能无法正确显示。")
-                    # self.table_view_page.set_headers(header_from_file if header_from_file else self.csv_headers)
-
-                for row_data in reader:
-                    if any(field.strip() for field in row_data):  # Skip truly empty rows
-                        data_rows.append(row_data)
-
-            self.table_view_page.load_data_rows(data_rows)
-            self.status_bar.showMessage(f"已加载 {len(data_rows)} 条日志。", 3000)
-
-        except FileNotFoundError:
-            QMessageBox.warning(self, "文件错误", f"找不到文件: {self.csv_file}")
-        except Exception as e:
-            QMessageBox.critical(self, "读取错误", f"无法读取CSV文件: {self.csv_file}\n{e}")
-            self.table_view_page.load_data_rows([])
-
-    @Slot()
-    def _toggle_view(self):
-        current_index = self.stacked_widget.currentIndex()
-        if current_index == 0:  # Currently on input form, switch to table view
-            self._load_csv_data_to_table()
-            self.stacked_widget.setCurrentIndex(1)
-            self.toggle_button.setText("返回日志输入")
-            self.status_bar.showMessage("切换到日志预览模式", 3000)
-        else:  # Currently on table view, switch to input form
-            self.stacked_widget.setCurrentIndex(0)
-            self.toggle_button.setText("查看日志数据")
-            self.status_bar.showMessage("切换到日志输入模式", 3000)
-
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    # Optional: Set an application icon (create a 'icon.png' or similar in the same directory)
-    # icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app_icon.png')
-    # if os.path.exists(icon_path):
-    # app.setWindowIcon(QIcon(icon_path))
-
-    # You can try different styles: "Windows", "Fusion", "macOS" (if on macOS)
-    # app.setStyle("Fusion")
-
-    window = BlogApp()
-    window.show()
+# blogapp.py
+import sys
+import os
+import pandas as pd
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+    QMessageBox, QStackedWidget, QStatusBar, QFileDialog
+)
+from PySide6.QtCore import QDate, Qt, Slot
+from PySide6.QtGui import QIcon
+
+# The common package at the repository root is shared with word_recorder
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from common.export import EXPORT_FORMATS, format_from_path
+from common.export_worker import ExportWorker, start_export
+from common.instrument import traced
+from common.instrument_panel import add_profiling_actions
+
+# Import custom widgets from blog_widgets.py
+from blog_widgets import InputFormWidget, TableViewWidget, StatsViewWidget, LogEditDialog
+from blog_compaction import CompactionWorker
+from blog_journal import JournaledRowIndex
+from blog_stats import LogStatistics
+from blog_storage import BlogStorage, UNDATED_PARTITION, parse_date_range
+from common.table_store import TableConflictError
+from csv_row_index import CsvRowIndex
+
+INITIAL_TABLE_ROWS = 200  # Newest partitions are indexed until at least this many rows are available
+
+
+class BlogApp(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Jay的日志记录器")
+        self.setGeometry(100, 100, 850, 700)  # Adjusted size for overall comfort
+
+        self.csv_file = "blogs.csv"  # Legacy single-file log, migrated into data_dir on first start
+        self.data_dir = "blogs"
+        self.csv_headers = ["期日", "任务", "备注"]
+        self.storage = BlogStorage(self.data_dir, self.csv_headers, legacy_csv=self.csv_file)
+        self._init_storage()
+        self._month_filter = ""  # Partition key selected in the table view, "" for all months
+        self._pending_partition_keys = []  # Older partitions not loaded into the table yet
+        self._row_indexes = {}  # partition key -> JournaledRowIndex
+        self._export_worker = None  # Running background export, if any
+        self._compaction_worker = None  # Running background compaction, if any
+        self._compaction_pending = set()  # Partitions to compact once the running compaction ends
+        self.log_stats = None  # Built on first visit to the statistics page, then updated incrementally
+
+        # --- Main Central Widget and Layout ---
+        self.central_area_widget = QWidget()  # A container for layout
+        self.setCentralWidget(self.central_area_widget)
+        self.main_layout = QVBoxLayout(self.central_area_widget)
+        self.main_layout.setContentsMargins(10, 10, 10, 10)  # Overall margins
+        self.main_layout.setSpacing(10)  # Spacing between toggle button and stacked_widget
+
+        # --- Toggle / Statistics Buttons ---
+        self.toggle_button = QPushButton("查看日志数据")
+        self.toggle_button.setMinimumHeight(35)  # Make button a bit taller
+        self.toggle_button.setStyleSheet("font-size: 14px; padding: 5px;")
+        self.toggle_button.clicked.connect(self._toggle_view)
+
+        self.stats_button = QPushButton("查看统计")
+        self.stats_button.setMinimumHeight(35)
+        self.stats_button.setStyleSheet("font-size: 14px; padding: 5px;")
+        self.stats_button.clicked.connect(self._show_stats_view)
+
+        self.export_button = QPushButton("导出日志")
+        self.export_button.setMinimumHeight(35)
+        self.export_button.setStyleSheet("font-size: 14px; padding: 5px;")
+        self.export_button.clicked.connect(self._export_logs)
+
+        buttons_h_layout = QHBoxLayout()
+        buttons_h_layout.addWidget(self.toggle_button, 1)
+        buttons_h_layout.addWidget(self.stats_button)
+        buttons_h_layout.addWidget(self.export_button)
+        self.main_layout.addLayout(buttons_h_layout)
+
+        # --- Stacked Widget for Input Form and Table View ---
+        self.stacked_widget = QStackedWidget()
+
+        self.input_form_page = InputFormWidget()
+        # Apply QDateEdit stylesheet after InputFormWidget is created
+        self._apply_dateedit_styles(self.input_form_page)
+        self.input_form_page.submit_button.clicked.connect(self._handle_submit)  # Connect here
+
+        self.table_view_page = TableViewWidget(headers=self.csv_headers)
+        self.table_view_page.older_rows_requested.connect(self._load_older_partition)
+        self.table_view_page.month_filter_changed.connect(self._set_month_filter)
+        self.table_view_page.edit_requested.connect(self._edit_row)
+        self.table_view_page.delete_requested.connect(self._delete_row)
+        self.stats_view_page = StatsViewWidget()
+
+        self.stacked_widget.addWidget(self.input_form_page)
+        self.stacked_widget.addWidget(self.table_view_page)
+        self.stacked_widget.addWidget(self.stats_view_page)
+        self.main_layout.addWidget(self.stacked_widget)  # Stacked widget takes most space
+
+        # --- Debug Menu ---
+        debug_menu = self.menuBar().addMenu("调试 (&D)")
+        self.profiling_action = add_profiling_actions(self, debug_menu)
+
+        # --- Status Bar ---
+        self.status_bar = QStatusBar()
+        self.setStatusBar(self.status_bar)
+        self.status_bar.showMessage("就绪", 3000)
+
+        # Set initial view
+        self.stacked_widget.setCurrentWidget(self.input_form_page)
+
+    def _apply_dateedit_styles(self, input_form):
+        date_edit_stylesheet = """
+            QDateEdit {
+                background-color: #FFFFFF; 
+                color: #222222;            
+                border: 1px solid #B0B0B0; 
+                padding: 4px;              
+                border-radius: 4px;        
+                min-height: 22px;          
+            }
+            QDateEdit:focus {
+                border: 1px solid #0078D7; 
+                background-color: #FBFEFF; 
+            }
+            QDateEdit::down-button {
+                background-color: #E0EAF5; 
+                border: none;              
+                border-left: 1px solid #B0B0B0; 
+                border-top-right-radius: 3px; 
+                border-bottom-right-radius: 3px;
+                border-top-left-radius: 0px;    
+                border-bottom-left-radius: 0px; 
+                min-width: 30px;           
+                padding: 0px 2px 0px 2px;  
+            }
+            QDateEdit::down-button:hover {
+                background-color: #D0DDEC; 
+            }
+            QDateEdit::down-button:pressed {
+                background-color: #C0D0E2; 
+            }
+        """
+        input_form.start_date_edit.setStyleSheet(date_edit_stylesheet)
+        input_form.end_date_edit.setStyleSheet(date_edit_stylesheet)
+
+    def _init_storage(self):
+        try:
+            migrated = self.storage.open()
+        except (IOError, OSError) as e:
+            QMessageBox.critical(self, "文件错误", f"无法打开日志目录: {self.data_dir}\n{e}")
+            return
+        if migrated:
+            QMessageBox.information(self, "数据迁移",
+                                    f"已将 {self.csv_file} 中的 {migrated} 条日志迁移为按月分区存储（{self.data_dir}/）。")
+
+    def _form_row(self, form, parent):
+        """The form's [期日, 任务, 备注] row, or None after telling the user what is missing."""
+        form_data = form.get_form_data()
+        start_date = form_data["start_date"]
+        end_date = form_data["end_date"]
+
+        if not form_data["task"]:
+            QMessageBox.warning(parent, "输入错误", "任务内容为必填项，不能为空！")
+            form.task_edit.setFocus()
+            return None
+
+        if start_date > end_date:
+            QMessageBox.warning(parent, "日期错误", "起始日期不能晚于结束日期！")
+            return None
+
+        date_str = f"{start_date.toString('yyyy/M/d')}至{end_date.toString('yyyy/M/d')}"
+        return [date_str, form_data["task"], form_data["notes"]]
+
+    @Slot()
+    @traced("BlogApp._handle_submit")
+    def _handle_submit(self):
+        row_data = self._form_row(self.input_form_page, self)
+        if row_data is None:
+            return
+        date_str = row_data[0]
+
+        try:
+            self.storage.append_row(row_data)
+
+            if self.log_stats is not None:
+                self.log_stats.add_entry(date_str)
+            self.status_bar.showMessage("日志写入完成！", 3000)  # Use status bar
+            QMessageBox.information(self, "成功", "日志写入完成！")  # Keep popup for explicit confirmation
+            self.input_form_page.clear_fields()  # Clear fields after successful submission
+
+        except IOError as e:
+            QMessageBox.critical(self, "写入错误", f"无法写入日志分区: {self.data_dir}\n{e}")
+        except Exception as e:
+            QMessageBox.critical(self, "未知错误", f"发生意外错误: {e}")
+
+    @staticmethod
+    def _partition_label(key):
+        if key == UNDATED_PARTITION:
+            return "未识别日期"
+        year, month = key.split("-")
+        return f"{year}年{int(month)}月"
+
+    @Slot()
+    @traced("BlogApp._load_csv_data_to_table")
+    def _load_csv_data_to_table(self):
+        partition_keys = self.storage.partition_keys()
+        self.table_view_page.set_month_options(
+            [(key, self._partition_label(key)) for key in reversed(partition_keys)], self._month_filter)
+        if not partition_keys:
+            self.status_bar.showMessage(f"日志目录 {self.data_dir} 中还没有日志。", 3000)
+            self.table_view_page.show_segments([])
+            return
+
+        if self._month_filter in self.storage.partitions:
+            partition_keys = [self._month_filter]
+        else:
+            self._month_filter = ""
+
+        # Newest partitions first, just enough to fill the view; older ones load when scrolling up
+        initial_keys = []
+        row_count = 0
+        for key in reversed(partition_keys):
+            initial_keys.insert(0, key)
+            row_count += self.storage.partition_row_count(key)
+            if row_count >= INITIAL_TABLE_ROWS:
+                break
+        self._pending_partition_keys = partition_keys[:len(partition_keys) - len(initial_keys)]
+
+        try:
+            segments = [(key, self._row_index(key)) for key in initial_keys]
+        except Exception as e:
+            QMessageBox.critical(self, "读取错误", f"无法读取日志分区: {self.data_dir}\n{e}")
+            self.table_view_page.has_older_rows = False
+            self.table_view_page.show_segments([])
+            return
+
+        self.table_view_page.has_older_rows = False
+        self.table_view_page.show_segments(segments)
+        self.table_view_page.has_older_rows = bool(self._pending_partition_keys)
+        self._show_loaded_row_count(self.table_view_page.row_count())
+
+    def _row_index(self, key):
+        """Row-offset index for a partition seen through its journal; the offsets are cached on disk
+        and only rescanned where the file grew."""
+        row_index = self._row_indexes.get(key)
+        if row_index is None:
+            row_index = JournaledRowIndex(CsvRowIndex(self.storage.partition_path(key),
+                                                      cache_path=self.storage.row_index_cache_path(key),
+                                                      expected_header=self.csv_headers),
+                                          self.storage.journal(key), self.storage.table(key).lock)
+            self._row_indexes[key] = row_index
+        return row_index.load()
+
+    def _show_loaded_row_count(self, loaded):
+        total = sum(self.storage.partition_row_count(key) for key in self.storage.partition_keys()
+                    if not self._month_filter or key == self._month_filter)
+        self.status_bar.showMessage(f"已加载 {loaded} / {total} 条日志。", 3000)
+
+    @Slot()
+    def _load_older_partition(self):
+        if not self._pending_partition_keys:
+            return
+        key = self._pending_partition_keys.pop()
+        try:
+            row_index = self._row_index(key)
+        except Exception as e:
+            QMessageBox.critical(self, "读取错误", f"无法读取日志分区: {key}\n{e}")
+            return
+        self.table_view_page.has_older_rows = bool(self._pending_partition_keys)
+        self.table_view_page.prepend_segment(key, row_index)
+        self._show_loaded_row_count(self.table_view_page.row_count())
+
+    @Slot(str)
+    def _set_month_filter(self, key):
+        self._month_filter = key
+        self._load_csv_data_to_table()
+
+    def _load_statistics(self):
+        # Only the date column is needed; pandas parses it in one vectorized pass per partition
+        date_columns = []
+        for key in self.storage.partition_keys():
+            if self.storage.journal(key).changes:  # Edited partitions are read row by row with the journal applied
+                date_columns.append(pd.Series([row_data[0] if row_data else "" for row_data in
+                                               self.storage.read_partition(key)], dtype=str))
+                continue
+            frame, _ = self.storage.table(key).read_frame(usecols=[0])
+            if len(frame):
+                date_columns.append(frame.iloc[:, 0])
+        if not date_columns:
+            return LogStatistics()
+        dates = pd.concat(date_columns, ignore_index=True)
+        return LogStatistics.from_date_strings(dates[dates.str.strip() != ""])
+
+    # --- Editing ---
+    def _stored_row(self, row):
+        """(partition key, row number in the partition, row as stored) for a table row."""
+        key, row_index, local_row = self.table_view_page.table_model.segment_row(row)
+        number, stored_row = row_index.read_stored_row(local_row)
+        return key, number, stored_row
+
+    @Slot(int)
+    def _edit_row(self, row):
+        key, number, stored_row = self._stored_row(row)
+        shown = (self.table_view_page.table_model.row_data(row) + ["", "", ""])
+        dialog = LogEditDialog(parse_date_range(shown[0]), shown[1], shown[2], parent=self)
+        self._apply_dateedit_styles(dialog.form)
+        while dialog.exec():
+            new_row = self._form_row(dialog.form, dialog)
+            if new_row is None:
+                continue  # Keep the dialog open with what was typed
+            new_row += shown[3:len(stored_row)]  # Extra cells of wider legacy rows are kept
+            try:
+                new_key = self.storage.replace_row(key, number, stored_row, new_row)
+            except TableConflictError as e:
+                QMessageBox.warning(self, "日志已变化", f"{e}\n表格已重新加载，请再试一次。")
+                self._load_csv_data_to_table()
+                return
+            except (IOError, OSError) as e:
+                QMessageBox.critical(self, "写入错误", f"无法写入日志分区: {self.data_dir}\n{e}")
+                return
+            self._after_rows_changed(key, row if new_key == key else None)
+            if new_key != key:
+                self._reload_for_moved_row(new_key)
+            else:
+                self.status_bar.showMessage("日志已修改。", 3000)
+            return
+
+    @Slot(int)
+    def _delete_row(self, row):
+        key, number, stored_row = self._stored_row(row)
+        shown = self.table_view_page.table_model.row_data(row) + ["", ""]
+        reply = QMessageBox.question(self, "删除日志", f"确定删除这条日志吗？\n\n{shown[0]}  {shown[1][:80]}",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            self.storage.delete_row(key, number, stored_row)
+        except TableConflictError as e:
+            QMessageBox.warning(self, "日志已变化", f"{e}\n表格已重新加载，请再试一次。")
+            self._load_csv_data_to_table()
+            return
+        except (IOError, OSError) as e:
+            QMessageBox.critical(self, "写入错误", f"无法写入日志分区: {self.data_dir}\n{e}")
+            return
+        self._after_rows_changed(key, None)
+        self.status_bar.showMessage("日志已删除。", 3000)
+
+    def _after_rows_changed(self, key, select_row):
+        self.log_stats = None  # Rebuilt on the next visit to the statistics page
+        self.table_view_page.refresh_segment(key, select_row)
+        self._show_loaded_row_count(self.table_view_page.row_count())
+        if self.storage.needs_compaction(key):
+            self._start_compaction([key])
+
+    def _reload_for_moved_row(self, new_key):
+        """The edited row moved to another month; show it there if that partition is on screen."""
+        if new_key in self.table_view_page.table_model.segment_keys():
+            self.table_view_page.refresh_segment(new_key)
+        self.status_bar.showMessage(f"日志已移到 {self._partition_label(new_key)}。", 3000)
+
+    def _start_compaction(self, keys):
+        if self._compaction_worker is not None:
+            self._compaction_pending.update(keys)
+            return
+        self._compaction_worker = CompactionWorker(self.data_dir, self.csv_headers, keys, parent=self)
+        self._compaction_worker.compacted.connect(self._on_partition_compacted)
+        self._compaction_worker.failed.connect(self._on_compaction_failed)
+        self._compaction_worker.finished.connect(self._on_compaction_finished)
+        self._compaction_worker.start()
+
+    @Slot(str, int)
+    def _on_partition_compacted(self, key, removed):
+        self.storage.refresh()
+        if key in self.table_view_page.table_model.segment_keys():
+            self.table_view_page.refresh_segment(key, self.table_view_page.selected_row())
+
+    @Slot(str, str)
+    def _on_compaction_failed(self, key, message):
+        # The journal stays in place, so nothing is lost; the next edit tries again
+        self.status_bar.showMessage(f"整理日志分区 {key} 失败: {message}", 5000)
+
+    @Slot()
+    def _on_compaction_finished(self):
+        self._compaction_worker.deleteLater()
+        self._compaction_worker = None
+        pending = [key for key in self._compaction_pending if self.storage.needs_compaction(key)]
+        self._compaction_pending.clear()
+        if pending:
+            self._start_compaction(pending)
+
+    @Slot()
+    def _show_stats_view(self):
+        if self.log_stats is None:
+            try:
+                self.log_stats = self._load_statistics()
+            except Exception as e:
+                QMessageBox.critical(self, "读取错误", f"无法统计日志分区: {self.data_dir}\n{e}")
+                return
+        self.stats_view_page.show_statistics(self.log_stats)
+        self.stacked_widget.setCurrentWidget(self.stats_view_page)
+        self.toggle_button.setText("返回日志输入")
+        self.status_bar.showMessage(f"已统计 {self.log_stats.total_tasks} 条日志。", 3000)
+
+    @Slot()
+    def _export_logs(self):
+        if self._export_worker is not None:
+            QMessageBox.information(self, "导出", "已有导出任务正在进行。")
+            return
+        total_rows = self.storage.total_rows()
+        if total_rows == 0:
+            QMessageBox.warning(self, "导出", "还没有可导出的日志。")
+            return
+
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "导出日志", "blogs.md", ";;".join(EXPORT_FORMATS.values()))
+        if not file_path:
+            return
+        fmt = format_from_path(file_path)
+        if fmt is None:  # No extension typed; use the selected filter
+            fmt = next((key for key, name in EXPORT_FORMATS.items() if name == selected_filter), "md")
+            file_path += f".{fmt}"
+
+        # Snapshot the partition list; the worker thread reads the files itself
+        partition_keys = self.storage.partition_keys()
+        data_dir, headers = self.storage.data_dir, self.csv_headers
+
+        def export_rows():
+            # Its own BlogStorage, like CompactionWorker: reading loads partition journals, and the GUI's
+            # storage keeps those in caches the GUI thread also updates
+            storage = BlogStorage(data_dir, headers, legacy_csv=None)
+            storage.open()
+            return storage.iter_rows([key for key in partition_keys if key in storage.partitions])
+
+        self._export_worker = ExportWorker(file_path, fmt, self.csv_headers, export_rows,
+                                           title=self.windowTitle(), parent=self)
+        self._export_worker.finished.connect(self._on_export_finished)
+        start_export(self, self._export_worker, total_rows)
+
+    @Slot()
+    def _on_export_finished(self):
+        self._export_worker = None
+
+    def closeEvent(self, event):
+        if self._export_worker is not None:  # Stop the export thread before the window goes away
+            self._export_worker.cancel()
+            self._export_worker.wait()
+        if self._compaction_worker is not None:  # Let it finish: the partition is replaced atomically either way
+            self._compaction_pending.clear()
+            self._compaction_worker.wait()
+        event.accept()
+
+    @Slot()
+    def _toggle_view(self):
+        current_index = self.stacked_widget.currentIndex()
+        if current_index == 0:  # Currently on input form, switch to table view
+            self._load_csv_data_to_table()
+            self.stacked_widget.setCurrentIndex(1)
+            self.toggle_button.setText("返回日志输入")
+            self.status_bar.showMessage("切换到日志预览模式", 3000)
+        else:  # Currently on table or statistics view, switch to input form
+            self.stacked_widget.setCurrentIndex(0)
+            self.toggle_button.setText("查看日志数据")
+            self.status_bar.showMessage("切换到日志输入模式", 3000)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    # Optional: Set an application icon (create a 'icon.png' or similar in the same directory)
+    # icon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app_icon.png')
+    # if os.path.exists(icon_path):
+    # app.setWindowIcon(QIcon(icon_path))
+
+    # You can try different styles: "Windows", "Fusion", "macOS" (if on macOS)
+    # app.setStyle("Fusion")
+
+    window = BlogApp()
+    window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,220 @@
+# csv_row_index.py
+import csv
+import io
+import os
+
+import numpy as np
+
+from common.compressed_io import detect_codec, iter_decompressed
+
+SCAN_CHUNK_BYTES = 8 * 1024 * 1024
+SHORT_ROW_BYTES = 16  # Rows this short are parsed at index time so all-empty rows can be dropped
+# A longer row can only be blank if it starts with a separator, quote or (possibly multi-byte) whitespace
+_BLANK_LEAD_BYTES = np.frombuffer(b',"\t\n\x0b\x0c\r \x1c\x1d\x1e\x1f\xc2\xe1\xe2\xe3', dtype=np.uint8)
+_QUOTE = ord('"')
+_NEWLINE = ord("\n")
+_BOM = b"\xef\xbb\xbf"
+
+
+def _is_empty_row(raw):
+    rows = list(csv.reader(io.StringIO(raw.decode("utf-8", errors="replace"), newline="")))
+    return not any(field.strip() for row_data in rows for field in row_data)
+
+
+class CsvRowIndex:
+    """Start/end byte offsets of every data record in a CSV file.
+
+    Record boundaries are newlines outside quoted fields, found with one vectorized byte scan
+    (a newline ends a record when the number of quotes before it is even), so multi-line
+    任务/备注 cells are handled without running the csv parser over the file. The offsets are
+    cached next to the data and extended in place when the file only grew (appends).
+    Rows are numbered the same way TableFile.iter_rows yields them (blank rows skipped), so a
+    row number means the same row to the table view and to BlogStorage.
+
+    A gzip/zstd compressed file cannot be read at byte offsets, so it is decompressed into a
+    plain copy next to the cache and that copy is indexed. Appends to the compressed file are
+    separate frames, so only the new frames are decompressed onto the end of the copy.
+    """
+
+    CACHE_VERSION = 3
+
+    def __init__(self, csv_path, cache_path=None, expected_header=None):
+        self.codec = detect_codec(csv_path)
+        self.source_path = csv_path  # The file as stored; csv_path is what gets indexed and read
+        if self.codec is None:
+            self.csv_path = csv_path
+        elif cache_path:
+            self.csv_path = os.path.splitext(cache_path)[0] + ".csv"
+        else:
+            self.csv_path = csv_path + ".plain.csv"
+        self.cache_path = cache_path
+        self.expected_header = list(expected_header) if expected_header else None
+        self.starts = np.empty(0, dtype=np.int64)
+        self.ends = np.empty(0, dtype=np.int64)
+        self._file_size = 0
+        self._mtime_ns = 0
+        self._inode = 0  # A rewritten file (compaction) is replaced, so a new inode means "not an append"
+        self._source_size = 0  # Size of the compressed file the plain copy was made from
+        self._source_mtime_ns = 0
+        self._source_inode = 0
+
+    def __len__(self):
+        return len(self.starts)
+
+    # --- Building ---
+    def load(self):
+        """Bring the index up to date, reusing the on-disk cache when possible."""
+        if not len(self.starts) and self._file_size == 0:
+            self._load_cache()
+        if self.codec is not None:
+            self._sync_plain_copy()
+        stat = os.stat(self.csv_path)
+        if stat.st_size == self._file_size and stat.st_mtime_ns == self._mtime_ns:
+            return self
+        if 0 < self._file_size < stat.st_size and stat.st_ino == self._inode and self._ends_with_record_boundary():
+            self._scan(self._file_size, stat.st_size)  # Appended rows only
+        else:
+            self.starts = np.empty(0, dtype=np.int64)
+            self.ends = np.empty(0, dtype=np.int64)
+            self._scan(0, stat.st_size)
+        self._file_size, self._mtime_ns, self._inode = stat.st_size, stat.st_mtime_ns, stat.st_ino
+        self._save_cache()
+        return self
+
+    def _sync_plain_copy(self):
+        stat = os.stat(self.source_path)
+        has_copy = os.path.exists(self.csv_path)
+        if has_copy and (stat.st_size, stat.st_mtime_ns) == (self._source_size, self._source_mtime_ns):
+            return
+        if (has_copy and 0 < self._source_size < stat.st_size and stat.st_ino == self._source_inode
+                and os.path.getsize(self.csv_path) == self._file_size):
+            try:
+                with open(self.csv_path, "ab") as file:
+                    for chunk in iter_decompressed(self.source_path, self.codec, offset=self._source_size):
+                        file.write(chunk)
+                self._source_size, self._source_mtime_ns = stat.st_size, stat.st_mtime_ns
+                return
+            except (OSError, EOFError, ValueError):
+                pass  # Not an append after all (the file was rewritten); start over below
+        # Rebuilt from scratch, so the old offsets no longer apply
+        self.starts = np.empty(0, dtype=np.int64)
+        self.ends = np.empty(0, dtype=np.int64)
+        self._file_size = self._mtime_ns = self._inode = 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.csv_path)), exist_ok=True)
+        with open(self.csv_path, "wb") as file:
+            for chunk in iter_decompressed(self.source_path, self.codec):
+                file.write(chunk)
+        self._source_size, self._source_mtime_ns, self._source_inode = stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    def _ends_with_record_boundary(self):
+        with open(self.csv_path, "rb") as file:
+            file.seek(self._file_size - 1)
+            return file.read(1) == b"\n"
+
+    def _scan(self, begin, end):
+        record_ends = []
+        carry_quotes = 0  # Quotes seen since the last record boundary (only parity matters)
+        with open(self.csv_path, "rb") as file:
+            file.seek(begin)
+            position = begin
+            while position < end:
+                chunk = np.frombuffer(file.read(min(SCAN_CHUNK_BYTES, end - position)), dtype=np.uint8)
+                if not len(chunk):
+                    break
+                quotes = np.flatnonzero(chunk == _QUOTE)
+                newlines = np.flatnonzero(chunk == _NEWLINE)
+                quotes_before = np.searchsorted(quotes, newlines) + carry_quotes
+                record_ends.append(newlines[(quotes_before & 1) == 0] + position + 1)
+                carry_quotes += len(quotes)
+                position += len(chunk)
+
+        ends = np.concatenate(record_ends) if record_ends else np.empty(0, dtype=np.int64)
+        if not len(ends) or ends[-1] != end:
+            ends = np.append(ends, end)  # Last record without a trailing newline
+        starts = np.concatenate(([begin], ends[:-1]))
+        if begin == 0:
+            starts, ends = self._drop_header(starts, ends)
+
+        # Blank lines and all-empty rows are not shown, matching TableFile.iter_rows; only rows that
+        # are short or start with a byte a blank row can start with are parsed to find them
+        lengths = ends - starts
+        keep = lengths > 0
+        suspects = keep & (lengths <= SHORT_ROW_BYTES)
+        long_rows = np.flatnonzero(keep & ~suspects)
+        if len(long_rows):
+            data = np.memmap(self.csv_path, dtype=np.uint8, mode="r")
+            suspects[long_rows[np.isin(data[starts[long_rows]], _BLANK_LEAD_BYTES)]] = True
+            del data
+        with open(self.csv_path, "rb") as file:
+            for position in np.flatnonzero(suspects):
+                file.seek(starts[position])
+                if _is_empty_row(file.read(ends[position] - starts[position])):
+                    keep[position] = False
+
+        self.starts = np.concatenate((self.starts, starts[keep])).astype(np.int64)
+        self.ends = np.concatenate((self.ends, ends[keep])).astype(np.int64)
+
+    def _drop_header(self, starts, ends):
+        if not len(starts):
+            return starts, ends
+        with open(self.csv_path, "rb") as file:
+            first_record = file.read(ends[0])
+        if first_record.startswith(_BOM):
+            starts = starts.copy()
+            starts[0] = len(_BOM)
+        if self.expected_header is not None:
+            header_row = next(csv.reader(io.StringIO(first_record.decode("utf-8-sig"), newline="")), [])
+            if header_row != self.expected_header:
+                return starts, ends  # Headerless file: the first record is data
+        return starts[1:], ends[1:]
+
+    # --- Cache ---
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with np.load(self.cache_path) as cached:
+                if int(cached["version"]) != self.CACHE_VERSION:
+                    return
+                self.starts, self.ends = cached["starts"], cached["ends"]
+                self._file_size, self._mtime_ns = int(cached["file_size"]), int(cached["mtime_ns"])
+                self._inode = int(cached["inode"])
+                self._source_size = int(cached["source_size"])
+                self._source_mtime_ns = int(cached["source_mtime_ns"])
+                self._source_inode = int(cached["source_inode"])
+        except (OSError, ValueError, KeyError):
+            self.starts = np.empty(0, dtype=np.int64)
+            self.ends = np.empty(0, dtype=np.int64)
+            self._file_size = self._mtime_ns = self._inode = 0
+            self._source_size = self._source_mtime_ns = self._source_inode = 0
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp.npz"
+            np.savez(tmp_path, version=self.CACHE_VERSION, starts=self.starts, ends=self.ends,
+                     file_size=self._file_size, mtime_ns=self._mtime_ns, inode=self._inode,
+                     source_size=self._source_size, source_mtime_ns=self._source_mtime_ns,
+                     source_inode=self._source_inode)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass  # The cache is only an optimization
+
+    # --- Reading ---
+    def read_rows(self, first, count):
+        """Parse rows [first, first + count) with a single contiguous read."""
+        last = min(first + count, len(self.starts)) - 1
+        if last < first:
+            return []
+        base = int(self.starts[first])
+        with open(self.csv_path, "rb") as file:
+            file.seek(base)
+            data = file.read(int(self.ends[last]) - base)
+
+        rows = []
+        for start, end in zip(self.starts[first:last + 1] - base, self.ends[first:last + 1] - base):
+            text = data[start:end].decode("utf-8", errors="replace")
+            rows.append(next(csv.reader(io.StringIO(text, newline="")), []))
+        return rows
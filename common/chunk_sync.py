@@ -0,0 +1,180 @@
+# common/chunk_sync.py
+"""
+按内容分块的增量同步：把文件切成边界由内容决定的块，以 SHA-256 命名存入目标目录（本地路径或挂载的共享目录），
+再写一份记录块顺序的清单；目标目录中已有的块不再复制。restore_file 按清单重建文件。
+
+    <目标目录>/chunks/ab/abcdef...          块，以内容的 SHA-256 命名，所有文件共用（相同的块只存一份）
+    <目标目录>/<文件名>.manifest.json       清单：块的顺序和大小，以及同步时源文件的版本
+
+块的边界只在换行处：一行结束时，以与行长成正比的概率（由这一行的 CRC32 决定）切分，
+块至少 MIN_CHUNK_BYTES，平均再过 AVG_CHUNK_BYTES 出现边界，最多 MAX_CHUNK_BYTES。
+边界只取决于块内的内容，在中间插入或删除几行只改变附近的一两个块，在末尾追加只改变最后一个块；
+写入目标目录的数据量与修改量成正比。源文件只是被追加时（同一 inode 且变大），
+从上次最后一个块的开头接着分块，前面的内容不再读取。只依赖标准库。
+"""
+import hashlib
+import json
+import os
+import time
+import zlib
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional
+
+from common.file_lock import FileLock
+
+MIN_CHUNK_BYTES = 16 * 1024
+AVG_CHUNK_BYTES = 48 * 1024 # 超过最小块之后，平均再过这么多字节出现一个边界
+MAX_CHUNK_BYTES = 256 * 1024 # 很长的行（或没有换行的文件）在这里强制切分
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".manifest.json"
+CHUNKS_DIR = "chunks"
+
+_BOUNDARY_PER_BYTE = (1 << 32) // AVG_CHUNK_BYTES
+
+
+class SyncResult(NamedTuple):
+    chunks: int         # 文件的块数
+    copied: int         # 复制到目标目录的块数
+    copied_bytes: int
+    total_bytes: int    # 文件大小
+
+
+def iter_chunks(file: IO[bytes], length: int) -> Iterator[bytes]:
+    """从 file 的当前位置起读取 length 个字节，按内容分块"""
+    chunk = bytearray()
+    remaining = length
+    while remaining > 0:
+        line = file.readline(min(MAX_CHUNK_BYTES - len(chunk), remaining))
+        if not line:
+            break
+        remaining -= len(line)
+        chunk += line
+        if len(chunk) >= MAX_CHUNK_BYTES or (
+                len(chunk) >= MIN_CHUNK_BYTES and line.endswith(b"\n")
+                and zlib.crc32(line) < len(line) * _BOUNDARY_PER_BYTE):
+            yield bytes(chunk)
+            chunk = bytearray()
+    if chunk:
+        yield bytes(chunk)
+
+
+def manifest_path_for(target_dir: str, name: str) -> str:
+    return os.path.join(target_dir, name + MANIFEST_SUFFIX)
+
+
+def _chunk_path(target_dir: str, digest: str) -> str:
+    return os.path.join(target_dir, CHUNKS_DIR, digest[:2], digest)
+
+
+def synced_names(target_dir: str) -> List[str]:
+    """目标目录中有清单的文件名"""
+    if not os.path.isdir(target_dir):
+        return []
+    return sorted(file_name[:-len(MANIFEST_SUFFIX)] for file_name in os.listdir(target_dir)
+                  if file_name.endswith(MANIFEST_SUFFIX))
+
+
+def read_manifest(target_dir: str, name: str) -> Optional[dict]:
+    """文件的清单，没有或无法识别时返回 None"""
+    try:
+        with open(manifest_path_for(target_dir, name), mode="r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def _write_atomically(path: str, data: bytes):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def sync_file(source_path: str, target_dir: str, name: Optional[str] = None) -> SyncResult:
+    """把 source_path 同步到 target_dir（清单名默认为源文件名）。同一目标目录的同步和清理在锁内依次进行"""
+    name = name or os.path.basename(source_path)
+    os.makedirs(os.path.join(target_dir, CHUNKS_DIR), exist_ok=True)
+    with FileLock(os.path.join(target_dir, CHUNKS_DIR)).exclusive():
+        stat = os.stat(source_path)
+        source = {"inode": stat.st_ino, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        old = read_manifest(target_dir, name)
+        old_chunks = [tuple(entry) for entry in old["chunks"]] if old else []
+        if old and old.get("source") == source:
+            return SyncResult(len(old_chunks), 0, 0, stat.st_size)
+
+        kept, offset = [], 0
+        if old and old_chunks and old["source"]["inode"] == stat.st_ino and old["size"] < stat.st_size:
+            kept = old_chunks[:-1] # 只被追加：最后一个块之前的边界不会变
+            offset = sum(size for _, size in kept)
+
+        chunks, copied, copied_bytes = list(kept), 0, 0
+        with open(source_path, "rb") as file:
+            file.seek(offset)
+            for data in iter_chunks(file, stat.st_size - offset):
+                digest = hashlib.sha256(data).hexdigest()
+                chunk_path = _chunk_path(target_dir, digest)
+                if not os.path.exists(chunk_path):
+                    os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                    _write_atomically(chunk_path, data)
+                    copied += 1
+                    copied_bytes += len(data)
+                chunks.append((digest, len(data)))
+        size = sum(chunk_size for _, chunk_size in chunks)
+
+        # 块都写好之后才替换清单：同步中途失败时旧的清单仍然完整可用
+        manifest = {"version": MANIFEST_VERSION, "name": name, "size": size, "source": source,
+                    "synced": time.strftime("%Y-%m-%d %H:%M:%S"), "chunks": [list(entry) for entry in chunks]}
+        _write_atomically(manifest_path_for(target_dir, name),
+                          json.dumps(manifest, ensure_ascii=False, indent=0).encode("utf-8"))
+        _prune_chunks(target_dir, {digest for digest, _ in old_chunks} - {digest for digest, _ in chunks})
+    return SyncResult(len(chunks), copied, copied_bytes, size)
+
+
+def _prune_chunks(target_dir: str, candidates: Iterable[str]):
+    """删除 candidates 中不再被任何清单引用的块（调用方持有目标目录的锁）"""
+    candidates = set(candidates)
+    if not candidates:
+        return
+    for name in synced_names(target_dir):
+        manifest = read_manifest(target_dir, name)
+        if manifest is None:
+            return # 有无法识别的清单时不删除任何块
+        candidates.difference_update(digest for digest, _ in manifest["chunks"])
+    for digest in candidates:
+        try:
+            os.remove(_chunk_path(target_dir, digest))
+        except FileNotFoundError:
+            pass
+
+
+def restore_file(target_dir: str, name: str, output_path: str) -> int:
+    """
+    按清单从块重建文件，写入 output_path（先写临时文件再替换），返回文件大小。
+    清单不存在时抛出 FileNotFoundError，块缺失或内容与 SHA-256 不符时抛出 ValueError，output_path 保持不变。
+    """
+    manifest = read_manifest(target_dir, name)
+    if manifest is None:
+        raise FileNotFoundError(f"同步目录中没有 {name} 的清单: {target_dir}")
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as output:
+            for digest, size in manifest["chunks"]:
+                try:
+                    with open(_chunk_path(target_dir, digest), "rb") as file:
+                        data = file.read()
+                except FileNotFoundError:
+                    raise ValueError(f"同步目录中缺少块 {digest}") from None
+                if len(data) != size or hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"同步目录中的块 {digest} 已损坏")
+                output.write(data)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return manifest["size"]
@@ -0,0 +1,147 @@
+# common/compressed_io.py
+"""
+透明压缩：gzip（标准库）和 zstd（Python 3.14 的 compression.zstd，或 zstandard 包），流式读写。
+已有文件按开头的魔数识别格式，新文件按扩展名（.gz / .zst）决定。
+追加时写入一个独立的帧（gzip member / zstd frame），不需要解压和重新压缩已有内容；读取时依次解压所有帧。
+"""
+import gzip
+import io
+import os
+from typing import IO, Iterator, Optional
+
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+CODEC_EXTENSIONS = {".gz": CODEC_GZIP, ".zst": CODEC_ZSTD}
+EXTENSION_FOR_CODEC = {codec: extension for extension, codec in CODEC_EXTENSIONS.items()}
+_MAGIC = {b"\x1f\x8b": CODEC_GZIP, b"\x28\xb5\x2f\xfd": CODEC_ZSTD}
+_MAGIC_BYTES = max(len(magic) for magic in _MAGIC)
+
+GZIP_LEVEL = 6 # 压缩率与最高的 9 相差不多，速度快得多
+ZSTD_LEVEL = 3
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+
+class CodecUnavailableError(OSError):
+    """读写 .zst 文件需要的模块没有安装"""
+
+
+def codec_from_extension(file_path: str) -> Optional[str]:
+    return CODEC_EXTENSIONS.get(os.path.splitext(file_path)[1].lower())
+
+
+def strip_codec_extension(file_path: str) -> str:
+    """a.csv.gz -> a.csv；没有压缩扩展名时原样返回"""
+    stem, extension = os.path.splitext(file_path)
+    return stem if extension.lower() in CODEC_EXTENSIONS else file_path
+
+
+def _codec_from_magic(head: bytes) -> Optional[str]:
+    for magic, codec in _MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def detect_codec(file_path: str) -> Optional[str]:
+    """已有的非空文件按魔数识别（扩展名与内容不符时以内容为准），否则按扩展名；None 表示不压缩"""
+    try:
+        with open(file_path, "rb") as file:
+            head = file.read(_MAGIC_BYTES)
+    except FileNotFoundError:
+        head = b""
+    if not head:
+        return codec_from_extension(file_path)
+    return _codec_from_magic(head)
+
+
+def _zstd_module():
+    try:
+        from compression import zstd # Python 3.14+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        raise CodecUnavailableError("读写 .zst 文件需要 Python 3.14 或者安装 zstandard 包（pip install zstandard）。") from None
+
+
+def _open_zstd(file_path: str, mode: str) -> IO[bytes]:
+    zstd = _zstd_module()
+    if hasattr(zstd, "ZstdFile"): # compression.zstd：ZstdFile 本身就能读取连续的多个帧
+        return zstd.open(file_path, mode) if mode == "rb" else zstd.open(file_path, mode, level=ZSTD_LEVEL)
+    file = open(file_path, mode)
+    if mode == "rb":
+        return io.BufferedReader(zstd.ZstdDecompressor().stream_reader(file, read_across_frames=True), STREAM_CHUNK_BYTES)
+    return zstd.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(file) # 关闭时写完这一帧并关闭文件
+
+
+def _zstd_reader(file: IO[bytes]) -> IO[bytes]:
+    """读取已打开的 file 中从当前位置开始的所有帧，关闭时不关闭 file"""
+    zstd = _zstd_module()
+    if hasattr(zstd, "ZstdFile"):
+        return zstd.ZstdFile(file, mode="rb")
+    return zstd.ZstdDecompressor().stream_reader(file, read_across_frames=True, closefd=False)
+
+
+def open_binary(file_path: str, mode: str, codec: Optional[str]) -> IO[bytes]:
+    """mode 为 "rb" / "wb" / "ab"；"ab" 在文件末尾开始一个新的帧"""
+    if codec is None:
+        return open(file_path, mode)
+    if codec == CODEC_GZIP:
+        return gzip.open(file_path, mode, compresslevel=GZIP_LEVEL)
+    if codec == CODEC_ZSTD:
+        return _open_zstd(file_path, mode)
+    raise ValueError(f"不支持的压缩格式: {codec}")
+
+
+def open_reader(file: IO[bytes], codec: Optional[str]) -> IO[bytes]:
+    """解压已打开的 file 中从当前位置（帧的开头）开始的所有帧；关闭返回的对象时不关闭 file"""
+    if codec is None:
+        return file
+    if codec == CODEC_GZIP:
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    if codec == CODEC_ZSTD:
+        return _zstd_reader(file)
+    raise ValueError(f"不支持的压缩格式: {codec}")
+
+
+def compress_bytes(data: bytes, codec: Optional[str]) -> bytes:
+    """把 data 压缩为一个完整的帧（codec 为 None 时原样返回），可以一次写到文件末尾"""
+    if codec is None:
+        return data
+    if codec == CODEC_GZIP:
+        return gzip.compress(data, compresslevel=GZIP_LEVEL)
+    if codec == CODEC_ZSTD:
+        zstd = _zstd_module()
+        if hasattr(zstd, "ZstdFile"):
+            return zstd.compress(data, level=ZSTD_LEVEL)
+        return zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"不支持的压缩格式: {codec}")
+
+
+def open_text(file_path: str, mode: str, codec: Optional[str], encoding: str) -> IO[str]:
+    """mode 为 "r" / "w" / "a"，与 csv 模块配合使用（newline=""）"""
+    if codec is None:
+        return open(file_path, mode=mode, newline="", encoding=encoding)
+    return io.TextIOWrapper(open_binary(file_path, mode + "b", codec), encoding=encoding, newline="")
+
+
+def iter_decompressed(file_path: str, codec: str, offset: int = 0,
+                      chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    从压缩文件的第 offset 字节（必须是一个帧的开头，例如上次读取时的文件大小）开始，按块返回解压后的数据。
+    offset 处不是帧的开头时抛出 ValueError。
+    """
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        if offset and _codec_from_magic(file.read(_MAGIC_BYTES)) != codec:
+            raise ValueError(f"第 {offset} 字节处不是 {codec} 帧的开头。")
+        file.seek(offset)
+        with open_reader(file, codec) as stream:
+            while True:
+                chunk = stream.read(chunk_bytes)
+                if not chunk:
+                    break
+                yield chunk
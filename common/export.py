@@ -0,0 +1,196 @@
+# common/export.py
+"""流式导出：把任意行迭代器写成 Markdown / HTML / XLSX，不在内存中拼出整个文档。"""
+import html
+import os
+import re
+import zipfile
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+EXPORT_FORMATS = {
+    "md": "Markdown (*.md)",
+    "html": "HTML (*.html)",
+    "xlsx": "Excel 工作簿 (*.xlsx)",
+}
+
+XLSX_MAX_ROWS = 1048576
+XLSX_MAX_CELL_CHARS = 32767
+XLSX_MAX_SHEET_NAME_CHARS = 31
+PROGRESS_EVERY = 1000  # 每处理这么多行回调一次进度/检查一次取消
+
+_XML_ILLEGAL_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_SHEET_NAME_ILLEGAL_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+class ExportCancelled(Exception):
+    """导出被用户取消"""
+
+
+def format_from_path(file_path: str) -> Optional[str]:
+    """根据文件扩展名判断导出格式，不支持时返回 None"""
+    ext = os.path.splitext(file_path)[1].lower().lstrip(".")
+    if ext in ("htm", "html"):
+        return "html"
+    if ext in ("md", "markdown"):
+        return "md"
+    return ext if ext in EXPORT_FORMATS else None
+
+
+def _track(rows: Iterable[Sequence], progress: Optional[Callable[[int], None]],
+           is_cancelled: Optional[Callable[[], bool]]) -> Iterator[Sequence]:
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % PROGRESS_EVERY == 0:
+            if is_cancelled is not None and is_cancelled():
+                raise ExportCancelled()
+            if progress is not None:
+                progress(count)
+    if progress is not None:
+        progress(count)
+
+
+# --- Markdown ---
+def _md_cell(value) -> str:
+    text = str(value).replace("\\", "\\\\").replace("|", "\\|")
+    return text.replace("\r\n", "\n").replace("\n", "<br>")
+
+
+def markdown_chunks(headers: Sequence[str], rows: Iterable[Sequence], title: str = "") -> Iterator[str]:
+    if title:
+        yield f"# {title}\n\n"
+    yield "| " + " | ".join(_md_cell(h) for h in headers) + " |\n"
+    yield "|" + "---|" * len(headers) + "\n"
+    for row in rows:
+        yield "| " + " | ".join(_md_cell(cell) for cell in row) + " |\n"
+
+
+# --- HTML ---
+def _html_cell(value) -> str:
+    return html.escape(str(value)).replace("\r\n", "\n").replace("\n", "<br>")
+
+
+def html_chunks(headers: Sequence[str], rows: Iterable[Sequence], title: str = "") -> Iterator[str]:
+    escaped_title = html.escape(title)
+    yield ("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+           f"<title>{escaped_title}</title>\n"
+           "<style>table{border-collapse:collapse}th,td{border:1px solid #b0b0b0;"
+           "padding:4px 8px;vertical-align:top}th{background:#e8e8e8}</style>\n"
+           "</head>\n<body>\n")
+    if title:
+        yield f"<h1>{escaped_title}</h1>\n"
+    yield "<table>\n<thead><tr>" + "".join(f"<th>{_html_cell(h)}</th>" for h in headers) + "</tr></thead>\n<tbody>\n"
+    for row in rows:
+        yield "<tr>" + "".join(f"<td>{_html_cell(cell)}</td>" for cell in row) + "</tr>\n"
+    yield "</tbody>\n</table>\n</body>\n</html>\n"
+
+
+# --- XLSX (直接流式写 SpreadsheetML，不依赖 openpyxl) ---
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>')
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>')
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>')
+
+
+def xlsx_sheet_name(title: str) -> str:
+    """Excel 可以接受的工作表名：[]:*?/\\ 换成 _，不以 ' 开头或结尾，最多 31 个字符，为空时用 Sheet1"""
+    name = _SHEET_NAME_ILLEGAL_CHARS.sub("_", _XML_ILLEGAL_CHARS.sub("", title or ""))
+    name = name.strip("'")[:XLSX_MAX_SHEET_NAME_CHARS].strip("'")
+    return name if name.strip() else "Sheet1"
+
+
+def _xlsx_workbook(sheet_name: str) -> str:
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{html.escape(xlsx_sheet_name(sheet_name))}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>')
+
+
+def _xlsx_cell(value) -> str:
+    text = _XML_ILLEGAL_CHARS.sub("", str(value))[:XLSX_MAX_CELL_CHARS]
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{html.escape(text, quote=False)}</t></is></c>'
+
+
+def xlsx_sheet_chunks(headers: Sequence[str], rows: Iterable[Sequence]) -> Iterator[str]:
+    yield ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+           '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+    yield "<row>" + "".join(_xlsx_cell(h) for h in headers) + "</row>"
+    for row_count, row in enumerate(rows, start=2):
+        if row_count > XLSX_MAX_ROWS:
+            raise ValueError(f"XLSX 最多支持 {XLSX_MAX_ROWS} 行。")
+        yield "<row>" + "".join(_xlsx_cell(cell) for cell in row) + "</row>"
+    yield "</sheetData></worksheet>"
+
+
+def _write_xlsx(file_path: str, headers: Sequence[str], rows: Iterable[Sequence], sheet_name: str):
+    with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _xlsx_workbook(sheet_name))
+        archive.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            for chunk in xlsx_sheet_chunks(headers, rows):
+                sheet.write(chunk.encode("utf-8"))
+
+
+def _write_text(file_path: str, chunks: Iterable[str]):
+    with open(file_path, mode="w", encoding="utf-8", newline="\n") as file:
+        for chunk in chunks:
+            file.write(chunk)
+
+
+def export_rows(file_path: str, fmt: str, headers: Sequence[str], rows: Iterable[Sequence],
+                title: str = "", progress: Optional[Callable[[int], None]] = None,
+                is_cancelled: Optional[Callable[[], bool]] = None) -> int:
+    """
+    把 rows 流式写入 file_path。先写到临时文件，成功后再替换目标文件；
+    取消或出错时删除临时文件并向上抛出异常（取消时为 ExportCancelled）。
+    返回: 写入的数据行数
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+
+    written = 0
+
+    def count_progress(count: int):
+        nonlocal written
+        written = count
+        if progress is not None:
+            progress(count)
+
+    tracked = _track(rows, count_progress, is_cancelled)
+    tmp_path = file_path + ".part"
+    try:
+        if fmt == "md":
+            _write_text(tmp_path, markdown_chunks(headers, tracked, title))
+        elif fmt == "html":
+            _write_text(tmp_path, html_chunks(headers, tracked, title))
+        else:
+            _write_xlsx(tmp_path, headers, tracked, title)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
@@ -0,0 +1,89 @@
+# common/export_worker.py
+import threading
+from typing import Callable, Iterable, Optional, Sequence
+
+from PySide6.QtCore import QThread, Signal, Slot, Qt
+from PySide6.QtWidgets import QMessageBox, QProgressDialog, QWidget
+
+from common.export import ExportCancelled, export_rows
+
+
+class ExportWorker(QThread):
+    """在后台线程中执行 export_rows，通过信号汇报进度和结果"""
+    progress = Signal(int)       # 已写入行数
+    succeeded = Signal(int)      # 写入总行数
+    failed = Signal(str)         # 错误信息
+    cancelled = Signal()
+
+    def __init__(self, file_path: str, fmt: str, headers: Sequence[str],
+                 row_source: Callable[[], Iterable[Sequence]], title: str = "", parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.fmt = fmt
+        self.headers = list(headers)
+        self.title = title
+        # row_source 在工作线程中调用，文件读取等耗时操作也不会占用 GUI 线程
+        self._row_source = row_source
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def _report_progress(self, count: int):
+        self.progress.emit(count)
+
+    def run(self):
+        try:
+            written = export_rows(self.file_path, self.fmt, self.headers, self._row_source(), title=self.title,
+                                  progress=self._report_progress, is_cancelled=self._cancel_event.is_set)
+        except ExportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(written)
+
+
+class ExportProgressDialog(QProgressDialog):
+    """跟踪一个 ExportWorker 的可取消进度对话框；导出期间窗口保持响应"""
+
+    def __init__(self, worker: ExportWorker, total_rows: Optional[int] = None, parent: Optional[QWidget] = None):
+        super().__init__("正在导出...", "取消", 0, total_rows or 0, parent)
+        self.worker = worker
+        self.total_rows = total_rows
+        self.setWindowTitle("导出")
+        self.setWindowModality(Qt.WindowModality.WindowModal)
+        self.setMinimumDuration(300)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+
+        self.canceled.connect(worker.cancel)
+        worker.progress.connect(self._on_progress)
+        worker.succeeded.connect(self._on_succeeded)
+        worker.failed.connect(self._on_failed)
+        worker.cancelled.connect(self.close)
+        worker.finished.connect(self.deleteLater)
+
+    @Slot(int)
+    def _on_progress(self, count: int):
+        if self.total_rows:
+            self.setValue(min(count, self.total_rows))
+        self.setLabelText(f"正在导出... 已写入 {count} 行")
+
+    @Slot(int)
+    def _on_succeeded(self, count: int):
+        self.close()
+        QMessageBox.information(self.parentWidget(), "导出成功", f"已导出 {count} 行到: {self.worker.file_path}")
+
+    @Slot(str)
+    def _on_failed(self, message: str):
+        self.close()
+        QMessageBox.critical(self.parentWidget(), "导出失败", message)
+
+
+def start_export(parent: QWidget, worker: ExportWorker, total_rows: Optional[int] = None) -> ExportProgressDialog:
+    """为 worker 创建进度对话框并启动后台导出"""
+    dialog = ExportProgressDialog(worker, total_rows, parent)
+    worker.finished.connect(worker.deleteLater)
+    worker.start()
+    return dialog
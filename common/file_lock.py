@@ -0,0 +1,90 @@
+# common/file_lock.py
+"""
+建议锁（advisory lock），用于多个程序实例（或命令行脚本）同时读写同一个文件。
+锁加在旁边的 <文件>.lock 上，而不是数据文件本身：原子重写会用新文件替换数据文件，锁必须跨越替换仍然有效。
+.lock 文件用完后保留，删除它会与正在等待的进程产生竞争。
+
+共享锁之间互不阻塞（追加写入使用），独占锁与任何锁互斥（只在重写的最后替换文件时短暂持有）。
+Windows 上没有共享锁，两种锁都是独占的；持有时间都很短，影响不大。
+"""
+import errno
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_SUFFIX = ".lock"
+DEFAULT_TIMEOUT_SECONDS = 10.0
+_POLL_SECONDS = 0.01
+
+
+class LockTimeoutError(OSError):
+    """在超时时间内没有拿到锁（另一个实例长时间持有）"""
+
+
+def lock_path_for(file_path: str) -> str:
+    return file_path + LOCK_SUFFIX
+
+
+def _try_lock(fd: int, exclusive: bool) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except (BlockingIOError, PermissionError): # EAGAIN / EWOULDBLOCK / EACCES
+        return False
+    except OSError as e:
+        if e.errno == getattr(errno, "EDEADLOCK", errno.EDEADLK): # msvcrt 非阻塞加锁失败
+            return False
+        raise
+    return True
+
+
+def _unlock(fd: int):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """file_path 的建议锁。with lock.shared(): ... / with lock.exclusive(): ...（同一线程内不可重入）"""
+
+    def __init__(self, file_path: str, timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS):
+        self.file_path = file_path
+        self.lock_path = lock_path_for(file_path)
+        self.timeout = timeout # None 表示一直等待
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._locked(exclusive=False):
+            yield
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._locked(exclusive=True):
+            yield
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            deadline = None if self.timeout is None else time.monotonic() + self.timeout
+            while not _try_lock(fd, exclusive):
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise LockTimeoutError(f"等待文件锁超时（其他程序正在写入）: {self.file_path}")
+                time.sleep(_POLL_SECONDS)
+            try:
+                yield
+            finally:
+                _unlock(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,156 @@
+# common/instrument.py
+"""
+轻量计时埋点：命名区间（span）记录为 Chrome trace 事件，并维护每个名称的滚动延迟统计。
+
+关闭时每次调用只多一次布尔判断。通过环境变量开启：
+    FUNNYAPP_TRACE=1                 开启记录
+    FUNNYAPP_TRACE_FILE=trace.json   退出时导出 Chrome trace（可在 chrome://tracing 或 Perfetto 中打开）
+也可以在程序菜单中开启（见 common.instrument_panel）。
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+ENV_ENABLE = "FUNNYAPP_TRACE"
+ENV_TRACE_FILE = "FUNNYAPP_TRACE_FILE"
+MAX_EVENTS = 200000  # 超出后丢弃最旧的事件
+SUMMARY_WINDOW = 200 # 滚动统计使用的最近样本数
+
+
+class _State:
+    enabled = False
+
+
+_state = _State()
+_events = deque(maxlen=MAX_EVENTS)  # (name, start_us, duration_us, thread_id)
+_recent: Dict[str, deque] = {}
+_counts: Dict[str, int] = {}
+_lock = threading.Lock()
+_origin = time.perf_counter()
+
+
+def enable(flag: bool = True):
+    _state.enabled = flag
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def clear():
+    with _lock:
+        _events.clear()
+        _recent.clear()
+        _counts.clear()
+
+
+def record(name: str, started: float, finished: float):
+    """记录一个区间；started / finished 为 time.perf_counter() 的值"""
+    duration = finished - started
+    with _lock:
+        _events.append((name, (started - _origin) * 1e6, duration * 1e6, threading.get_ident()))
+        samples = _recent.get(name)
+        if samples is None:
+            samples = _recent[name] = deque(maxlen=SUMMARY_WINDOW)
+        samples.append(duration)
+        _counts[name] = _counts.get(name, 0) + 1
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, self.started, time.perf_counter())
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """with span("名称"): ...  关闭时返回共享的空上下文"""
+    return _Span(name) if _state.enabled else _NULL_SPAN
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """函数装饰器：每次调用记录一个以 name（默认为函数的限定名）命名的区间"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        state = _state
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not state.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(span_name, started, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def latency_summary() -> List[Dict[str, float]]:
+    """每个区间名称的统计（毫秒）：总次数、最近一次、滚动窗口内的 P50 / P95 / 最大值"""
+    with _lock:
+        snapshot = {name: (list(samples), _counts[name]) for name, samples in _recent.items()}
+    summary = []
+    for name, (samples, count) in sorted(snapshot.items()):
+        ordered = sorted(samples)
+        summary.append({
+            "name": name,
+            "count": count,
+            "last_ms": samples[-1] * 1000,
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p95_ms": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        })
+    return summary
+
+
+def export_chrome_trace(file_path: str) -> int:
+    """把已记录的区间写成 Chrome trace-event JSON，返回事件数"""
+    with _lock:
+        events = list(_events)
+    pid = os.getpid()
+    trace_events = [{"name": name, "cat": "funnyapp", "ph": "X", "ts": round(start, 3), "dur": round(duration, 3),
+                     "pid": pid, "tid": thread_id} for name, start, duration, thread_id in events]
+    with open(file_path, mode="w", encoding="utf-8") as file:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, file, ensure_ascii=False)
+    return len(trace_events)
+
+
+def _configure_from_environment():
+    if os.environ.get(ENV_ENABLE, "").lower() in ("1", "true", "yes", "on"):
+        enable(True)
+    trace_file = os.environ.get(ENV_TRACE_FILE)
+    if trace_file:
+        enable(True)
+        atexit.register(export_chrome_trace, trace_file)
+
+
+_configure_from_environment()
@@ -0,0 +1,108 @@
+# common/instrument_panel.py
+from PySide6.QtCore import Qt, QTimer, Signal, Slot
+from PySide6.QtGui import QAction
+from PySide6.QtWidgets import (QDockWidget, QFileDialog, QHBoxLayout, QHeaderView, QMainWindow, QMenu,
+                               QMessageBox, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+
+from common import instrument
+
+_COLUMNS = ["区间", "次数", "最近 (ms)", "P50 (ms)", "P95 (ms)", "最大 (ms)"]
+_SUMMARY_KEYS = ["count", "last_ms", "p50_ms", "p95_ms", "max_ms"]
+REFRESH_INTERVAL_MS = 1000
+
+
+class LatencyPanel(QDockWidget):
+    """调试面板：每秒刷新一次各埋点区间的滚动延迟统计，只在可见时刷新"""
+    closed = Signal() # 用户点击了面板的关闭按钮
+
+    def __init__(self, parent=None):
+        super().__init__("性能记录", parent)
+        self.setObjectName("latencyPanel")
+        container = QWidget(self)
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        self.table = QTableWidget(0, len(_COLUMNS), container)
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        buttons_layout = QHBoxLayout()
+        export_button = QPushButton("导出 Chrome Trace...", container)
+        export_button.clicked.connect(self.export_trace)
+        clear_button = QPushButton("清空", container)
+        clear_button.clicked.connect(self._clear)
+        buttons_layout.addStretch(1)
+        buttons_layout.addWidget(clear_button)
+        buttons_layout.addWidget(export_button)
+        layout.addLayout(buttons_layout)
+        self.setWidget(container)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._on_visibility_changed)
+
+    def closeEvent(self, event):
+        super().closeEvent(event)
+        if event.isAccepted():
+            self.closed.emit()
+
+    @Slot(bool)
+    def _on_visibility_changed(self, visible: bool):
+        if visible:
+            self.refresh()
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    @Slot()
+    def refresh(self):
+        summary = instrument.latency_summary()
+        self.table.setRowCount(len(summary))
+        for row, entry in enumerate(summary):
+            self.table.setItem(row, 0, QTableWidgetItem(entry["name"]))
+            for column, key in enumerate(_SUMMARY_KEYS, start=1):
+                text = str(entry[key]) if key == "count" else f"{entry[key]:.2f}"
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    @Slot()
+    def _clear(self):
+        instrument.clear()
+        self.refresh()
+
+    @Slot()
+    def export_trace(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出 Chrome Trace", "trace.json", "JSON 文件 (*.json)")
+        if not file_path:
+            return
+        try:
+            count = instrument.export_chrome_trace(file_path)
+        except OSError as e:
+            QMessageBox.critical(self, "导出失败", f"无法写入文件: {file_path}\n{e}")
+            return
+        QMessageBox.information(self, "导出成功", f"已导出 {count} 个事件，可在 chrome://tracing 或 Perfetto 中打开。")
+
+
+def add_profiling_actions(window: QMainWindow, menu: QMenu) -> QAction:
+    """在 menu 中加入“性能记录”开关；开启时记录埋点并在窗口右侧显示 LatencyPanel"""
+    panel = LatencyPanel(window)
+    window.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, panel)
+    panel.setVisible(instrument.is_enabled())
+
+    toggle_action = QAction("性能记录", window, checkable=True, checked=instrument.is_enabled(),
+                            statusTip="记录关键操作耗时并显示延迟统计")
+
+    def set_profiling(enabled: bool):
+        instrument.enable(enabled)
+        panel.setVisible(enabled)
+
+    toggle_action.toggled.connect(set_profiling)
+    panel.closed.connect(lambda: toggle_action.setChecked(False)) # 关闭面板即停止记录，菜单勾选随之取消
+    menu.addAction(toggle_action)
+    menu.addAction(QAction("导出性能追踪...", window, triggered=panel.export_trace))
+    return toggle_action
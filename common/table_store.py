@@ -0,0 +1,365 @@
+# common/table_store.py
+"""
+带声明式表结构的 CSV 表引擎，word_recorder 与 Bogapp 共用：
+表头校验、分块读取、追加写入、原子重写（先写临时文件再替换），以及可选的 pandas 读写。
+文件可以用 gzip / zstd 压缩（见 common.compressed_io），所有读写方法都透明支持。
+只依赖标准库；read_frame / write_frame 用到时才导入 pandas。
+
+多个程序实例可以同时读写同一个文件：
+追加把整条记录一次写到文件末尾，追加之间不互相等待；重写在替换文件前检查文件版本（FileStamp），
+期间被追加的记录会带到新文件中，文件被别人重写过时抛出 TableConflictError 而不是覆盖对方的修改。
+"""
+import csv
+import io
+import os
+from contextlib import contextmanager
+from typing import IO, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from common.compressed_io import compress_bytes, detect_codec, open_reader, open_text
+from common.file_lock import FileLock
+
+TABLE_ENCODING = "utf-8-sig" # 读取时兼容带 BOM 和不带 BOM 的文件；新文件带 BOM，Excel 可直接打开中文
+_APPEND_ENCODING = "utf-8"    # 向压缩文件追加的新帧不能以 BOM 开头（解压后会出现在文件中间）
+DEFAULT_CHUNK_ROWS = 10000
+
+HEADER_STANDARD = "standard" # 第一行是标准表头
+HEADER_MISSING = "missing"   # 没有表头，第一行就是数据
+HEADER_EMPTY = "empty"       # 文件为空（或只有空行）
+
+CHANGE_NONE = "unchanged"    # 与上次读写时相同
+CHANGE_APPENDED = "appended" # 只在末尾追加了记录
+CHANGE_REPLACED = "replaced" # 被重写、截短或原地修改过
+
+
+class TableFormatError(ValueError):
+    """文件内容与表结构不符（例如列数不对）"""
+
+
+class TableConflictError(OSError):
+    """文件在上次读取之后被其他程序重写过（不只是追加），继续重写会覆盖对方的修改"""
+
+
+class FileStamp(NamedTuple):
+    """文件的版本：重写（替换）后 inode 改变，追加后 size 变大，原地修改后 mtime 改变"""
+    inode: int
+    size: int
+    mtime_ns: int
+
+
+def file_stamp(file_path: str) -> Optional[FileStamp]:
+    """文件当前的版本，文件不存在时返回 None"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return FileStamp(stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def change_between(old: FileStamp, new: Optional[FileStamp]) -> str:
+    """从版本 old 到 new 发生了哪种变化（CHANGE_*）；文件已被删除时写入不会覆盖任何内容，视为没有变化"""
+    if new is None or new == old:
+        return CHANGE_NONE
+    if new.inode == old.inode and new.size > old.size:
+        return CHANGE_APPENDED
+    return CHANGE_REPLACED
+
+
+class _ByteRange(io.RawIOBase):
+    """只读取 file 从当前位置起的 length 个字节：读取期间其他程序追加的内容不会被读到一半"""
+
+    def __init__(self, file: IO[bytes], length: int):
+        self._file = file
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        count = self._file.readinto(memoryview(buffer)[:self._remaining]) or 0
+        self._remaining -= count
+        return count
+
+
+class Column:
+    """一列的名称和类型：parse 把单元格文本转换为对应的值，无法转换时返回 None"""
+    __slots__ = ("name", "parse")
+
+    def __init__(self, name: str, parse: Optional[Callable[[str], object]] = None):
+        self.name = name
+        self.parse = parse or str
+
+
+class TableSchema:
+    def __init__(self, columns: Sequence[Column], strict_width: bool = True):
+        self.columns = list(columns)
+        self.names = [column.name for column in self.columns]
+        self.strict_width = strict_width # False 时允许列数不同的行（旧数据或其他工具写入的文件）
+
+    def __len__(self):
+        return len(self.columns)
+
+    def is_header(self, row: Optional[Sequence[str]]) -> bool:
+        return row is not None and list(row) == self.names
+
+    def check_row(self, row: Sequence[str], line_number: int):
+        if self.strict_width and len(row) != len(self.columns):
+            raise TableFormatError(f"第 {line_number} 行格式错误：应包含 {len(self.columns)} 列数据。")
+
+    def parse_row(self, row: Sequence[str]) -> list:
+        """按列类型转换一行；多出的单元格原样保留，缺少的单元格视为空字符串"""
+        values = []
+        for index, column in enumerate(self.columns):
+            text = row[index] if index < len(row) else ""
+            try:
+                values.append(column.parse(text))
+            except ValueError:
+                values.append(None)
+        values.extend(row[len(self.columns):])
+        return values
+
+
+def _is_blank(row: Sequence[str]) -> bool:
+    return not any(field.strip() for field in row)
+
+
+class TableFile:
+    """一个遵循 TableSchema 的 CSV 文件"""
+
+    def __init__(self, file_path: str, schema: TableSchema):
+        self.file_path = file_path
+        self.schema = schema
+        self.lock = FileLock(file_path)
+        self.last_stamp: Optional[FileStamp] = None # 最近一次 read_frame / 重写得到的文件版本，供调用方检测之后的修改
+
+    def exists(self) -> bool:
+        return os.path.exists(self.file_path)
+
+    def is_empty(self) -> bool:
+        return not self.exists() or os.path.getsize(self.file_path) == 0
+
+    @property
+    def codec(self) -> Optional[str]:
+        """"gzip" / "zstd" / None：已有文件按内容识别，新文件按扩展名（.gz / .zst）"""
+        return detect_codec(self.file_path)
+
+    def stamp(self) -> Optional[FileStamp]:
+        return file_stamp(self.file_path)
+
+    def changes_since(self, stamp: FileStamp) -> str:
+        """文件在版本 stamp 之后发生了哪种变化（CHANGE_*）"""
+        return change_between(stamp, self.stamp())
+
+    @contextmanager
+    def _open_binary_for_reading(self, start: int = 0, stop: Optional[int] = None) -> Iterator[IO[bytes]]:
+        """解压后的内容，只读取原文件 [start, stop) 字节；start 必须是记录（压缩文件为帧）的开头"""
+        codec = self.codec
+        with open(self.file_path, "rb") as raw:
+            raw.seek(start)
+            source = raw if stop is None else io.BufferedReader(_ByteRange(raw, stop - start))
+            with open_reader(source, codec) as stream:
+                yield stream
+
+    @contextmanager
+    def _open_for_reading(self, start: int = 0, stop: Optional[int] = None) -> Iterator[IO[str]]:
+        with self._open_binary_for_reading(start, stop) as binary:
+            yield io.TextIOWrapper(binary, encoding=TABLE_ENCODING, newline="")
+
+    # --- 表头 ---
+    def read_first_row(self) -> Optional[List[str]]:
+        """第一行非空记录，文件为空时返回 None"""
+        with self._open_for_reading() as file:
+            for row in csv.reader(file):
+                if not _is_blank(row):
+                    return row
+        return None
+
+    def header_status(self) -> str:
+        first_row = self.read_first_row()
+        if first_row is None:
+            return HEADER_EMPTY
+        return HEADER_STANDARD if self.schema.is_header(first_row) else HEADER_MISSING
+
+    # --- 读取 ---
+    def iter_rows(self, typed: bool = False, start: int = 0, stop: Optional[int] = None) -> Iterator[list]:
+        """
+        逐行读取数据，跳过标准表头和空行；严格模式下列数不对时抛出 TableFormatError。
+        start / stop 限定读取原文件的字节范围，例如 iter_rows(start=stamp.size) 只读取版本 stamp 之后追加的行
+        （start 不为 0 时没有表头）。
+        """
+        schema = self.schema
+        with self._open_for_reading(start, stop) as file:
+            seen_first_row = start > 0
+            for line_number, row in enumerate(csv.reader(file), start=1):
+                if _is_blank(row):
+                    continue
+                if not seen_first_row:
+                    seen_first_row = True
+                    if schema.is_header(row):
+                        continue
+                schema.check_row(row, line_number)
+                yield schema.parse_row(row) if typed else row
+
+    def iter_chunks(self, chunk_rows: int = DEFAULT_CHUNK_ROWS, typed: bool = False) -> Iterator[List[list]]:
+        """按 chunk_rows 行一块读取，内存占用与文件大小无关"""
+        chunk = []
+        for row in self.iter_rows(typed):
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def count_rows(self) -> int:
+        return sum(1 for _ in self.iter_rows())
+
+    def read_frame(self, usecols: Optional[Sequence[int]] = None):
+        """
+        用 pandas 一次解析整个文件，所有列都是 str。返回 (DataFrame, 表头状态)。
+        列名总是 schema 中的列名；严格模式下列数不对时抛出 TableFormatError。
+        只读取开始时文件中已有的内容，对应的版本保存在 last_stamp 中。
+        """
+        import pandas as pd
+        names = self.schema.names if usecols is None else [self.schema.names[index] for index in usecols]
+        stamp = self.last_stamp = self.stamp()
+        if stamp is None or stamp.size == 0:
+            return pd.DataFrame(columns=names), HEADER_EMPTY
+        status = self.header_status()
+        if status == HEADER_EMPTY:
+            return pd.DataFrame(columns=names), HEADER_EMPTY
+        try: # 压缩文件交给 pandas 一个边读边解压的文件对象，所有帧依次解压
+            with self._open_binary_for_reading(stop=stamp.size) as file:
+                frame = pd.read_csv(file, dtype=str, header=0 if status == HEADER_STANDARD else None,
+                                    index_col=False, usecols=usecols, encoding=TABLE_ENCODING,
+                                    keep_default_na=False, skip_blank_lines=True)
+        except pd.errors.EmptyDataError: # 只有表头
+            return pd.DataFrame(columns=names), status
+        if usecols is None and self.schema.strict_width and frame.shape[1] != len(self.schema):
+            raise TableFormatError(f"文件格式错误：应包含 {len(self.schema)} 列数据。")
+        if frame.shape[1] == len(names):
+            frame.columns = names
+        return frame, status
+
+    # --- 写入 ---
+    def append_rows(self, rows: Iterable[Sequence[str]]) -> int:
+        """
+        把行追加到文件末尾；文件不存在或为空时先写入表头，原文件末尾缺少换行时先补上。返回追加的行数。
+        每 DEFAULT_CHUNK_ROWS 行编码为一块，用一次 O_APPEND 写入：多个程序同时追加时记录不会交错，
+        追加之间也不互相等待（共享锁只与重写最后替换文件的一瞬间互斥）。
+        压缩文件的每一块压缩为一个独立的帧，不需要解压已有内容。
+        """
+        appended = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= DEFAULT_CHUNK_ROWS:
+                appended += self._append_chunk(chunk)
+                chunk = []
+        if chunk or not appended: # 没有行时也为新文件写入表头
+            appended += self._append_chunk(chunk)
+        return appended
+
+    def _append_chunk(self, rows: List[Sequence[str]]) -> int:
+        if self.is_empty(): # 表头只能写一次：两个程序同时创建文件时由独占锁决定谁来写
+            with self.lock.exclusive():
+                if self.is_empty():
+                    return self._write_records(self.file_path, self.codec, rows, header=True)
+        with self.lock.shared():
+            return self._write_records(self.file_path, self.codec, rows, header=False)
+
+    def _write_records(self, file_path: str, codec: Optional[str], rows: Iterable[Sequence[str]], header: bool) -> int:
+        """把 rows 编码（和压缩）后一次追加到 file_path 末尾"""
+        buffer = io.StringIO(newline="")
+        if not header and codec is None and self._needs_newline(file_path):
+            buffer.write("\r\n") # csv 模块默认的行结束符
+        # 压缩文件不解压就看不到最后一个字节；csv.writer 写入的每一帧都以换行结束，不需要补
+        writer = csv.writer(buffer)
+        if header:
+            writer.writerow(self.schema.names)
+        written = 0
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+        # 只有文件开头写入 BOM（utf-8-sig）；追加的内容（包括压缩文件的新帧）不能以 BOM 开头
+        data = compress_bytes(buffer.getvalue().encode(TABLE_ENCODING if header else _APPEND_ENCODING), codec)
+        fd = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        return written
+
+    @staticmethod
+    def _needs_newline(file_path: str) -> bool:
+        with open(file_path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) not in (b"\n", b"\r")
+
+    def rewrite_rows(self, rows: Iterable[Sequence[str]], expected: Optional[FileStamp] = None,
+                     on_replaced: Optional[Callable[[], None]] = None) -> int:
+        """
+        用 rows 替换整个文件（含表头）。先写临时文件，成功后再替换，中途失败不会损坏原文件。
+        expected 是 rows 所依据的文件版本，on_replaced 在替换后、释放独占锁之前调用（见 _write_atomically）。
+        """
+        written = 0
+
+        def write(file):
+            nonlocal written
+            writer = csv.writer(file)
+            writer.writerow(self.schema.names)
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+        self._write_atomically(write, expected, on_replaced)
+        return written
+
+    def write_frame(self, frame, expected: Optional[FileStamp] = None) -> int:
+        """把 DataFrame 原子地写入文件（列名写为 schema 中的列名）；expected 同 rewrite_rows"""
+        self._write_atomically(lambda file: frame.to_csv(file, index=False, header=self.schema.names), expected)
+        return len(frame)
+
+    def _write_atomically(self, write: Callable, expected: Optional[FileStamp] = None,
+                          on_replaced: Optional[Callable[[], None]] = None):
+        """
+        临时文件沿用原文件的压缩格式（新文件按扩展名）。写临时文件时不加锁，只在替换时持有独占锁，
+        追加不会被长时间的重写阻塞。替换前检查文件相对 expected（默认为开始写入时的版本）的变化：
+        只是被追加时，把追加的记录带到新文件末尾；被重写过时抛出 TableConflictError，原文件保持不变。
+        last_stamp 设为新文件不含带过来的记录时的版本，调用方之后可以用 iter_rows(start=last_stamp.size) 读到它们。
+        on_replaced 仍在独占锁内执行，用于更新与文件内容对应的旁路文件（例如按行号记录的修改日志）：
+        在共享锁下写入旁路文件的程序不会夹在替换文件和更新旁路文件之间。
+        """
+        base = self.stamp() if expected is None else expected
+        codec = self.codec
+        tmp_path = f"{self.file_path}.{os.getpid()}.tmp" # 每个进程各自的临时文件
+        try:
+            with open_text(tmp_path, "w", codec, TABLE_ENCODING) as file:
+                write(file)
+            written = file_stamp(tmp_path)
+            with self.lock.exclusive():
+                current = self.stamp()
+                change = change_between(base, current) if base is not None else CHANGE_NONE
+                if base is None and current is not None and current.size:
+                    change = CHANGE_REPLACED # 写入期间别人创建了同一个文件
+                if change == CHANGE_REPLACED:
+                    raise TableConflictError(f"文件已被其他程序修改: {self.file_path}")
+                if change == CHANGE_APPENDED:
+                    self._write_records(tmp_path, codec, self._iter_raw_records(base.size, current.size), header=False)
+                os.replace(tmp_path, self.file_path)
+                if on_replaced is not None:
+                    on_replaced()
+            self.last_stamp = written
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _iter_raw_records(self, start: int, stop: int) -> Iterator[List[str]]:
+        """[start, stop) 字节中的非空记录，不检查列数：带到新文件的记录原样保留"""
+        with self._open_for_reading(start, stop) as file:
+            for row in csv.reader(file):
+                if not _is_blank(row):
+                    yield row
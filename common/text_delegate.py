@@ -0,0 +1,186 @@
+# common/text_delegate.py
+"""
+自动换行的表格文本委托，word_recorder 的词表预览与 Bogapp 的日志表格共用。
+每个单元格的排版结果（QTextLayout 与高度）按 (行, 列, 宽度, 字体) 缓存在有界的 LRU 中，
+绘制和计算行高都只排版一次；数据、字体或列宽变化时缓存失效。
+行高只为可见的行按内容调整，大表格滚动时不会逐行测量整个表格。
+"""
+from collections import OrderedDict
+from typing import Tuple
+
+from PySide6.QtCore import QEvent, QObject, QPointF, QRectF, QSize, Qt, QTimer, Slot
+from PySide6.QtGui import QFont, QFontMetricsF, QPalette, QTextLayout, QTextOption
+from PySide6.QtWidgets import (QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem, QTableView,
+                               QToolTip)
+
+DEFAULT_CACHE_SIZE = 4096 # 缓存的单元格排版数，远多于一屏可见的单元格
+DEFAULT_MAX_LINES = 6     # 一个单元格最多显示的行数，超出的部分在鼠标悬停提示中显示
+CELL_PADDING = 4
+_LINE_SEPARATOR = "\u2028" # QTextLayout 不把 "\n" 当作换行
+
+
+class CachedTextDelegate(QStyledItemDelegate):
+    def __init__(self, view: QTableView, max_lines: int = DEFAULT_MAX_LINES, cache_size: int = DEFAULT_CACHE_SIZE):
+        super().__init__(view)
+        self._view = view
+        self.max_lines = max_lines
+        self.cache_size = cache_size
+        self._layouts: "OrderedDict[tuple, Tuple[str, QTextLayout, float]]" = OrderedDict() # 键 -> (文本, 排版, 高度)
+        self._model = None
+        self._fitted_rows = set() # 已按内容调整过行高的行
+        self.hits = 0
+        self.misses = 0
+
+        self._fit_timer = QTimer(self)
+        self._fit_timer.setSingleShot(True)
+        self._fit_timer.setInterval(0) # 合并同一轮事件中的多次滚动 / 列宽变化
+        self._fit_timer.timeout.connect(self.fit_visible_rows)
+
+        view.setItemDelegate(self)
+        view.verticalScrollBar().valueChanged.connect(self._schedule_fit)
+        view.horizontalHeader().sectionResized.connect(self._refit)
+        view.installEventFilter(self)
+        view.viewport().installEventFilter(self)
+
+    # --- 缓存 ---
+    def invalidate(self, *_):
+        self._layouts.clear()
+        self._fitted_rows.clear()
+        self._fit_timer.start()
+
+    def _schedule_fit(self, *_):
+        self._fit_timer.start()
+
+    def _refit(self, *_):
+        """列宽或字体变化：排版缓存按宽度和字体区分不需要清空，但所有行高都要重新调整"""
+        self._fitted_rows.clear()
+        self._fit_timer.start()
+
+    def _watch_model(self, model):
+        """视图换了模型时改为监听新模型的变化（各个视图的 set_model 不需要通知委托）"""
+        if model is self._model:
+            return
+        if self._model is not None:
+            for signal in self._model_signals(self._model):
+                signal.disconnect(self.invalidate)
+        self._model = model
+        for signal in self._model_signals(model):
+            signal.connect(self.invalidate)
+        self._layouts.clear()
+        self._fitted_rows.clear()
+
+    @staticmethod
+    def _model_signals(model):
+        return (model.modelReset, model.layoutChanged, model.dataChanged, model.rowsInserted, model.rowsRemoved)
+
+    def _text_width(self, column: int) -> int:
+        return max(self._view.columnWidth(column) - 2 * CELL_PADDING, 1)
+
+    def _layout_for(self, index, text: str, font: QFont, width: int) -> Tuple[QTextLayout, float]:
+        self._watch_model(index.model())
+        key = (index.row(), index.column(), width, font.key())
+        entry = self._layouts.get(key)
+        if entry is not None and entry[0] == text: # 文本不同说明行号已指向别的数据
+            self._layouts.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+        self.misses += 1
+
+        layout = QTextLayout(text.replace("\r\n", _LINE_SEPARATOR).replace("\n", _LINE_SEPARATOR), font)
+        option = QTextOption()
+        option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        layout.setTextOption(option)
+        height = 0.0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+        layout.endLayout()
+
+        self._layouts[key] = (text, layout, height)
+        if len(self._layouts) > self.cache_size:
+            self._layouts.popitem(last=False)
+        return layout, height
+
+    def _max_text_height(self, font: QFont) -> float:
+        return QFontMetricsF(font).lineSpacing() * self.max_lines
+
+    # --- QStyledItemDelegate ---
+    def sizeHint(self, option: QStyleOptionViewItem, index) -> QSize:
+        text = index.data(Qt.ItemDataRole.DisplayRole)
+        if text is None:
+            return super().sizeHint(option, index)
+        width = self._text_width(index.column())
+        _, height = self._layout_for(index, str(text), option.font, width)
+        height = min(height, self._max_text_height(option.font))
+        return QSize(width + 2 * CELL_PADDING, int(height + 0.999) + 2 * CELL_PADDING)
+
+    def paint(self, painter, option: QStyleOptionViewItem, index):
+        background = QStyleOptionViewItem(option)
+        self.initStyleOption(background, index) # 顺便取到显示的文字，不再单独向模型要一次
+        if not background.features & QStyleOptionViewItem.ViewItemFeature.HasDisplay:
+            super().paint(painter, option, index)
+            return
+        text = background.text
+        background.text = "" # 背景、选中状态和焦点框交给样式（包括 QSS）绘制，文字由缓存的排版绘制
+        widget = background.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, background, painter, widget)
+
+        rect = option.rect.adjusted(CELL_PADDING, CELL_PADDING, -CELL_PADDING, -CELL_PADDING)
+        layout, height = self._layout_for(index, text, option.font, self._text_width(index.column()))
+        top = rect.top() + max((rect.height() - height) / 2, 0) # 一行的文字在行高中垂直居中
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        role = QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text
+        painter.setPen(option.palette.color(role))
+        layout.draw(painter, QPointF(rect.left(), top), [], QRectF(rect)) # 超出单元格的行被裁掉
+
+    def helpEvent(self, event, view, option, index) -> bool:
+        """显示不下的单元格在鼠标悬停时显示全文（模型自己提供提示文字时用模型的）"""
+        if event.type() == QEvent.Type.ToolTip and index.isValid() and index.data(Qt.ItemDataRole.ToolTipRole) is None:
+            text = index.data(Qt.ItemDataRole.DisplayRole)
+            if text is not None:
+                _, height = self._layout_for(index, str(text), option.font, self._text_width(index.column()))
+                if height > option.rect.height() - 2 * CELL_PADDING:
+                    QToolTip.showText(event.globalPos(), str(text), view)
+                    return True
+        return super().helpEvent(event, view, option, index)
+
+    # --- 行高 ---
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() in (QEvent.Type.FontChange, QEvent.Type.StyleChange):
+            self._refit() # 排版缓存按字体区分，只需要重新调整行高
+        elif event.type() == QEvent.Type.Resize and watched is self._view.viewport():
+            self._schedule_fit()
+        return False
+
+    @Slot()
+    def fit_visible_rows(self):
+        """按内容调整当前可见的行的行高；停在底部时保持在底部"""
+        view = self._view
+        model = view.model()
+        if model is None or model.rowCount() == 0:
+            return
+        first = view.rowAt(0)
+        if first < 0:
+            return
+        last = view.rowAt(view.viewport().height() - 1)
+        last = model.rowCount() - 1 if last < 0 else last
+        scroll_bar = view.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum() and scroll_bar.maximum() > 0
+        changed = False
+        for row in range(first, last + 1):
+            if row in self._fitted_rows:
+                continue
+            self._fitted_rows.add(row)
+            old_height = view.rowHeight(row)
+            view.resizeRowToContents(row)
+            changed = changed or view.rowHeight(row) != old_height
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+        if changed: # 行高变化后可能有新的行进入视野，下一轮事件循环再调整它们
+            self._fit_timer.start()
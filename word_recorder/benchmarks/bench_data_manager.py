@@ -0,0 +1,144 @@
+# word_recorder/benchmarks/bench_data_manager.py
+"""
+DataManager 与 WordListModel 的规模基准测试（无界面运行）。
+
+    python benchmarks/bench_data_manager.py                       # 1k / 10k / 100k / 1M
+    python benchmarks/bench_data_manager.py --sizes 1000 10000 --save-baseline base.json
+    python benchmarks/bench_data_manager.py --baseline base.json  # 有回归时退出码为 1
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+from bench_utils import add_common_arguments, finish, make_word_rows, measure, write_word_csv
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication, QAbstractItemView
+
+from core.data_manager import DataManager
+from core.word_clean import clean_words
+from models.word_list_model import WordListModel
+from tabs.preview_tab import PreviewTab
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+ADD_WORD_CALLS = 20
+REVIEW_CALLS = 1000
+MODEL_DATA_CALLS = 20000
+SCROLL_PAGES = 50
+FUZZY_QUERIES = 200
+
+
+def bench_size(size: int, work_dir: str, repeat: int) -> dict:
+    results = {}
+    csv_path = os.path.join(work_dir, f"words_{size}.csv")
+    write_word_csv(csv_path, make_word_rows(size))
+
+    manager = DataManager()
+    results[f"load_csv/{size}"] = measure(lambda: manager.load_csv(csv_path), repeat)
+
+    save_path = os.path.join(work_dir, f"saved_{size}.csv")
+    results[f"save_csv/{size}"] = measure(lambda: manager.save_csv(save_path), repeat)
+
+    loaded = manager.get_data()
+
+    def reset_data():
+        manager.dataframe = loaded
+
+    def add_words():
+        for index in range(ADD_WORD_CALLS):
+            manager.add_word(f"bench{index}", "基准测试 benchmark")
+    results[f"add_word x{ADD_WORD_CALLS}/{size}"] = measure(add_words, repeat, setup=reset_data)
+    reset_data()
+
+    def review_words():
+        # 取出下一个单词并评分；每次评分都会向 <词表>.review 追加一行
+        for index in range(REVIEW_CALLS):
+            word, _, _ = manager.get_next_review_word()
+            manager.record_review(word, 5 if index % 3 else 1)
+    results[f"review x{REVIEW_CALLS}/{size}"] = measure(review_words, repeat)
+
+    results.update(bench_fuzzy_index(manager, size, repeat))
+    results.update(bench_clean_words(loaded, size, repeat))
+
+    model = WordListModel(manager.get_data())
+    rng = random.Random(size)
+    indexes = [model.index(rng.randrange(size), 0) for _ in range(MODEL_DATA_CALLS)]
+    results[f"model.data x{MODEL_DATA_CALLS}/{size}"] = measure(
+        lambda: [model.data(index, Qt.ItemDataRole.DisplayRole) for index in indexes], repeat)
+
+    results[f"model.set_data/{size}"] = measure(lambda: model.set_data(manager.get_data()), repeat)
+
+    results[f"view_scroll x{SCROLL_PAGES} pages/{size}"] = bench_view_scroll(model, size, repeat)
+    return results
+
+
+def bench_fuzzy_index(manager: DataManager, size: int, repeat: int) -> dict:
+    """建立模糊索引的耗时，以及对（故意拼错的）单词的查询耗时；后者不应随词表变大而明显增长"""
+    results = {}
+    index = manager.fuzzy_index
+    words = manager.get_data()[manager.get_columns()[0]]
+    results[f"fuzzy_index.build/{size}"] = measure(lambda: len(index), repeat, setup=lambda: index.reset(words))
+
+    rng = random.Random(size)
+    queries = []
+    for word in words.sample(FUZZY_QUERIES, replace=True, random_state=size):
+        position = rng.randrange(len(word))
+        queries.append(word[:position] + word[position + 1:]) # 删掉一个字母
+    results[f"fuzzy_query x{FUZZY_QUERIES}/{size}"] = measure(lambda: [index.query(query) for query in queries], repeat)
+    return results
+
+
+def bench_clean_words(loaded, size: int, repeat: int) -> dict:
+    """整理词表：干净的词表，以及十分之一的行换成大写、全角空白后重复出现的词表"""
+    import pandas as pd
+    messy = loaded.sample(frac=0.1, random_state=size)
+    messy = pd.concat([loaded, messy.assign(**{messy.columns[0]: "\u3000" + messy.iloc[:, 0].str.upper()})],
+                      ignore_index=True)
+    return {
+        f"clean_words/{size}": measure(lambda: clean_words(loaded), repeat),
+        f"clean_words messy/{size}": measure(lambda: clean_words(messy, "concat"), repeat),
+    }
+
+
+def bench_view_scroll(model: WordListModel, size: int, repeat: int) -> dict:
+    """在 PreviewTab 中逐页向下滚动并强制重绘，包含视图对模型的全部查询"""
+    tab = PreviewTab()
+    tab.resize(800, 600)
+    tab.set_model(model)
+    tab.show()
+    QApplication.processEvents()
+    view = tab.table_view
+    step = max(size // SCROLL_PAGES, 1)
+
+    def scroll():
+        for page in range(SCROLL_PAGES):
+            view.scrollTo(model.index(min(page * step, size - 1), 0), QAbstractItemView.ScrollHint.PositionAtTop)
+            view.viewport().repaint()
+
+    result = measure(scroll, repeat, setup=lambda: view.scrollToTop())
+    tab.close()
+    tab.deleteLater()
+    QApplication.processEvents()
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="DataManager / WordListModel 基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="word_recorder_bench_") as work_dir:
+        for size in args.sizes:
+            print(f"运行 {size} 行...", flush=True)
+            results.update(bench_size(size, work_dir, args.repeat))
+    return finish(args, results, "data_manager")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# word_recorder/benchmarks/bench_memory.py
+"""
+内存增长回归测试：无界面地反复执行 打开词表 / 新建词表 / 添加单词 的循环（以及 Bogapp 的视图切换），
+用 tracemalloc 比较预热后与全部循环后的快照，报告增长最多的代码位置；
+每个循环保留的内存超过阈值时退出码为 1。文件对话框和消息框被替换为直接返回，设置和数据都在临时目录中。
+
+    python benchmarks/bench_memory.py                          # 各 200 个循环
+    python benchmarks/bench_memory.py --cycles 500 --top 20
+    python benchmarks/bench_memory.py --threshold 1024         # 每个循环最多保留 1 KiB
+    python benchmarks/bench_memory.py --baseline base.json     # 耗时 / 峰值内存有回归时退出码为 1
+
+tracemalloc 只跟踪 Python 分配的内存；Qt 对象自身（C++ 部分）的泄漏表现为其 Python 包装对象被保留。
+"""
+import argparse
+import datetime
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, List
+from unittest import mock
+
+from bench_utils import REPO_ROOT, add_common_arguments, finish, make_word_rows, write_word_csv
+
+from PySide6.QtCore import QCoreApplication, QEvent, QSettings
+from PySide6.QtWidgets import QApplication, QFileDialog, QMessageBox
+
+from main_window import MainWindow
+
+DEFAULT_CYCLES = 200
+WARMUP_CYCLES = 10 # 预热循环不计入：首次创建的缓存、延迟导入的模块等属于一次性开销
+DEFAULT_THRESHOLD_BYTES = 2048 # 每个循环允许保留的内存
+DEFAULT_TOP = 10
+TRACEBACK_FRAMES = 8
+LIST_ROWS = 2000
+WORDS_PER_CYCLE = 3
+LOG_ROWS = 500
+
+
+@contextmanager
+def headless_dialogs(save_path_for: Callable[[], str], open_path_for: Callable[[], str]):
+    """把文件对话框和消息框替换为不弹窗、直接返回的版本（未保存的更改一律放弃）。
+    不使用 Mock 对象：它们会记录每一次调用，本身就是测试要找的那种增长"""
+    buttons = QMessageBox.StandardButton
+    replacements = [(QFileDialog, "getSaveFileName", lambda *args, **kwargs: (save_path_for(), "")),
+                    (QFileDialog, "getOpenFileName", lambda *args, **kwargs: (open_path_for(), ""))]
+    for name, button in (("information", buttons.Ok), ("critical", buttons.Ok),
+                         ("warning", buttons.Discard), ("question", buttons.Yes)):
+        replacements.append((QMessageBox, name, lambda *args, button=button, **kwargs: button))
+    with ExitStack() as stack:
+        for owner, name, replacement in replacements:
+            stack.enter_context(mock.patch.object(owner, name, new=replacement))
+        yield
+
+
+def settle():
+    """处理排队的事件和 deleteLater，再回收循环引用，让快照只包含真正被保留的对象"""
+    QApplication.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    QApplication.processEvents()
+    gc.collect()
+
+
+def measure_growth(cycle: Callable[[int], None], cycles: int, top: int) -> Dict[str, object]:
+    """预热后运行 cycles 个循环，返回耗时、峰值内存、每个循环保留的字节数和增长最多的位置"""
+    for index in range(WARMUP_CYCLES):
+        cycle(index)
+    settle()
+
+    tracemalloc.start(TRACEBACK_FRAMES)
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        for index in range(WARMUP_CYCLES, WARMUP_CYCLES + cycles):
+            cycle(index)
+        elapsed = time.perf_counter() - started
+        settle()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+    before, after = before.filter_traces(filters), after.filter_traces(filters)
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    top_stats = [stat for stat in after.compare_to(before, "traceback") if stat.size_diff > 0][:top]
+    return {"seconds": elapsed, "peak_bytes": peak, "retained_bytes_per_cycle": growth / cycles,
+            "top_stats": top_stats}
+
+
+def word_recorder_cycle(work_dir: str) -> Callable[[int], None]:
+    """打开一个已有的词表、添加单词、新建词表、再添加单词；预览页显示着，模型每次都会重置"""
+    source_path = os.path.join(work_dir, "words.csv")
+    write_word_csv(source_path, make_word_rows(LIST_ROWS))
+    new_path = os.path.join(work_dir, "new.csv")
+
+    window = MainWindow()
+    window.resize(900, 600)
+    window.show()
+    window.tab_widget.setCurrentWidget(window._ensure_preview_tab().parentWidget())
+    settle()
+    stack = ExitStack()
+    stack.enter_context(headless_dialogs(lambda: new_path, lambda: source_path))
+
+    def cycle(index: int):
+        window.open_list()
+        for offset in range(WORDS_PER_CYCLE):
+            window._handle_add_word(f"cycle{index}_{offset}", f"第 {index} 轮添加的单词")
+        window.new_list() # 有未保存的更改时放弃
+        for offset in range(WORDS_PER_CYCLE):
+            window._handle_add_word(f"new{index}_{offset}", "新词表中的单词")
+        window.data_manager.is_dirty = False # 下一轮打开时不提示保存
+        QApplication.processEvents()
+
+    cycle.close = lambda: (window.close(), stack.close())
+    return cycle
+
+
+def bogapp_cycle(work_dir: str) -> Callable[[int], None]:
+    """在输入页、日志表格和统计页之间切换；每次进入表格都会重新建立分区的行索引"""
+    bogapp_dir = os.path.join(REPO_ROOT, "Bogapp")
+    if bogapp_dir not in sys.path:
+        sys.path.append(bogapp_dir) # 放在最后：模块名与 word_recorder 不重叠
+    from blog_storage import BlogStorage, format_date_range
+    from blogapp import BlogApp
+
+    # BlogApp 在当前目录中读写 blogs/
+    os.chdir(work_dir)
+    storage = BlogStorage("blogs", legacy_csv=None)
+    storage.open()
+    first_day = datetime.date(2024, 1, 1)
+    days = [first_day + datetime.timedelta(days=index) for index in range(LOG_ROWS)]
+    storage.append_rows([format_date_range(day, day), f"任务 {index}", f"备注 {index}"] for index, day in enumerate(days))
+
+    window = BlogApp()
+    window.resize(850, 700)
+    window.show()
+    settle()
+    stack = ExitStack()
+    stack.enter_context(headless_dialogs(lambda: "", lambda: ""))
+
+    def cycle(index: int):
+        window._toggle_view() # 输入页 -> 表格
+        QApplication.processEvents()
+        window._toggle_view() # 表格 -> 输入页
+        window._show_stats_view()
+        QApplication.processEvents()
+        window._toggle_view() # 统计页 -> 输入页
+        QApplication.processEvents()
+
+    cycle.close = lambda: (window.close(), stack.close())
+    return cycle
+
+
+def print_top_stats(name: str, growth: Dict[str, object]):
+    print(f"\n{name}：每个循环保留 {growth['retained_bytes_per_cycle']:.0f} 字节，增长最多的位置：")
+    if not growth["top_stats"]:
+        print("  （没有增长）")
+    for stat in growth["top_stats"]:
+        frames = list(reversed(stat.traceback)) # traceback 从最外层的调用开始排列
+        print(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+7d} 块  {frames[0].filename}:{frames[0].lineno}")
+        for caller in frames[1:4]:
+            print(f"  {'':31}  由 {caller.filename}:{caller.lineno}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="反复 打开 / 新建 / 添加 的内存增长回归测试")
+    parser.add_argument("--cycles", type=int, default=DEFAULT_CYCLES)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD_BYTES,
+                        help=f"每个循环允许保留的字节数（默认 {DEFAULT_THRESHOLD_BYTES}）")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="报告增长最多的位置数")
+    parser.add_argument("--skip-bogapp", action="store_true", help="不测试 Bogapp 的视图切换")
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    retained: Dict[str, float] = {}
+    scenarios: List[tuple] = [("open_new_add", word_recorder_cycle)]
+    if not args.skip_bogapp:
+        scenarios.append(("bogapp_toggle", bogapp_cycle))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="word_recorder_bench_") as work_dir:
+        # 使用临时的设置文件，不读写用户真实的主题 / 上次打开的文件
+        QSettings.setDefaultFormat(QSettings.Format.IniFormat)
+        for settings_format in (QSettings.Format.NativeFormat, QSettings.Format.IniFormat):
+            QSettings.setPath(settings_format, QSettings.Scope.UserScope, os.path.join(work_dir, "settings"))
+        try:
+            for scenario, make_cycle in scenarios:
+                print(f"运行 {scenario} x{args.cycles}...", flush=True)
+                scenario_dir = os.path.join(work_dir, scenario)
+                os.makedirs(scenario_dir)
+                cycle = make_cycle(scenario_dir)
+                try:
+                    growth = measure_growth(cycle, args.cycles, args.top)
+                finally:
+                    cycle.close()
+                    settle()
+                name = f"{scenario} x{args.cycles}"
+                results[name] = {"seconds": growth["seconds"], "peak_bytes": growth["peak_bytes"]}
+                retained[name] = growth["retained_bytes_per_cycle"]
+                print_top_stats(name, growth)
+        finally:
+            os.chdir(cwd)
+    print()
+
+    status = finish(args, results, "memory")
+    over_threshold = {name: value for name, value in retained.items() if value > args.threshold}
+    if over_threshold:
+        print(f"\n每个循环保留的内存超出阈值 {args.threshold:.0f} 字节：")
+        for name, value in sorted(over_threshold.items()):
+            print(f"  {name}: {value:.0f} 字节")
+        return 1
+    print(f"\n每个循环保留的内存均在阈值 {args.threshold:.0f} 字节以内。")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# word_recorder/benchmarks/bench_startup.py
+"""
+冷启动基准测试：从启动 Python 进程到主窗口第一次绘制（time-to-first-paint）的耗时，
+以及自动加载上次打开的词表完成的耗时。每次测量都在新的子进程中进行，设置保存在临时目录中，不影响真实配置。
+
+    python benchmarks/bench_startup.py                       # 没有上次词表 / 自动加载 100k 行词表
+    python benchmarks/bench_startup.py --budget 2.0          # 首次绘制超出预算（秒）时退出码为 1
+    python benchmarks/bench_startup.py --baseline base.json  # 有回归时退出码为 1
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# 这里只导入标准库：子进程的导入耗时就是被测量的对象
+from bench_utils import WORD_RECORDER_DIR, add_common_arguments, finish, make_word_rows, write_word_csv
+
+STARTUP_BUDGET_SECONDS = 2.0 # 普通 Linux 机器上从启动进程到首次绘制的预算
+AUTOLOAD_ROWS = 100000
+READY_TIMEOUT_SECONDS = 60
+
+
+def run_child(expect_words: int):
+    """子进程：与 main.py 相同的启动过程，在首次绘制和自动加载完成时向 stdout 报告"""
+    import resource
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)
+    from main_window import MainWindow
+
+    def report(event: str):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 # Linux 上 ru_maxrss 的单位是 KiB
+        print(f"{event} {peak}", flush=True)
+
+    def check_ready():
+        if window.data_manager.get_word_count() >= expect_words:
+            report("ready")
+            os._exit(0) # 不需要正常退出，省去析构的时间
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Type.Paint:
+                app.removeEventFilter(self)
+                report("first_paint")
+                poll.start()
+            return False
+
+    poll = QTimer()
+    poll.setInterval(5)
+    poll.timeout.connect(check_ready)
+    paint_filter = FirstPaintFilter()
+    app.installEventFilter(paint_filter)
+    window = MainWindow()
+    window.show()
+    app.exec()
+
+
+def measure_startup(config_dir: str, expect_words: int, repeat: int) -> dict:
+    """运行 repeat 次子进程，返回各事件最快一次的耗时（从启动子进程开始计时）及当时的常驻内存峰值"""
+    env = dict(os.environ, XDG_CONFIG_HOME=config_dir, QT_QPA_PLATFORM="offscreen")
+    best = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", str(expect_words)],
+                                 cwd=WORD_RECORDER_DIR, env=env, stdout=subprocess.PIPE, text=True)
+        try:
+            for line in child.stdout:
+                event, peak = line.split()
+                elapsed = time.perf_counter() - started
+                if event not in best or elapsed < best[event]["seconds"]:
+                    best[event] = {"seconds": elapsed, "peak_bytes": int(peak)}
+                if event == "ready":
+                    break
+            child.wait(READY_TIMEOUT_SECONDS)
+        finally:
+            if child.poll() is None:
+                child.kill()
+    return best
+
+
+def write_settings(config_dir: str, last_file: str = ""):
+    """用 SettingsManager 把上次打开的文件写入 config_dir 中的设置（子进程通过 XDG_CONFIG_HOME 读取同一个文件）"""
+    from PySide6.QtCore import QCoreApplication, QSettings
+    from core.settings_manager import SettingsManager
+    app = QCoreApplication.instance() or QCoreApplication([]) # SettingsManager 的延迟写回定时器需要事件循环对象
+    QSettings.setPath(QSettings.Format.NativeFormat, QSettings.Scope.UserScope, config_dir)
+    settings_manager = SettingsManager()
+    settings_manager.save_last_opened_file(last_file or None)
+    settings_manager.flush()
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--child"]:
+        run_child(int(argv[1]))
+        return 0
+
+    parser = argparse.ArgumentParser(description="冷启动（首次绘制）基准测试")
+    parser.add_argument("--rows", type=int, default=AUTOLOAD_ROWS, help="自动加载的词表行数")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS, help="首次绘制的耗时预算（秒）")
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="word_recorder_bench_") as work_dir:
+        config_dir = os.path.join(work_dir, "config")
+        write_settings(config_dir)
+        print("运行 无上次词表...", flush=True)
+        for event, metrics in measure_startup(config_dir, 0, args.repeat).items():
+            results[f"{event}/empty"] = metrics
+
+        csv_path = os.path.join(work_dir, f"words_{args.rows}.csv")
+        write_word_csv(csv_path, make_word_rows(args.rows))
+        write_settings(config_dir, csv_path)
+        print(f"运行 自动加载 {args.rows} 行...", flush=True)
+        for event, metrics in measure_startup(config_dir, args.rows, args.repeat).items():
+            results[f"{event}/autoload {args.rows}"] = metrics
+
+    status = finish(args, results, "startup")
+    over_budget = {name: metrics["seconds"] for name, metrics in results.items()
+                   if name.startswith("first_paint/") and metrics["seconds"] > args.budget}
+    if over_budget:
+        print(f"\n首次绘制超出预算 {args.budget:.2f} s：")
+        for name, seconds in sorted(over_budget.items()):
+            print(f"  {name}: {seconds:.3f} s")
+        return 1
+    print(f"\n首次绘制均在预算 {args.budget:.2f} s 以内。")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# word_recorder/benchmarks/bench_theme_switch.py
+"""
+切换主题 / 字号的延迟基准测试：主窗口显示一个大词表的 PreviewTab（无界面运行）。
+
+    python benchmarks/bench_theme_switch.py                       # 10k / 100k / 1M
+    python benchmarks/bench_theme_switch.py --baseline base.json  # 有回归时退出码为 1
+"""
+import argparse
+import sys
+import tempfile
+
+from bench_utils import add_common_arguments, finish, make_word_rows, measure
+
+import pandas as pd
+from PySide6.QtCore import QSettings
+from PySide6.QtWidgets import QApplication
+
+from core.word_store import WORD_LIST_COLUMNS
+from main_window import MainWindow
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+SWITCHES = 10
+FONT_SIZES = ["small", "medium", "large"]
+
+
+def bench_size(window: MainWindow, size: int, repeat: int) -> dict:
+    results = {}
+    dataframe = pd.DataFrame(make_word_rows(size), columns=WORD_LIST_COLUMNS)
+    window.data_manager.dataframe = dataframe
+    window.tab_widget.setCurrentWidget(window._ensure_preview_tab().parentWidget())
+    window.word_model.set_data(dataframe)
+    QApplication.processEvents()
+
+    def toggle_theme():
+        for _ in range(SWITCHES):
+            window.toggle_theme()
+            QApplication.processEvents() # 包含切换后的重绘
+    results[f"toggle_theme x{SWITCHES}/{size}"] = measure(toggle_theme, repeat)
+
+    def cycle_font_size():
+        for index in range(SWITCHES):
+            window.update_font_size(FONT_SIZES[index % len(FONT_SIZES)])
+            QApplication.processEvents()
+    results[f"font_size x{SWITCHES}/{size}"] = measure(cycle_font_size, repeat)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="主题 / 字号切换基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="word_recorder_bench_") as settings_dir:
+        # 使用临时的设置文件，不读写用户真实的主题 / 上次打开的文件
+        QSettings.setDefaultFormat(QSettings.Format.IniFormat)
+        for settings_format in (QSettings.Format.NativeFormat, QSettings.Format.IniFormat):
+            QSettings.setPath(settings_format, QSettings.Scope.UserScope, settings_dir)
+        window = MainWindow()
+        window.resize(1000, 700)
+        window.show()
+        for size in args.sizes:
+            print(f"运行 {size} 行...", flush=True)
+            results.update(bench_size(window, size, args.repeat))
+        window.data_manager.is_dirty = False
+        window.close()
+    return finish(args, results, "theme_switch")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# word_recorder/benchmarks/bench_utils.py
+"""基准测试公用工具：无界面 Qt 环境、合成词表、计时/峰值内存测量、结果保存与基线比较"""
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 基准测试总是无界面运行；必须在导入 PySide6 之前设置
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+WORD_RECORDER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(WORD_RECORDER_DIR)
+for _path in (REPO_ROOT, WORD_RECORDER_DIR): # word_recorder 的模块优先，其次是共享的 common 包
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+NOISE_FLOOR_SECONDS = 0.001 # 增长不足 1ms 的耗时变化不算回归，避免微小操作的计时抖动
+
+_LATIN_SYLLABLES = ["re", "ce", "ive", "con", "tion", "pro", "ab", "str", "act", "ing", "ly", "ment", "ex", "pre"]
+_CJK_CHARS = ("的一是不了人我在有他这中大来上国个到说们为子和你地出道也时年得就那要下以生会自着去之过家学对可"
+              "里后小心多天而能好都然没日于起还发成事只作当想看文无开手十用主行方又如前所本见经头面公同")
+
+
+def make_word_rows(count: int, seed: int = 20250604) -> List[Tuple[str, str]]:
+    """生成 count 条 (单词, 释义)：拉丁字母单词 + 中英混合释义，部分释义较长"""
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        word = "".join(rng.choice(_LATIN_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if index % 7 == 0:
+            word = word.capitalize()
+        cjk = "".join(rng.choice(_CJK_CHARS) for _ in range(rng.randint(2, 12)))
+        definition = f"n. {cjk}"
+        if index % 5 == 0:
+            definition += f"；v. {''.join(rng.choice(_CJK_CHARS) for _ in range(rng.randint(4, 30)))} ({word}s)"
+        rows.append((f"{word}{index}", definition))
+    return rows
+
+
+def write_word_csv(file_path: str, rows: List[Tuple[str, str]]):
+    from core.word_store import word_table
+    word_table(file_path).rewrite_rows(rows)
+
+
+def measure(func: Callable[[], object], repeat: int = 3, setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """
+    多次运行 func，返回最快一次的耗时（秒）以及 tracemalloc 观察到的峰值内存（字节）。
+    tracemalloc 会明显拖慢运行，所以峰值内存在额外的一次运行中单独测量。
+    setup 在每次运行前调用，不计入结果。
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def environment_info() -> Dict[str, str]:
+    info = {"python": platform.python_version(), "platform": platform.platform()}
+    for module_name in ("pandas", "numpy", "PySide6"):
+        try:
+            info[module_name] = __import__(module_name).__version__
+        except ImportError:
+            pass
+    return info
+
+
+def save_results(file_path: str, results: Dict[str, Dict[str, float]], suite: str):
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, mode="w", encoding="utf-8") as file:
+        json.dump({"suite": suite, "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                   "environment": environment_info(), "results": results},
+                  file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_results(file_path: str) -> Dict[str, Dict[str, float]]:
+    with open(file_path, mode="r", encoding="utf-8") as file:
+        return json.load(file)["results"]
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                          time_tolerance: float, memory_tolerance: float) -> List[str]:
+    """返回回归描述列表；耗时或峰值内存超过基线 (1 + tolerance) 倍即视为回归"""
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, tolerance in (("seconds", time_tolerance), ("peak_bytes", memory_tolerance)):
+            old, new = previous.get(metric), current.get(metric)
+            if metric == "seconds" and new is not None and old is not None and new - old < NOISE_FLOOR_SECONDS:
+                continue
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(f"{name} {metric}: {old:.6g} -> {new:.6g} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, float]]):
+    width = max((len(name) for name in results), default=10)
+    for name, metrics in sorted(results.items()):
+        print(f"{name:<{width}}  {metrics['seconds'] * 1000:10.2f} ms  {metrics['peak_bytes'] / 1024 / 1024:9.2f} MiB")
+
+
+def add_common_arguments(parser):
+    parser.add_argument("--output", help="结果 JSON 路径（默认 benchmarks/results/<suite>.json）")
+    parser.add_argument("--baseline", help="与之比较的基线 JSON")
+    parser.add_argument("--save-baseline", metavar="PATH", help="同时把本次结果保存为基线")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="允许的耗时增长比例（默认 0.25）")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="允许的峰值内存增长比例（默认 0.10）")
+
+
+def finish(args, results: Dict[str, Dict[str, float]], suite: str) -> int:
+    """打印、保存结果并与基线比较；有回归时返回 1"""
+    print_results(results)
+    output = args.output or os.path.join(RESULTS_DIR, f"{suite}.json")
+    save_results(output, results, suite)
+    print(f"\n结果已保存到 {output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, results, suite)
+        print(f"基线已保存到 {args.save_baseline}")
+    if args.baseline:
+        regressions = compare_with_baseline(results, load_results(args.baseline),
+                                            args.time_tolerance, args.memory_tolerance)
+        if regressions:
+            print("\n发现性能回归：")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\n与基线相比没有发现回归。")
+    return 0
@@ -0,0 +1,179 @@
+# word_recorder/cli.py
+"""
+单词表命令行工具，不导入 PySide6 / pandas，适合 cron 和 shell 管道。
+
+    python cli.py append 词表.csv apple 苹果
+    python cli.py append 词表.csv --stdin < words.csv     # 每行 单词,释义
+    python cli.py query 词表.csv app [--field word] [--regex]
+    python cli.py count 词表.csv
+    python cli.py library 词库目录 [单词 ...]                # 统计目录中的所有词表，或查找单词所在的词表
+    python cli.py merge 合并.csv 词表1.csv 词表2.csv ... [--policy first|last|longest|concat]
+    python cli.py sync 同步目录 词表.csv [词表.csv.review ...]   # 只复制改动过的块
+    python cli.py restore 同步目录 词表.csv [--output 输出.csv]   # 按清单重建词表
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+
+# 仓库根目录下的 common 包由 word_recorder 与 Bogapp 共享
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from core.word_store import WORD_LIST_COLUMNS, append_words, count_words, iter_words
+# 其余子命令用到的模块（进程池、外部排序、分块同步）在各自的 cmd_* 中导入，append / count 等命令不必为它们付出启动时间
+
+
+def cmd_append(args) -> int:
+    if args.stdin:
+        rows = ((row + [""])[:2] for row in csv.reader(sys.stdin)
+                if row and list(row) != WORD_LIST_COLUMNS)
+        rows = ((word.strip(), definition.strip()) for word, definition in rows)
+    else:
+        if not args.word:
+            print("append 需要 单词 [释义] 或 --stdin", file=sys.stderr)
+            return 2
+        rows = [(args.word.strip(), (args.definition or "").strip())]
+    print(append_words(args.file, rows))
+    return 0
+
+
+def cmd_query(args) -> int:
+    if args.regex:
+        pattern = re.compile(args.pattern, re.IGNORECASE)
+        matches = pattern.search
+    else:
+        needle = args.pattern.casefold()
+        matches = lambda text: needle in text.casefold()
+    columns = {"word": (0,), "definition": (1,), "all": (0, 1)}[args.field]
+
+    writer = csv.writer(sys.stdout)
+    if not args.no_header:
+        writer.writerow(WORD_LIST_COLUMNS)
+    shown = 0
+    for row in iter_words(args.file):
+        if any(matches(row[col]) for col in columns):
+            writer.writerow(row)
+            shown += 1
+            if args.limit and shown >= args.limit:
+                break
+    return 0
+
+
+def cmd_count(args) -> int:
+    print(count_words(args.file))
+    return 0
+
+
+def cmd_merge(args) -> int:
+    from core.word_merge import DEFAULT_POLICY, DEFAULT_RUN_ROWS, merge_word_lists
+    read, written = merge_word_lists(args.inputs, args.output, args.policy or DEFAULT_POLICY,
+                                     run_rows=args.run_rows or DEFAULT_RUN_ROWS)
+    print(f"读入 {read} 行，写出 {written} 个单词", file=sys.stderr)
+    return 0
+
+
+def cmd_library(args) -> int:
+    from core.word_library import WordLibrary
+    library = WordLibrary(args.directory)
+    library.refresh(max_workers=args.workers or None)
+    writer = csv.writer(sys.stdout)
+    if not args.words:
+        writer.writerow(["词表", "单词数", "错误"])
+        for library_list in library.lists:
+            writer.writerow([library_list.name, len(library_list.rows), library_list.error or ""])
+        return 0
+    writer.writerow(WORD_LIST_COLUMNS + ["词表", "行号"])
+    for word in args.words:
+        for path, row in library.locate(word):
+            writer.writerow(list(library.entry(path, row)) + [os.path.basename(path), row + 1])
+    return 0
+
+
+def cmd_sync(args) -> int:
+    from common.chunk_sync import sync_file
+    for path in args.files:
+        result = sync_file(path, args.directory)
+        print(f"{os.path.basename(path)}: {result.chunks} 个块，复制 {result.copied} 个"
+              f"（{result.copied_bytes} / {result.total_bytes} 字节）", file=sys.stderr)
+    return 0
+
+
+def cmd_restore(args) -> int:
+    from common.chunk_sync import restore_file, synced_names
+    if args.name not in synced_names(args.directory):
+        print(f"同步目录中没有 {args.name}，已同步的文件: {'、'.join(synced_names(args.directory)) or '无'}",
+              file=sys.stderr)
+        return 1
+    output = args.output or args.name
+    size = restore_file(args.directory, args.name, output)
+    print(f"已恢复 {output}（{size} 字节）", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="单词记录本命令行工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    append_parser = subparsers.add_parser("append", help="追加单词")
+    append_parser.add_argument("file")
+    append_parser.add_argument("word", nargs="?")
+    append_parser.add_argument("definition", nargs="?")
+    append_parser.add_argument("--stdin", action="store_true", help="从标准输入读取 单词,释义 CSV 行")
+    append_parser.set_defaults(func=cmd_append)
+
+    query_parser = subparsers.add_parser("query", help="按文本或正则查询，结果以 CSV 输出")
+    query_parser.add_argument("file")
+    query_parser.add_argument("pattern")
+    query_parser.add_argument("--field", choices=("word", "definition", "all"), default="all")
+    query_parser.add_argument("--regex", action="store_true")
+    query_parser.add_argument("--limit", type=int, default=0)
+    query_parser.add_argument("--no-header", action="store_true")
+    query_parser.set_defaults(func=cmd_query)
+
+    count_parser = subparsers.add_parser("count", help="统计单词数")
+    count_parser.add_argument("file")
+    count_parser.set_defaults(func=cmd_count)
+
+    library_parser = subparsers.add_parser("library", help="并行读取目录中的所有词表，统计或按单词查找")
+    library_parser.add_argument("directory")
+    library_parser.add_argument("words", nargs="*")
+    library_parser.add_argument("--workers", type=int, default=0, help="解析进程数，默认为 CPU 核数")
+    library_parser.set_defaults(func=cmd_library)
+
+    merge_parser = subparsers.add_parser("merge", help="合并多个词表并按单词去重（外部排序，内存占用有上限）")
+    merge_parser.add_argument("output", help="输出文件，可以是输入之一")
+    merge_parser.add_argument("inputs", nargs="+")
+    # 不导入 core.word_merge，合并方式与 MERGE_POLICIES 一致，默认值在 cmd_merge 中填入
+    merge_parser.add_argument("--policy", choices=("first", "last", "longest", "concat"),
+                              help="同一单词有多个释义时的处理方式（first: 保留第一个非空释义，默认；"
+                                   "last: 保留最后一个非空释义；longest: 保留最长的释义；concat: 合并所有不同的释义）")
+    merge_parser.add_argument("--run-rows", type=int, help="每批在内存中排序的行数（默认 200000）")
+    merge_parser.set_defaults(func=cmd_merge)
+
+    sync_parser = subparsers.add_parser("sync", help="按内容分块同步到目录，只复制改动过的块")
+    sync_parser.add_argument("directory", help="同步目录（本地路径或挂载的共享目录）")
+    sync_parser.add_argument("files", nargs="+")
+    sync_parser.set_defaults(func=cmd_sync)
+
+    restore_parser = subparsers.add_parser("restore", help="从同步目录按清单重建文件")
+    restore_parser.add_argument("directory")
+    restore_parser.add_argument("name", help="同步时的文件名")
+    restore_parser.add_argument("--output", help="输出文件，默认为当前目录下的同名文件")
+    restore_parser.set_defaults(func=cmd_restore)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, re.error) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,132 +1,287 @@
-﻿# word_recorder/core/data_manager.py
-import pandas as pd
-import os
-from typing import Tuple, Optional
-
-class DataManager:
-    def __init__(self):
-        self.dataframe: Optional[pd.DataFrame] = None
-        self.filepath: Optional[str] = None
-        self.is_dirty: bool = False # 标记是否有未保存的更改
-        self._columns = ["单词", "释义"]
-
-    def create_new_list(self):
-        """创建一个新的空词表"""
-        self.dataframe = pd.DataFrame(columns=self._columns)
-        self.filepath = None # 新列表尚未保存，没有路径
-        self.is_dirty = False # 新创建的空列表是干净的，但一旦命名或添加内容就变脏
-        return True
-
-    def load_csv(self, file_path: str) -> Tuple[bool, str]:
-        """
-        从CSV文件加载词表。
-        返回: (是否成功, 消息)
-        """
-        try:
-            if not os.path.exists(file_path):
-                return False, "文件不存在。"
-
-            # 尝试读取CSV，不指定header，稍后检查
-            try:
-                df = pd.read_csv(file_path, dtype=str, header=None, keep_default_na=False, skip_blank_lines=True)
-            except pd.errors.EmptyDataError: # CSV文件为空
-                df = pd.DataFrame(columns=self._columns) # 创建一个空的带列名的DataFrame
-                # 这种情况可以认为是成功的加载了一个空表，然后保存时会写入列名
-                self.dataframe = df
-                self.filepath = file_path
-                self.is_dirty = False #刚加载，认为是干净的，但如果后续自动添加了列名并打算保存，则应标记为dirty
-                # 如果文件是空的，我们创建一个带列名的空表，并标记为dirty，以便首次保存时写入列名
-                if df.empty:
-                    self.is_dirty = True # 空文件加载后，我们希望保存时能写入列名
-                return True, "成功加载空的词表。首次保存时将添加列名。"
-            except Exception as e:
-                return False, f"读取CSV文件失败: {e}"
-
-
-            message = "词表加载成功。"
-            # 检查列数
-            if df.shape[1] != len(self._columns):
-                return False, f"文件格式错误：应包含 {len(self._columns)} 列数据。"
-
-            # 检查表头
-            if list(df.iloc[0]) == self._columns:
-                df = pd.read_csv(file_path, dtype=str, keep_default_na=False, skip_blank_lines=True) # 用第一行做表头重新读取
-            else:
-                # 没有表头，或者表头不匹配，将当前数据视为内容，并指定列名
-                df.columns = self._columns
-                message = "词表加载成功。文件缺少标准表头，已按默认格式加载。保存时将添加标准表头。"
-                self.is_dirty = True # 因为我们修改了数据的表示（添加了列名）
-
-            self.dataframe = df.fillna('') #确保没有NaN，而是空字符串
-            self.filepath = file_path
-            if not self.is_dirty: #如果上面没有因为表头问题标记为dirty
-                 self.is_dirty = False
-            return True, message
-
-        except Exception as e:
-            self.dataframe = None
-            self.filepath = None
-            return False, f"加载词表时发生错误: {e}"
-
-    def save_csv(self, file_path: Optional[str] = None) -> Tuple[bool, str]:
-        """
-        保存当前词表到CSV文件。
-        如果提供了 file_path，则“另存为”到该路径。
-        否则，保存到 self.filepath。
-        返回: (是否成功, 消息)
-        """
-        if self.dataframe is None:
-            return False, "没有可保存的词表数据。"
-
-        save_path = file_path if file_path else self.filepath
-
-        if not save_path:
-            return False, "未指定保存路径。"
-
-        try:
-            # 确保 DataFrame 有正确的列名
-            if list(self.dataframe.columns) != self._columns:
-                 self.dataframe.columns = self._columns # 以防万一
-            self.dataframe.to_csv(save_path, index=False, encoding='utf-8')
-            self.filepath = save_path # 更新当前文件路径
-            self.is_dirty = False
-            return True, f"词表已成功保存到: {os.path.basename(save_path)}"
-        except Exception as e:
-            return False, f"保存词表失败: {e}"
-
-    def add_word(self, word: str, definition: str) -> bool:
-        """向词表中添加单词和释义"""
-        if self.dataframe is None:
-            # 如果还没有DataFrame（例如，程序刚启动，用户还没新建或打开）
-            # 理论上UI层应该先确保有一个活动的DataFrame
-            self.create_new_list() # 或者返回错误，由UI处理
-
-        if not word: # 单词不能为空
-            return False
-
-        new_row = pd.DataFrame([{self._columns[0]: word, self._columns[1]: definition}])
-        self.dataframe = pd.concat([self.dataframe, new_row], ignore_index=True)
-        self.is_dirty = True
-        return True
-
-    def get_random_word(self) -> Optional[Tuple[str, str]]:
-        """从词表中随机获取一个单词及其释义"""
-        if self.dataframe is not None and not self.dataframe.empty:
-            sample = self.dataframe.sample(1)
-            return sample.iloc[0][self._columns[0]], sample.iloc[0][self._columns[1]]
-        return None
-
-    def get_word_count(self) -> int:
-        """获取当前词表中的单词数量"""
-        if self.dataframe is not None:
-            return len(self.dataframe)
-        return 0
-
-    def get_data(self) -> Optional[pd.DataFrame]:
-        """获取整个DataFrame"""
-        return self.dataframe
-
-    def get_current_filename(self) -> str:
-        if self.filepath:
-            return os.path.basename(self.filepath)
-        return "未命名"
+# word_recorder/core/data_manager.py
+import os
+from typing import TYPE_CHECKING, List, Tuple, Optional, Iterator
+from core.word_store import WORD_LIST_COLUMNS, word_table
+from core.fuzzy_index import TrigramIndex
+from core.review_scheduler import ReviewScheduler, review_log_path
+from common.table_store import (CHANGE_APPENDED, CHANGE_NONE, CHANGE_REPLACED, HEADER_EMPTY, HEADER_MISSING,
+                                HEADER_STANDARD, FileStamp, TableConflictError, TableFormatError)
+from common.instrument import traced
+
+if TYPE_CHECKING:
+    import pandas as pd # 导入 pandas 需要约半秒，推迟到第一次真正用到数据时（见 main_window.py 中 MainWindow.__init__ / _auto_load_last_file 的分阶段启动）
+
+
+@traced("read_word_list")
+def read_word_list(file_path: str) -> Tuple[bool, str, object]:
+    """
+    只读取词表文件，不修改任何 DataManager，可以在后台线程中调用（第一次调用会导入 pandas）。
+    返回: (是否成功, 失败时的消息, 成功时交给 DataManager.apply_loaded 的读取结果)
+    """
+    if not os.path.exists(file_path):
+        return False, "文件不存在。", None
+    try:
+        table = word_table(file_path)
+        frame, header_status = table.read_frame()
+        return True, "", (frame, header_status, table.last_stamp)
+    except TableFormatError:
+        return False, f"文件格式错误：应包含 {len(WORD_LIST_COLUMNS)} 列数据。", None
+    except Exception as e:
+        return False, f"读取CSV文件失败: {e}", None
+
+
+class DataManager:
+    def __init__(self):
+        self.dataframe: Optional["pd.DataFrame"] = None
+        self.filepath: Optional[str] = None
+        self.is_dirty: bool = False # 标记是否有未保存的更改
+        self._columns = list(WORD_LIST_COLUMNS)
+        self.fuzzy_index = TrigramIndex() # 当前词表单词的模糊索引，随加载 / 添加增量维护
+        self.review = ReviewScheduler() # 复习调度，状态保存在词表旁的 <词表>.review 中
+        self._review_word: Optional[Tuple[str, int]] = None # 最近一次取出的 (单词, 行号)
+        # 另一个实例（或命令行追加）同时修改同一个文件时用到：上次读取 / 保存时文件的版本，以及之后本实例新增的单词
+        self._stamp: Optional[FileStamp] = None
+        self._added_rows: List[Tuple[str, str]] = []
+
+    def create_new_list(self):
+        """创建一个新的空词表"""
+        import pandas as pd
+        self.dataframe = pd.DataFrame(columns=self._columns)
+        self.fuzzy_index.reset([])
+        self.review.load(None)
+        self._stamp = None
+        self._added_rows = []
+        self.filepath = None # 新列表尚未保存，没有路径
+        self.is_dirty = False # 新创建的空列表是干净的，但一旦命名或添加内容就变脏
+        return True
+
+    @traced("DataManager.load_csv")
+    def load_csv(self, file_path: str) -> Tuple[bool, str]:
+        """
+        从CSV文件加载词表。
+        返回: (是否成功, 消息)
+        """
+        success, message, loaded = read_word_list(file_path)
+        if not success:
+            return False, message
+        return self.apply_loaded(file_path, loaded)
+
+    def apply_loaded(self, file_path: str, loaded) -> Tuple[bool, str]:
+        """
+        把 read_word_list 的读取结果设为当前词表（在 GUI 线程中调用）。
+        返回: (是否成功, 消息)
+        """
+        try:
+            df, header_status, stamp = loaded
+            self.dataframe = df
+            self._stamp = stamp
+            self._added_rows = []
+            self.fuzzy_index.reset(df[self._columns[0]]) # 第一次查询时才在后台线程中建立索引
+            self.review.load(review_log_path(file_path))
+            self.filepath = file_path
+            if header_status == HEADER_EMPTY: # CSV文件为空
+                # 空文件加载后，我们希望保存时能写入列名
+                self.is_dirty = True
+                return True, "成功加载空的词表。首次保存时将添加列名。"
+            if header_status == HEADER_MISSING:
+                # 没有表头，或者表头不匹配，已将第一行视为内容；保存时写入标准表头
+                self.is_dirty = True
+                return True, "词表加载成功。文件缺少标准表头，已按默认格式加载。保存时将添加标准表头。"
+            self.is_dirty = False
+            return True, "词表加载成功。"
+
+        except Exception as e:
+            self.dataframe = None
+            self.fuzzy_index.reset([])
+            self.review.load(None)
+            self._stamp = None
+            self.filepath = None
+            return False, f"加载词表时发生错误: {e}"
+
+    @traced("DataManager.save_csv")
+    def save_csv(self, file_path: Optional[str] = None, overwrite: bool = False) -> Tuple[bool, str]:
+        """
+        保存当前词表到CSV文件。
+        如果提供了 file_path，则“另存为”到该路径。
+        否则，保存到 self.filepath。
+        文件在打开后被其他程序追加过时，先把追加的单词合并进来再保存；被其他程序重写过时不保存并返回失败
+        （external_change() 为 CHANGE_REPLACED，可以 merge_from_disk() 后再保存，或者 overwrite=True 直接覆盖）。
+        返回: (是否成功, 消息)
+        """
+        if self.dataframe is None:
+            return False, "没有可保存的词表数据。"
+
+        save_path = file_path if file_path else self.filepath
+
+        if not save_path:
+            return False, "未指定保存路径。"
+
+        try:
+            # 确保 DataFrame 有正确的列名
+            if list(self.dataframe.columns) != self._columns:
+                 self.dataframe.columns = self._columns # 以防万一
+            table = word_table(save_path)
+            merged = 0
+            expected = None # 另存为 / 覆盖：只防止保存过程中被其他程序重写
+            if save_path == self.filepath and self._stamp is not None and not overwrite:
+                change = table.changes_since(self._stamp)
+                if change == CHANGE_REPLACED:
+                    return False, self._conflict_message()
+                if change == CHANGE_APPENDED:
+                    merged = self._merge_appended_rows(table)
+                expected = self._stamp
+            # 先写临时文件再替换，保存失败不会损坏原文件；保存期间其他程序追加的行会保留在文件中
+            table.write_frame(self.dataframe, expected)
+            self._stamp = table.last_stamp
+            self._added_rows = []
+            if self.review.log_path != review_log_path(save_path): # 新建或另存为：复习记录跟随词表
+                self.review.attach(review_log_path(save_path))
+            self.filepath = save_path # 更新当前文件路径
+            if table.changes_since(self._stamp) == CHANGE_APPENDED: # 保存期间追加的行也读进来
+                merged += self._merge_appended_rows(table)
+            self.is_dirty = False
+            message = f"词表已成功保存到: {os.path.basename(save_path)}"
+            if merged:
+                message += f"\n已合并其他程序追加的 {merged} 个单词。"
+            return True, message
+        except TableConflictError:
+            return False, self._conflict_message()
+        except Exception as e:
+            return False, f"保存词表失败: {e}"
+
+    def _conflict_message(self) -> str:
+        return f"词表 '{self.get_current_filename()}' 在打开之后被其他程序修改过，为避免覆盖对方的修改，没有保存。"
+
+    def external_change(self) -> str:
+        """当前词表文件在上次读取 / 保存之后是否被其他程序修改过（CHANGE_NONE / CHANGE_APPENDED / CHANGE_REPLACED）"""
+        if not self.filepath or self._stamp is None:
+            return CHANGE_NONE
+        return word_table(self.filepath).changes_since(self._stamp)
+
+    def _merge_appended_rows(self, table) -> int:
+        """把文件中版本 _stamp 之后追加的行加到词表末尾，返回行数"""
+        import pandas as pd
+        current = table.stamp()
+        rows = [row[:2] for row in table.iter_rows(start=self._stamp.size, stop=current.size)]
+        if rows:
+            self.dataframe = pd.concat([self.dataframe, pd.DataFrame(rows, columns=self._columns)], ignore_index=True)
+            for word, _ in rows:
+                self.fuzzy_index.add(word)
+        self._stamp = current
+        return len(rows)
+
+    def merge_from_disk(self) -> Tuple[bool, str]:
+        """
+        文件被其他程序重写过时的合并：重新读取文件，再加上本实例打开之后新增（且文件中没有）的单词。
+        合并后的词表未保存。返回: (是否成功, 消息)
+        """
+        import pandas as pd
+        if not self.filepath:
+            return False, "当前词表还没有保存过。"
+        success, message, loaded = read_word_list(self.filepath)
+        if not success:
+            return False, message
+        frame, header_status, stamp = loaded
+        existing = set(zip(frame[self._columns[0]], frame[self._columns[1]]))
+        added = [row for row in self._added_rows if row not in existing]
+        if added:
+            frame = pd.concat([frame, pd.DataFrame(added, columns=self._columns)], ignore_index=True)
+        self.dataframe = frame
+        self.fuzzy_index.reset(frame[self._columns[0]])
+        self._stamp = stamp
+        self._added_rows = added
+        self.is_dirty = bool(added) or header_status != HEADER_STANDARD
+        return True, f"已读取文件中的 {len(frame) - len(added)} 个单词，并保留本次新增的 {len(added)} 个单词。"
+
+    @traced("DataManager.add_word")
+    def add_word(self, word: str, definition: str) -> bool:
+        """向词表中添加单词和释义"""
+        import pandas as pd
+        if self.dataframe is None:
+            # 如果还没有DataFrame（例如，程序刚启动，用户还没新建或打开）
+            # 理论上UI层应该先确保有一个活动的DataFrame
+            self.create_new_list() # 或者返回错误，由UI处理
+
+        if not word: # 单词不能为空
+            return False
+
+        new_row = pd.DataFrame([{self._columns[0]: word, self._columns[1]: definition}])
+        self.dataframe = pd.concat([self.dataframe, new_row], ignore_index=True)
+        self.fuzzy_index.add(word)
+        self._added_rows.append((word, definition))
+        self.is_dirty = True
+        return True
+
+    def replace_data(self, frame: "pd.DataFrame"):
+        """
+        用 frame（如 word_clean.clean_words 整理后的词表）整体替换当前词表，作为一次未保存的修改。
+        文件版本 _stamp 不变，保存时仍能发现其他程序的修改。
+        """
+        self.dataframe = frame
+        self.fuzzy_index.reset(frame[self._columns[0]])
+        self._review_word = None # 行号已变化；已复习过的单词按单词保存，行号提示失效时会重新查找
+        self.review.restart_new_words() # 删除行后，从未复习过的单词可能移到了新单词游标之前
+        self.is_dirty = True
+
+    def get_next_review_word(self) -> Optional[Tuple[str, str, Optional[float]]]:
+        """
+        按复习计划获取下一个单词，返回 (单词, 释义, 到期时间)；从未复习过的单词到期时间为 None。
+        词表为空时返回 None。
+        """
+        self._review_word = None
+        dataframe = self.dataframe
+        if dataframe is None or dataframe.empty:
+            return None
+        words = dataframe[self._columns[0]]
+        while True:
+            entry = self.review.next_word(len(dataframe), lambda row: words.iat[row])
+            if entry is None:
+                return None
+            word, row, due = entry
+            if not (0 <= row < len(dataframe) and words.iat[row] == word): # 行号提示失效（词表被外部修改过）
+                matches = (words == word).to_numpy().nonzero()[0]
+                if len(matches) == 0:
+                    self.review.forget(word)
+                    continue
+                row = int(matches[0])
+            self._review_word = (word, row)
+            return word, dataframe.iat[row, 1], due
+
+    def record_review(self, word: str, quality: int) -> Tuple[bool, str]:
+        """
+        记录对 word 的一次复习评分（0~5），追加到复习记录。
+        返回: (是否成功, 消息)
+        """
+        row = self._review_word[1] if self._review_word and self._review_word[0] == word else -1
+        try:
+            state = self.review.review(word, row, quality)
+        except OSError as e:
+            return False, f"保存复习记录失败: {e}"
+        if state.repetitions == 0:
+            return True, f"“{word}”稍后再复习一次。"
+        return True, f"“{word}”将在 {state.interval:.0f} 天后复习。"
+
+    def get_word_count(self) -> int:
+        """获取当前词表中的单词数量"""
+        if self.dataframe is not None:
+            return len(self.dataframe)
+        return 0
+
+    def iter_rows(self) -> Iterator[Tuple[str, str]]:
+        """逐行迭代当前词表的 (单词, 释义)，供导出等流式处理使用"""
+        dataframe = self.dataframe # 持有当前快照：add_word 会生成新的 DataFrame，不影响正在进行的迭代
+        if dataframe is None:
+            return
+        yield from dataframe[self._columns].itertuples(index=False, name=None)
+
+    def get_columns(self) -> list:
+        return list(self._columns)
+
+    def get_data(self) -> Optional["pd.DataFrame"]:
+        """获取整个DataFrame"""
+        return self.dataframe
+
+    def get_current_filename(self) -> str:
+        if self.filepath:
+            return os.path.basename(self.filepath)
+        return "未命名"
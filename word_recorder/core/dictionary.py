@@ -0,0 +1,229 @@
+# word_recorder/core/dictionary.py
+"""
+离线词典：按词头排序的内存映射索引 + 二分查找，不把词典读入内存（不依赖 PySide6 / pandas）。
+
+支持的词典文件：
+    *.csv            ECDICT 风格（表头含 word 和 translation / definition 列），或 单词,释义 两列
+    *.txt / *.tab    StarDict 导出的 Tab 分隔文本：词头<Tab>释义，释义中的换行写作 \\n
+
+第一次打开时扫描一遍词典，把 (词头, 记录在文件中的位置) 按词头排序后写入 <词典>.idx；
+之后直接内存映射索引文件，每次查询只做一次二分查找并读取命中的那一条记录。
+词典所在目录不可写时索引建在临时目录中（见 fallback_index_path），之后的打开也会先在那里查找。
+词典文件大小或修改时间变化时自动重建索引。
+"""
+import csv
+import hashlib
+import io
+import mmap
+import os
+import struct
+import tempfile
+from typing import Callable, List, Optional, Tuple
+
+INDEX_MAGIC = b"WRDX"
+INDEX_VERSION = 1
+# magic, 版本, 词条数, 释义列, 备用释义列, 词典大小, 词典修改时间(ns), 词头区偏移
+_HEADER = struct.Struct("<4sIQIIQQQ")
+# 词头偏移, 词头长度, 记录偏移, 记录长度；条目按词头（casefold 后的 UTF-8 字节）排序
+_ENTRY = struct.Struct("<QIQI")
+PROGRESS_EVERY = 50000 # 建索引时每扫描这么多条记录回调一次进度
+
+_HEADWORD_COLUMNS = ("word", "headword", "单词")
+_DEFINITION_COLUMNS = ("translation", "definition", "释义") # ECDICT 的 translation 是中文释义，优先使用
+
+
+def normalize_headword(word: str) -> bytes:
+    return word.strip().casefold().encode("utf-8")
+
+
+def _is_tab_file(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in (".txt", ".tab", ".tsv")
+
+
+def _parse_record(raw: bytes, tab_separated: bool) -> List[str]:
+    text = raw.decode("utf-8-sig", errors="replace").rstrip("\r\n")
+    if tab_separated:
+        return text.split("\t", 1)
+    return next(csv.reader(io.StringIO(text, newline="")), [])
+
+
+def _iter_records(file, tab_separated: bool):
+    """逐条返回 (偏移, 原始字节)；CSV 中带引号的多行单元格按引号奇偶合并为一条记录"""
+    offset = file.tell()
+    pending = b""
+    pending_offset = offset
+    for line in iter(file.readline, b""):
+        if not pending:
+            pending_offset = offset
+        pending += line
+        offset += len(line)
+        if tab_separated or pending.count(b'"') % 2 == 0:
+            yield pending_offset, pending
+            pending = b""
+    if pending:
+        yield pending_offset, pending
+
+
+def default_index_path(dictionary_path: str) -> str:
+    return dictionary_path + ".idx"
+
+
+def fallback_index_path(dictionary_path: str) -> str:
+    """词典所在目录不可写时索引放在临时目录中，文件名带上词典完整路径的摘要，同名的不同词典不会互相覆盖"""
+    digest = hashlib.sha1(os.path.abspath(dictionary_path).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"{os.path.basename(dictionary_path)}.{digest}.idx")
+
+
+class OfflineDictionary:
+    def __init__(self, dictionary_path: str, index_path: Optional[str] = None):
+        self.dictionary_path = dictionary_path
+        self.index_path = index_path or default_index_path(dictionary_path)
+        self._tab_separated = _is_tab_file(dictionary_path)
+        self._index_file = None
+        self._index = None # mmap
+        self._dictionary_file = None
+        self._count = 0
+        self._definition_column = 1
+        self._fallback_column = 1
+        self._keys_offset = 0
+
+    def __len__(self):
+        return self._count
+
+    # --- 打开 / 建索引 ---
+    def open(self, progress: Optional[Callable[[int], None]] = None) -> "OfflineDictionary":
+        """打开词典；索引缺失或过期时先重建（可能需要几秒，调用方应放在后台线程中）"""
+        if not self._open_index() and not self._open_fallback_index():
+            try:
+                self.build_index(self.index_path, progress)
+            except OSError:
+                # 词典所在目录不可写时，把索引放到临时目录
+                self.index_path = fallback_index_path(self.dictionary_path)
+                self.build_index(self.index_path, progress)
+            if not self._open_index():
+                raise ValueError(f"无法读取词典索引: {self.index_path}")
+        self._dictionary_file = open(self.dictionary_path, "rb")
+        return self
+
+    def close(self):
+        for handle in (self._index, self._index_file, self._dictionary_file):
+            if handle is not None:
+                handle.close()
+        self._index = self._index_file = self._dictionary_file = None
+        self._count = 0
+
+    def _open_fallback_index(self) -> bool:
+        """以前因词典目录不可写而把索引建在了临时目录中时，直接使用那里的索引（调用方指定了索引位置时不找）"""
+        default_path = default_index_path(self.dictionary_path)
+        if self.index_path != default_path:
+            return False
+        self.index_path = fallback_index_path(self.dictionary_path)
+        if self._open_index():
+            return True
+        self.index_path = default_path
+        return False
+
+    def _open_index(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        stat = os.stat(self.dictionary_path)
+        index_file = open(self.index_path, "rb")
+        try:
+            if os.fstat(index_file.fileno()).st_size < _HEADER.size:
+                index_file.close()
+                return False
+            index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            index_file.close()
+            return False
+        magic, version, count, definition_column, fallback_column, size, mtime_ns, keys_offset = \
+            _HEADER.unpack_from(index, 0)
+        if (magic, version, size, mtime_ns) != (INDEX_MAGIC, INDEX_VERSION, stat.st_size, stat.st_mtime_ns):
+            index.close()
+            index_file.close()
+            return False
+        self._index_file, self._index = index_file, index
+        self._count, self._keys_offset = count, keys_offset
+        self._definition_column, self._fallback_column = definition_column, fallback_column
+        return True
+
+    def build_index(self, index_path: str, progress: Optional[Callable[[int], None]] = None) -> int:
+        """扫描词典并写出排序后的索引文件，返回词条数"""
+        stat = os.stat(self.dictionary_path)
+        entries = [] # (词头, 记录偏移, 记录长度)
+        definition_column = fallback_column = 1
+        with open(self.dictionary_path, "rb") as file:
+            for number, (offset, raw) in enumerate(_iter_records(file, self._tab_separated)):
+                fields = _parse_record(raw, self._tab_separated)
+                if not fields or not fields[0].strip():
+                    continue
+                if number == 0 and fields[0].strip().lower() in _HEADWORD_COLUMNS:
+                    lowered = [field.strip().lower() for field in fields]
+                    found = [lowered.index(name) for name in _DEFINITION_COLUMNS if name in lowered] or [1]
+                    definition_column, fallback_column = found[0], found[-1]
+                    continue
+                entries.append((normalize_headword(fields[0]), offset, len(raw)))
+                if progress is not None and len(entries) % PROGRESS_EVERY == 0:
+                    progress(len(entries))
+        entries.sort(key=lambda entry: entry[0]) # 稳定排序：同名词头保持文件中的先后顺序
+
+        keys_offset = _HEADER.size + _ENTRY.size * len(entries)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(entries), definition_column, fallback_column,
+                                   stat.st_size, stat.st_mtime_ns, keys_offset))
+            key_position = 0
+            for key, offset, length in entries:
+                out.write(_ENTRY.pack(key_position, len(key), offset, length))
+                key_position += len(key)
+            for key, _, _ in entries:
+                out.write(key)
+        os.replace(tmp_path, index_path)
+        return len(entries)
+
+    # --- 查询 ---
+    def _entry(self, position: int) -> Tuple[bytes, int, int]:
+        key_position, key_length, offset, length = _ENTRY.unpack_from(self._index, _HEADER.size + position * _ENTRY.size)
+        start = self._keys_offset + key_position
+        return self._index[start:start + key_length], offset, length
+
+    def _lower_bound(self, key: bytes) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _read_fields(self, offset: int, length: int) -> List[str]:
+        self._dictionary_file.seek(offset)
+        return _parse_record(self._dictionary_file.read(length), self._tab_separated)
+
+    def _definition(self, fields: List[str]) -> str:
+        definition = ""
+        for column in (self._definition_column, self._fallback_column): # 例如 ECDICT 中没有中文释义的词条用英文释义
+            definition = fields[column] if column < len(fields) else ""
+            if definition.strip():
+                break
+        return "；".join(part.strip() for part in definition.replace("\\n", "\n").splitlines() if part.strip())
+
+    def lookup(self, word: str) -> Optional[str]:
+        """查找单词的释义（不区分大小写，大小写完全一致的词条优先），找不到时返回 None"""
+        if self._index is None or not word.strip():
+            return None
+        key = normalize_headword(word)
+        position = self._lower_bound(key)
+        first_match = None
+        while position < self._count:
+            entry_key, offset, length = self._entry(position)
+            if entry_key != key:
+                break
+            fields = self._read_fields(offset, length)
+            if first_match is None:
+                first_match = fields
+            if fields[0].strip() == word.strip():
+                return self._definition(fields)
+            position += 1
+        return self._definition(first_match) if first_match is not None else None
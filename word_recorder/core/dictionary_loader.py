@@ -0,0 +1,25 @@
+# word_recorder/core/dictionary_loader.py
+from PySide6.QtCore import QThread, Signal
+
+from core.dictionary import OfflineDictionary
+
+
+class DictionaryLoader(QThread):
+    """在后台线程中打开离线词典；第一次打开需要扫描整个词典建立索引"""
+    progress = Signal(int)      # 已索引的词条数
+    loaded = Signal(object)     # 打开好的 OfflineDictionary
+    failed = Signal(str)        # 错误信息
+
+    def __init__(self, dictionary_path: str, parent=None):
+        super().__init__(parent)
+        self.dictionary_path = dictionary_path
+
+    def run(self):
+        dictionary = OfflineDictionary(self.dictionary_path)
+        try:
+            dictionary.open(progress=self.progress.emit)
+        except Exception as e:
+            dictionary.close()
+            self.failed.emit(str(e))
+        else:
+            self.loaded.emit(dictionary)
@@ -0,0 +1,124 @@
+# word_recorder/core/fuzzy_index.py
+"""
+词表单词的三元组（trigram）模糊索引，用于输入时提示相似 / 可能拼错的已有单词（不依赖 PySide6 / pandas）。
+
+修改（reset / add）只记入待处理队列，立即返回，不会阻塞 GUI 线程；
+待处理的修改在下一次 query 时（在后台线程中）应用到索引。
+每次查询最多完整累计 MAX_POSTINGS_SCANNED 个倒排项，更长的（常见三元组的）倒排表只用来给已选出的候选加分，
+词表再大查询耗时也基本不变。
+"""
+import bisect
+import difflib
+import heapq
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+MAX_POSTINGS_SCANNED = 10000 # 每次查询最多累计的倒排项数
+SHARED_CANDIDATES = 200     # 先按共有三元组数取前这么多个候选
+RERANK_CANDIDATES = 30      # 再按三元组相似度取前这么多个，用编辑相似度精排
+MIN_SIMILARITY = 0.6
+
+
+def normalize_word(word: str) -> str:
+    return str(word).strip().casefold()
+
+
+def trigrams(normalized: str) -> set:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    def __init__(self):
+        self._lock = threading.Lock()          # 保护索引本身（查询和应用修改）
+        self._pending_lock = threading.Lock()  # 只保护待处理队列，持有时间极短
+        self._pending: List[Iterable[str]] = []
+        self._needs_clear = False
+        self._ids: Dict[str, int] = {}    # 规范化单词 -> id
+        self._words: List[str] = []       # id -> 第一次出现时的原始写法
+        self._sizes: List[int] = []       # id -> 三元组个数
+        self._postings: Dict[str, List[int]] = {}
+
+    # --- 修改（任意线程，立即返回） ---
+    def reset(self, words: Iterable[str]):
+        """用 words 替换索引内容；words 会在下一次查询时才被遍历，调用方不要再修改它"""
+        with self._pending_lock:
+            self._pending = [words]
+            self._needs_clear = True
+
+    def add(self, word: str):
+        with self._pending_lock:
+            self._pending.append((word,))
+
+    # --- 查询（后台线程） ---
+    def _apply_pending(self):
+        with self._pending_lock:
+            sources, self._pending = self._pending, []
+            needs_clear, self._needs_clear = self._needs_clear, False
+        if needs_clear:
+            self._ids, self._words, self._sizes, self._postings = {}, [], [], {}
+        ids, words, sizes, postings = self._ids, self._words, self._sizes, self._postings
+        for source in sources:
+            for word in source:
+                normalized = normalize_word(word)
+                if not normalized or normalized in ids:
+                    continue
+                word_id = len(words)
+                ids[normalized] = word_id
+                words.append(str(word).strip())
+                grams = trigrams(normalized)
+                sizes.append(len(grams))
+                for gram in grams:
+                    posting = postings.get(gram)
+                    if posting is None:
+                        postings[gram] = [word_id]
+                    else:
+                        posting.append(word_id)
+
+    def __len__(self):
+        with self._lock:
+            self._apply_pending()
+            return len(self._words)
+
+    def query(self, text: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """与 text 最相似的至多 limit 个单词及相似度（0~1，1 表示已存在相同的单词），按相似度降序"""
+        normalized = normalize_word(text)
+        if not normalized:
+            return []
+        with self._lock:
+            self._apply_pending()
+            query_grams = trigrams(normalized)
+            # 从最稀有的三元组开始累计，常见三元组的长倒排表在预算用完后跳过
+            posting_lists = sorted((self._postings[gram] for gram in query_grams if gram in self._postings), key=len)
+            shared = Counter()
+            budget = MAX_POSTINGS_SCANNED
+            skipped = []
+            for posting in posting_lists:
+                if len(posting) > budget and shared:
+                    skipped.append(posting)
+                    continue
+                shared.update(posting[:budget])
+                budget = max(budget - len(posting), 0)
+
+            top = dict(shared.most_common(SHARED_CANDIDATES))
+            for posting in skipped: # 倒排表中的 id 按添加顺序递增，可以二分查找
+                for word_id in top:
+                    position = bisect.bisect_left(posting, word_id)
+                    if position < len(posting) and posting[position] == word_id:
+                        top[word_id] += 1
+
+            sizes = self._sizes
+            query_size = len(query_grams)
+            candidates = heapq.nlargest(RERANK_CANDIDATES, top.items(),
+                                        key=lambda item: 2 * item[1] / (query_size + sizes[item[0]]))
+            candidate_words = [(self._words[word_id], normalize_word(self._words[word_id]))
+                               for word_id, _ in candidates]
+
+        matches = []
+        for word, candidate in candidate_words:
+            similarity = 1.0 if candidate == normalized else difflib.SequenceMatcher(None, normalized, candidate).ratio()
+            if similarity >= MIN_SIMILARITY:
+                matches.append((word, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches[:limit]
@@ -0,0 +1,18 @@
+# word_recorder/core/fuzzy_match_worker.py
+from PySide6.QtCore import QThread, Signal
+
+from core.fuzzy_index import TrigramIndex
+
+
+class FuzzyMatchWorker(QThread):
+    """在后台线程中执行一次 TrigramIndex.query；第一次查询时还会为整个词表建立索引"""
+    matched = Signal(str, list)  # (查询文本, [(单词, 相似度)])
+
+    def __init__(self, index: TrigramIndex, text: str, limit: int, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.text = text
+        self.limit = limit
+
+    def run(self):
+        self.matched.emit(self.text, self.index.query(self.text, self.limit))
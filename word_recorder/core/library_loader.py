@@ -0,0 +1,32 @@
+# word_recorder/core/library_loader.py
+from PySide6.QtCore import QThread, Signal
+
+from core.word_library import WordLibrary
+from core.word_store import WORD_LIST_COLUMNS
+
+LIBRARY_LIST_COLUMN = "词表"
+LIBRARY_COLUMNS = list(WORD_LIST_COLUMNS) + [LIBRARY_LIST_COLUMN]
+
+
+class LibraryLoader(QThread):
+    """在后台线程中刷新词库（改动过的词表由多个进程并行解析），并生成用于预览的合并表格"""
+    progress = Signal(int, int)     # (已解析的文件数, 需要解析的文件数)
+    loaded = Signal(object, int)    # (合并后的 DataFrame：单词 / 释义 / 词表，没有变化时为 None, 变化的文件数)
+    failed = Signal(str)            # 错误信息
+
+    def __init__(self, library: WordLibrary, rebuild: bool = False, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.rebuild = rebuild # 即使没有文件变化也重新生成表格（第一次打开词库时）
+
+    def run(self):
+        try:
+            changed, removed = self.library.refresh(progress=self.progress.emit)
+            frame = None
+            if changed or removed or self.rebuild:
+                import pandas as pd # 在后台线程中导入，不拖慢启动
+                frame = pd.DataFrame(list(self.library.iter_rows()), columns=LIBRARY_COLUMNS, dtype=str)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.loaded.emit(frame, changed + removed)
@@ -0,0 +1,17 @@
+# word_recorder/core/list_loader.py
+from PySide6.QtCore import QThread, Signal
+
+from core.data_manager import read_word_list
+
+
+class ListLoader(QThread):
+    """在后台线程中读取一个词表（包括第一次导入 pandas），结果交给 DataManager.apply_loaded"""
+    loaded = Signal(str, bool, str, object)  # (文件路径, 是否成功, 失败时的消息, 读取结果)
+
+    def __init__(self, file_path: str, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def run(self):
+        success, message, loaded = read_word_list(self.file_path)
+        self.loaded.emit(self.file_path, success, message, loaded)
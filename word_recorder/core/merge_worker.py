@@ -0,0 +1,36 @@
+# word_recorder/core/merge_worker.py
+import threading
+from typing import Sequence
+
+from PySide6.QtCore import QThread, Signal
+
+from core.word_merge import MergeCancelled, merge_word_lists
+
+
+class MergeWorker(QThread):
+    """在后台线程中执行 merge_word_lists，通过信号汇报进度和结果"""
+    progress = Signal(int)          # 已处理的行数
+    succeeded = Signal(int, int)    # (读入的行数, 写出的单词数)
+    failed = Signal(str)            # 错误信息
+    cancelled = Signal()
+
+    def __init__(self, input_paths: Sequence[str], output_path: str, policy: str, parent=None):
+        super().__init__(parent)
+        self.input_paths = list(input_paths)
+        self.output_path = output_path
+        self.policy = policy
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self):
+        try:
+            read, written = merge_word_lists(self.input_paths, self.output_path, self.policy,
+                                             progress=self.progress.emit, is_cancelled=self._cancel_event.is_set)
+        except MergeCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(read, written)
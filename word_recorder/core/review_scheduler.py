@@ -0,0 +1,160 @@
+# word_recorder/core/review_scheduler.py
+"""
+SM-2 间隔复习调度（不依赖 PySide6 / pandas）。
+
+每个复习过的单词记录 到期时间 / 间隔天数 / 难度系数 / 连续记住次数，保存在词表旁的 <词表>.review 中。
+该文件只追加：每次评分追加一行，加载时按顺序回放，同一单词以最后一行为准；过期行太多时整体重写一次。
+到期的单词放在按到期时间排序的最小堆中（更新时不删除旧条目，出堆时跳过过期条目），取下一个单词是 O(log n)。
+从未复习过的单词不进堆，按词表中的顺序依次出现，因此加载耗时只与复习记录的数量有关。
+"""
+import heapq
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from common.table_store import Column, TableFile, TableSchema
+
+DAY_SECONDS = 24 * 60 * 60
+RELEARN_SECONDS = 10 * 60 # 忘记的单词 10 分钟后再复习一次（SM-2 原文为 1 天）
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+COMPACT_MIN_STALE_ROWS = 1000 # 过期行超过这个数且多于有效行时，加载后重写复习记录
+
+QUALITY_FORGOT = 1
+QUALITY_HARD = 3
+QUALITY_GOOD = 5
+
+REVIEW_LOG_SCHEMA = TableSchema([Column("单词"), Column("行号", int), Column("到期时间", float),
+                                 Column("间隔天数", float), Column("难度系数", float),
+                                 Column("连续记住次数", int)], strict_width=False)
+
+
+def review_log_path(list_path: str) -> str:
+    return list_path + ".review"
+
+
+class ReviewState:
+    __slots__ = ("row", "due", "interval", "ease", "repetitions")
+
+    def __init__(self, row: int, due: float, interval: float = 0.0, ease: float = DEFAULT_EASE, repetitions: int = 0):
+        self.row = row              # 单词在词表中的行号（只是提示，词表被外部修改后可能不准）
+        self.due = due              # 下次复习的时间（Unix 时间戳，秒）
+        self.interval = interval    # 当前复习间隔（天）
+        self.ease = ease
+        self.repetitions = repetitions
+
+    def to_row(self, word: str) -> list:
+        return [word, self.row, f"{self.due:.0f}", f"{self.interval:.4g}", f"{self.ease:.3g}", self.repetitions]
+
+
+def next_state(state: Optional[ReviewState], row: int, quality: int, now: float) -> ReviewState:
+    """按 SM-2 计算评分（0~5，3 以下视为忘记）之后的复习状态"""
+    previous = state or ReviewState(row, now)
+    ease = max(MIN_EASE, previous.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        return ReviewState(row, now + RELEARN_SECONDS, 0.0, ease, 0)
+    repetitions = previous.repetitions + 1
+    if repetitions == 1:
+        interval = 1.0
+    elif repetitions == 2:
+        interval = 6.0
+    else:
+        interval = previous.interval * ease
+    return ReviewState(row, now + interval * DAY_SECONDS, interval, ease, repetitions)
+
+
+class ReviewScheduler:
+    def __init__(self):
+        self.log_path: Optional[str] = None # None 表示词表尚未保存，复习记录只保存在内存中
+        self._states: Dict[str, ReviewState] = {}
+        self._heap: List[Tuple[float, str]] = [] # (到期时间, 单词)，可能含有过期条目
+        self._next_new_row = 0
+
+    def __len__(self):
+        return len(self._states)
+
+    # --- 加载 / 保存 ---
+    def load(self, log_path: Optional[str]) -> int:
+        """回放复习记录，返回其中的单词数；文件不存在或无法读取时从空记录开始"""
+        self.log_path = log_path
+        self._states = {}
+        self._next_new_row = 0
+        log_rows = 0
+        if log_path and os.path.exists(log_path):
+            try:
+                for word, row, due, interval, ease, repetitions, *_ in TableFile(log_path, REVIEW_LOG_SCHEMA).iter_rows(typed=True):
+                    if not word or None in (row, due, interval, ease, repetitions):
+                        continue # 写入中断留下的不完整行
+                    self._states[word] = ReviewState(row, due, interval, ease, repetitions)
+                    log_rows += 1
+            except (OSError, UnicodeDecodeError, ValueError):
+                pass
+        self._rebuild_heap()
+        if log_rows - len(self._states) > max(COMPACT_MIN_STALE_ROWS, len(self._states)):
+            try:
+                self._write_all(log_path)
+            except OSError:
+                pass # 下次加载时再试
+        return len(self._states)
+
+    def attach(self, log_path: str):
+        """词表另存为新文件时调用：把当前的全部复习状态写入新的复习记录，之后的评分追加到该文件"""
+        self._write_all(log_path)
+        self.log_path = log_path
+
+    def _write_all(self, log_path: str):
+        TableFile(log_path, REVIEW_LOG_SCHEMA).rewrite_rows(state.to_row(word) for word, state in self._states.items())
+
+    def _rebuild_heap(self):
+        self._heap = [(state.due, word) for word, state in self._states.items()]
+        heapq.heapify(self._heap)
+
+    # --- 调度 ---
+    def _peek_due(self) -> Optional[Tuple[float, str]]:
+        heap, states = self._heap, self._states
+        while heap:
+            due, word = heap[0]
+            state = states.get(word)
+            if state is not None and state.due == due:
+                return due, word
+            heapq.heappop(heap) # 已被重新评分或移除的过期条目
+        return None
+
+    def next_word(self, word_count: int, word_at: Callable[[int], str],
+                  now: Optional[float] = None) -> Optional[Tuple[str, int, Optional[float]]]:
+        """
+        下一个要复习的单词，返回 (单词, 行号提示, 到期时间)；新单词的到期时间为 None。
+        优先顺序：已到期的复习 > 词表中下一个从未复习过的单词 > 最早到期的复习（提前复习）。
+        """
+        now = time.time() if now is None else now
+        due_entry = self._peek_due()
+        if due_entry is not None and due_entry[0] <= now:
+            return due_entry[1], self._states[due_entry[1]].row, due_entry[0]
+        while self._next_new_row < word_count:
+            word = word_at(self._next_new_row)
+            if word and word not in self._states:
+                return word, self._next_new_row, None
+            self._next_new_row += 1
+        if due_entry is not None:
+            return due_entry[1], self._states[due_entry[1]].row, due_entry[0]
+        return None
+
+    def restart_new_words(self):
+        """词表的行被整体替换或重新排列之后调用：从第一行起重新查找从未复习过的单词"""
+        self._next_new_row = 0
+
+    def review(self, word: str, row: int, quality: int, now: Optional[float] = None) -> ReviewState:
+        """记录一次评分：更新状态、入堆，并把新状态追加到复习记录（写入失败时抛出 OSError，内存中的状态已更新）"""
+        now = time.time() if now is None else now
+        state = next_state(self._states.get(word), row, quality, now)
+        self._states[word] = state
+        heapq.heappush(self._heap, (state.due, word))
+        if len(self._heap) > 2 * len(self._states) + 64:
+            self._rebuild_heap()
+        if self.log_path:
+            TableFile(self.log_path, REVIEW_LOG_SCHEMA).append_rows([state.to_row(word)])
+        return state
+
+    def forget(self, word: str):
+        """单词已不在词表中：不再调度它（复习记录中的行保留，下次加载时照常回放）"""
+        self._states.pop(word, None)
@@ -1,79 +1,162 @@
-﻿# word_recorder/core/settings_manager.py
-from PySide6.QtCore import QSettings, QDir
-from PySide6.QtGui import QFont, QGuiApplication
-from typing import Optional
-class SettingsManager:
-    def __init__(self, organization_name="MyCompany", application_name="WordRecorder"):
-        self.settings = QSettings(organization_name, application_name)
-
-    # --- Theme Settings ---
-    def save_theme(self, theme_name: str):
-        """保存主题名称 ('light' 或 'dark')"""
-        self.settings.setValue("appearance/theme", theme_name)
-
-    def load_theme(self) -> str:
-        """加载主题名称，默认为 'light'"""
-        return self.settings.value("appearance/theme", "light")
-
-    # --- Font Size Settings ---
-    def save_font_size(self, size_str: str):
-        """保存字体大小 ('small', 'medium', 'large')"""
-        self.settings.setValue("appearance/font_size", size_str)
-
-    def load_font_size(self) -> str:
-        """加载字体大小，默认为 'medium'"""
-        return self.settings.value("appearance/font_size", "medium")
-
-    def get_font(self, size_str: str = None) -> QFont:
-        """根据大小字符串获取QFont对象"""
-        if size_str is None:
-            size_str = self.load_font_size()
-
-        font = QGuiApplication.font() # 获取应用程序默认字体作为基础
-        if size_str == "small":
-            font.setPointSize(10)
-        elif size_str == "large":
-            font.setPointSize(14)
-        else: # medium or default
-            font.setPointSize(12) # 或者使用 QGuiApplication.font().pointSize()
-        return font
-
-    # --- Last Opened File Settings ---
-    def save_last_opened_file(self, file_path: Optional[str]):
-        """保存上次打开的文件路径"""
-        if file_path:
-            self.settings.setValue("general/last_opened_file", file_path)
-        else:
-            self.settings.remove("general/last_opened_file") # 如果路径为空，则移除记录
-
-    def load_last_opened_file(self) -> Optional[str]:
-        """加载上次打开的文件路径"""
-        return self.settings.value("general/last_opened_file", None) # 默认为 None
-
-    # --- Style Sheet Loading ---
-    def load_stylesheet(self, theme_name: str) -> str:
-        """根据主题名称加载对应的 QSS 文件内容"""
-        qss_file_path = f":/styles/{theme_name}.qss" # 使用Qt资源系统路径
-        # 如果不使用Qt资源系统，则需要构建绝对路径
-        # import os
-        # base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # 项目根目录
-        # qss_file_path = os.path.join(base_path, "resources", "styles", f"{theme_name}.qss")
-
-        # 为了简化，我们先假设QSS文件会被编译到资源文件中
-        # 如果直接读取文件，需要确保路径正确
-        # For direct file reading (if not using Qt resources):
-        import os
-        try:
-            # Assuming this file is in core/, resources/ is ../resources/
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            style_path = os.path.join(current_dir, '..', 'resources', 'styles', f'{theme_name}.qss')
-
-            if os.path.exists(style_path):
-                with open(style_path, "r", encoding="utf-8") as f:
-                    return f.read()
-            else:
-                print(f"Warning: Stylesheet file not found: {style_path}")
-                return ""
-        except Exception as e:
-            print(f"Error loading stylesheet {theme_name}.qss: {e}")
-            return ""
\ No newline at end of file
+# word_recorder/core/settings_manager.py
+import os
+from PySide6.QtCore import QCoreApplication, QDir, QObject, QSettings, QTimer, Signal
+from PySide6.QtGui import QFont, QGuiApplication
+from typing import Dict, Optional
+
+STYLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "styles")
+FONT_POINT_SIZES = {"small": 10, "medium": 12, "large": 14}
+DEFAULT_FONT_SIZE = "medium"
+
+DEFAULT_THEME = "light"
+WRITE_DELAY_MS = 500 # 连续修改在这段时间内合并为一次写入
+
+# 快照字段 -> (QSettings 键, 默认值)
+_SETTING_KEYS = {
+    "theme": ("appearance/theme", DEFAULT_THEME),
+    "font_size": ("appearance/font_size", DEFAULT_FONT_SIZE),
+    # INI 格式把 general 组写成 [%General]，读回来时组名是 General；写成 General 才能在 Linux 上正确读回
+    "last_opened_file": ("General/last_opened_file", None),
+    "dictionary_path": ("General/dictionary_path", None),
+    "sync_dir": ("General/sync_dir", None),
+}
+
+
+class SettingsManager(QObject):
+    """
+    启动时把 QSettings 一次性读入内存快照，之后的读取都直接返回快照。
+    修改先更新快照并发出对应的变化信号，再延迟 WRITE_DELAY_MS 合并写回 QSettings；
+    flush() 立即写回，程序退出（aboutToQuit）时也会自动写回。值没有变化的修改会被忽略。
+    """
+    theme_changed = Signal(str)
+    font_size_changed = Signal(str)
+    last_opened_file_changed = Signal(object) # str 或 None
+
+    _stylesheet_cache: Dict[str, str] = {} # 主题名 -> QSS 内容，所有实例共享
+
+    def __init__(self, organization_name="MyCompany", application_name="WordRecorder", parent=None):
+        super().__init__(parent)
+        self.settings = QSettings(organization_name, application_name)
+        self._values: Dict[str, Optional[str]] = {}
+        self._dirty = set()
+        self._load_snapshot()
+
+        self._write_timer = QTimer(self)
+        self._write_timer.setSingleShot(True)
+        self._write_timer.setInterval(WRITE_DELAY_MS)
+        self._write_timer.timeout.connect(self.flush)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush)
+
+    def _load_snapshot(self):
+        for name, (key, default) in _SETTING_KEYS.items():
+            value = self.settings.value(key, default)
+            self._values[name] = str(value) if value else default # INI 后端可能返回非 str 类型或空字符串
+
+    def _set(self, name: str, value: Optional[str]) -> bool:
+        """更新快照并安排写回；值没有变化时返回 False"""
+        if self._values.get(name) == value:
+            return False
+        self._values[name] = value
+        self._dirty.add(name)
+        self._write_timer.start()
+        return True
+
+    def flush(self):
+        """把尚未写回的修改立即写入 QSettings"""
+        self._write_timer.stop()
+        if not self._dirty:
+            return
+        for name in self._dirty:
+            key, _ = _SETTING_KEYS[name]
+            value = self._values[name]
+            if value:
+                self.settings.setValue(key, value)
+            else:
+                self.settings.remove(key) # 如果值为空，则移除记录
+        self._dirty.clear()
+        self.settings.sync()
+
+    # --- Theme Settings ---
+    def save_theme(self, theme_name: str):
+        """保存主题名称 ('light' 或 'dark')"""
+        if self._set("theme", theme_name):
+            self.theme_changed.emit(theme_name)
+
+    def load_theme(self) -> str:
+        """加载主题名称，默认为 'light'"""
+        return self._values["theme"]
+
+    # --- Font Size Settings ---
+    def save_font_size(self, size_str: str):
+        """保存字体大小 ('small', 'medium', 'large')"""
+        if self._set("font_size", size_str):
+            self.font_size_changed.emit(size_str)
+
+    def load_font_size(self) -> str:
+        """加载字体大小，默认为 'medium'"""
+        return self._values["font_size"]
+
+    def get_font(self, size_str: str = None) -> QFont:
+        """根据大小字符串获取QFont对象"""
+        font = QGuiApplication.font() # 获取应用程序默认字体作为基础
+        font.setPointSize(self.get_font_point_size(size_str))
+        return font
+
+    def get_font_point_size(self, size_str: str = None) -> int:
+        """大小字符串对应的磅值，未知的值按 medium 处理"""
+        if size_str is None:
+            size_str = self.load_font_size()
+        return FONT_POINT_SIZES.get(size_str, FONT_POINT_SIZES[DEFAULT_FONT_SIZE])
+
+    # --- Last Opened File Settings ---
+    def save_last_opened_file(self, file_path: Optional[str]):
+        """保存上次打开的文件路径；传入空值时移除记录"""
+        file_path = file_path or None
+        if self._set("last_opened_file", file_path):
+            self.last_opened_file_changed.emit(file_path)
+
+    def load_last_opened_file(self) -> Optional[str]:
+        """加载上次打开的文件路径"""
+        return self._values["last_opened_file"] # 默认为 None
+
+    # --- Offline Dictionary Settings ---
+    def save_dictionary_path(self, file_path: Optional[str]):
+        """保存离线词典路径；传入空值时移除记录"""
+        self._set("dictionary_path", file_path or None)
+
+    def load_dictionary_path(self) -> Optional[str]:
+        return self._values["dictionary_path"]
+
+    # --- Sync Directory Settings ---
+    def save_sync_dir(self, directory: Optional[str]):
+        """保存同步目录；传入空值时停止同步"""
+        self._set("sync_dir", directory or None)
+
+    def load_sync_dir(self) -> Optional[str]:
+        return self._values["sync_dir"]
+
+    # --- Style Sheet Loading ---
+    def load_stylesheet(self, theme_name: str) -> str:
+        """根据主题名称加载对应的 QSS 文件内容；每个主题在进程内只读一次磁盘"""
+        cached = self._stylesheet_cache.get(theme_name)
+        if cached is not None:
+            return cached
+        style_path = os.path.join(STYLES_DIR, f"{theme_name}.qss")
+        try:
+            if os.path.exists(style_path):
+                with open(style_path, "r", encoding="utf-8") as f:
+                    stylesheet = f.read()
+                self._stylesheet_cache[theme_name] = stylesheet
+                return stylesheet
+            else:
+                print(f"Warning: Stylesheet file not found: {style_path}")
+                return ""
+        except Exception as e:
+            print(f"Error loading stylesheet {theme_name}.qss: {e}")
+            return ""
+
+    def get_font_stylesheet(self, size_str: str = None) -> str:
+        """字体大小对应的 QSS 规则，由主窗口设置在自身上，改字号时不必重新应用整个主题"""
+        return f"QWidget {{ font-size: {self.get_font_point_size(size_str)}pt; }}"
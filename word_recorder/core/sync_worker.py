@@ -0,0 +1,30 @@
+# word_recorder/core/sync_worker.py
+import os
+from typing import List
+
+from PySide6.QtCore import QThread, Signal
+
+from common.chunk_sync import sync_file
+from core.review_scheduler import review_log_path
+
+
+class SyncWorker(QThread):
+    """在后台线程中把词表（以及旁边的复习记录）同步到同步目录，只复制改动过的块"""
+    synced = Signal(object)     # [(文件名, SyncResult)]
+    failed = Signal(str)        # 错误信息
+
+    def __init__(self, list_path: str, sync_dir: str, parent=None):
+        super().__init__(parent)
+        self.list_path = list_path
+        self.sync_dir = sync_dir
+
+    def run(self):
+        paths: List[str] = [self.list_path]
+        if os.path.exists(review_log_path(self.list_path)):
+            paths.append(review_log_path(self.list_path))
+        try:
+            results = [(os.path.basename(path), sync_file(path, self.sync_dir)) for path in paths]
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.synced.emit(results)
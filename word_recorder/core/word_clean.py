@@ -0,0 +1,109 @@
+# word_recorder/core/word_clean.py
+"""
+整理导入的词表：规范化单词和释义，并按单词合并重复的行。
+
+全部用 pandas 的向量化字符串操作一次完成，十万行以上的词表也不需要逐行经过 DataManager：
+    1. 单词做 NFKC 规范化（全角字母、数字、标点转为半角），释义只把全角字母、数字和空格转为半角，
+       中文标点（，；。等）保持不变；两者都把连续空白合成一个空格并去掉首尾空白；
+    2. 删除单词为空的行；
+    3. 单词 casefold 后相同的行合并为一行：保留第一次出现的位置和写法，释义按 word_merge 的 policy 合并。
+结果不直接修改词表，先交给界面预览，确认后再由 DataManager.replace_data 一次替换。
+"""
+from typing import TYPE_CHECKING, NamedTuple
+
+from core.word_merge import DEFAULT_POLICY, DEFINITION_SEPARATOR, MERGE_POLICIES
+from core.word_store import WORD_LIST_COLUMNS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CHANGE_COLUMN = "变化"
+
+# 全角 ASCII 字母、数字和全角空格 -> 半角（释义只做这一种转换）
+_HALF_WIDTH = {code: code - 0xFEE0 for code in range(0xFF10, 0xFF1A)}
+_HALF_WIDTH.update({code: code - 0xFEE0 for code in range(0xFF21, 0xFF3B)})
+_HALF_WIDTH.update({code: code - 0xFEE0 for code in range(0xFF41, 0xFF5B)})
+_HALF_WIDTH[0x3000] = 0x20
+
+
+class CleanResult(NamedTuple):
+    frame: "pd.DataFrame"   # 整理后的词表，列为 WORD_LIST_COLUMNS
+    changes: "pd.DataFrame" # 每个被修改、合并或删除的原始行一行：单词, 释义, 变化
+    changed: int            # 单词或释义被改写的行数（包括因合并而改变释义的行）
+    merged: int             # 合并到前面同名单词中的重复行数
+    dropped: int            # 单词为空而删除的行数
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.changed or self.merged or self.dropped)
+
+    def summary(self) -> str:
+        return (f"整理后共 {len(self.frame)} 个单词：改写 {self.changed} 行，"
+                f"合并重复 {self.merged} 行，删除空单词 {self.dropped} 行。")
+
+
+def _squeeze(values: "pd.Series") -> "pd.Series":
+    return values.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def _merged_definitions(keys: "pd.Series", definitions: "pd.Series", policy: str) -> "pd.Series":
+    """按 keys 分组合并释义，与 word_merge._merge_definitions 的规则相同；返回以 key 为索引的 Series"""
+    non_empty = definitions != ""
+    groups = definitions[non_empty].groupby(keys[non_empty], sort=False)
+    if policy == "first":
+        return groups.first()
+    if policy == "last":
+        return groups.last()
+    if policy == "longest":
+        lengths = definitions[non_empty].str.len()
+        longest = lengths.groupby(keys[non_empty], sort=False).idxmax() # 一样长时取先出现的
+        return definitions.loc[longest.to_numpy()].set_axis(longest.index)
+    distinct = definitions[non_empty][~(keys[non_empty] + "\0" + definitions[non_empty]).duplicated()]
+    return distinct.groupby(keys.loc[distinct.index], sort=False).agg(DEFINITION_SEPARATOR.join)
+
+
+def clean_words(frame: "pd.DataFrame", policy: str = DEFAULT_POLICY) -> CleanResult:
+    """
+    整理 frame（前两列为 单词, 释义），不修改 frame 本身。
+    policy 决定同一单词有多个不同释义时的处理方式（见 MERGE_POLICIES），不支持时抛出 ValueError。
+    """
+    import numpy as np
+    import pandas as pd
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f"不支持的合并方式: {policy}")
+
+    original_words = frame.iloc[:, 0].fillna("").astype(str).reset_index(drop=True)
+    original_definitions = frame.iloc[:, 1].fillna("").astype(str).reset_index(drop=True)
+    words = _squeeze(original_words.str.normalize("NFKC"))
+    definitions = _squeeze(original_definitions.str.translate(_HALF_WIDTH))
+
+    present = (words != "").to_numpy()
+    keys = words.str.casefold()
+    duplicate = keys.duplicated().to_numpy() & present
+    kept = present & ~duplicate
+
+    if duplicate.any():
+        grouped = keys.duplicated(keep=False).to_numpy() & present # 只有重复的单词需要分组合并释义
+        merged_definitions = _merged_definitions(keys[grouped], definitions[grouped], policy)
+        target = grouped & kept
+        definitions = definitions.mask(target, keys[target].map(merged_definitions).fillna(""))
+    cleaned = pd.DataFrame({WORD_LIST_COLUMNS[0]: words[kept].to_numpy(),
+                            WORD_LIST_COLUMNS[1]: definitions[kept].to_numpy()})
+
+    rewritten = kept & ((words != original_words) | (definitions != original_definitions)).to_numpy()
+    touched = np.flatnonzero(rewritten | duplicate | ~present)
+    # 只为有变化的行拼接说明；改写的行显示整理后的内容，合并和删除的行显示原来的内容
+    rewritten, duplicate, present = rewritten[touched], duplicate[touched], present[touched]
+    words, definitions, keys = words.iloc[touched], definitions.iloc[touched], keys.iloc[touched]
+    original_words, original_definitions = original_words.iloc[touched], original_definitions.iloc[touched]
+    # 没有留下任何单词时（全部为空）map 的结果是 float 的 NaN，不能与字符串拼接
+    first_spelling = keys.map(cleaned[WORD_LIST_COLUMNS[0]].set_axis(cleaned[WORD_LIST_COLUMNS[0]].str.casefold()))
+    first_spelling = first_spelling.astype(object).fillna("").astype(str)
+    notes = ("原为 " + original_words + "：" + original_definitions).where(rewritten, "单词为空，已删除")
+    notes = notes.where(~duplicate, "与“" + first_spelling + "”重复，已合并")
+    changes = pd.DataFrame({
+        WORD_LIST_COLUMNS[0]: words.where(rewritten, original_words).to_numpy(),
+        WORD_LIST_COLUMNS[1]: definitions.where(rewritten, original_definitions).to_numpy(),
+        CHANGE_COLUMN: ("第 " + pd.Series(touched + 1, index=notes.index).astype(str) + " 行：" + notes).to_numpy(),
+    })
+    return CleanResult(cleaned, changes, int(rewritten.sum()), int(duplicate.sum()), int((~present).sum()))
@@ -0,0 +1,134 @@
+# word_recorder/core/word_library.py
+"""
+词库：把一个目录中的所有词表（*.csv，以及压缩的 *.csv.gz / *.csv.zst）当作一个整体（不依赖 PySide6 / pandas）。
+
+refresh() 只重新解析大小或修改时间变化过的文件，多个文件需要解析时用 ProcessPoolExecutor 在多个进程中并行解析；
+同时维护 规范化单词 -> [(词表路径, 行号)] 的合并索引，locate() 是一次字典查找。
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.fuzzy_index import normalize_word
+from core.word_store import is_list_file, word_table
+
+PARALLEL_MIN_FILES = 4 # 需要解析的文件少于这个数时直接在当前进程中解析，省去启动进程的开销
+
+
+def parse_list(file_path: str) -> Tuple[str, List[Tuple[str, str]], Optional[str]]:
+    """解析一个词表，返回 (路径, [(单词, 释义)], 错误信息)；在子进程中运行，只能用可 pickle 的参数和返回值"""
+    try:
+        return file_path, [(row[0], row[1]) for row in word_table(file_path).iter_rows()], None
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return file_path, [], str(e)
+
+
+class LibraryList:
+    __slots__ = ("path", "mtime_ns", "size", "rows", "error")
+
+    def __init__(self, path: str, mtime_ns: int, size: int):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.rows: List[Tuple[str, str]] = []
+        self.error: Optional[str] = None # 无法解析时的错误信息
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+
+class WordLibrary:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lists: Dict[str, LibraryList] = {}
+        self._index: Dict[str, List[Tuple[str, int]]] = {} # 规范化单词 -> [(词表路径, 行号)]
+
+    def __len__(self):
+        return sum(len(library_list.rows) for library_list in self._lists.values())
+
+    @property
+    def lists(self) -> List[LibraryList]:
+        return [self._lists[path] for path in sorted(self._lists)]
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        found = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and is_list_file(entry.name) and not entry.name.startswith("."):
+                    found[entry.path] = entry.stat()
+        return found
+
+    def refresh(self, max_workers: Optional[int] = None,
+                progress: Optional[Callable[[int, int], None]] = None) -> Tuple[int, int]:
+        """
+        重新扫描目录，只解析新增或改动过的词表。progress 收到 (已解析的文件数, 需要解析的文件数)。
+        返回: (重新解析的文件数, 移除的文件数)
+        """
+        found = self._scan()
+        removed = [path for path in self._lists if path not in found]
+        for path in removed:
+            self._unindex(self._lists.pop(path))
+
+        changed = [path for path, stat in found.items()
+                   if path not in self._lists
+                   or (self._lists[path].mtime_ns, self._lists[path].size) != (stat.st_mtime_ns, stat.st_size)]
+        for done, (path, rows, error) in enumerate(self._parse(changed, found, max_workers), start=1):
+            old = self._lists.get(path)
+            if old is not None:
+                self._unindex(old)
+            stat = found[path]
+            library_list = LibraryList(path, stat.st_mtime_ns, stat.st_size)
+            library_list.rows, library_list.error = rows, error
+            self._lists[path] = library_list
+            self._add_to_index(library_list)
+            if progress is not None:
+                progress(done, len(changed))
+        return len(changed), len(removed)
+
+    def _parse(self, paths: List[str], stats: Dict[str, os.stat_result],
+               max_workers: Optional[int]) -> Iterator[Tuple[str, List[Tuple[str, str]], Optional[str]]]:
+        """stats 是 _scan 的结果；不再 stat 一遍，扫描之后被删除的文件只在 parse_list 中报告为错误"""
+        workers = min(max_workers or os.cpu_count() or 1, len(paths))
+        if len(paths) < PARALLEL_MIN_FILES or workers <= 1:
+            yield from map(parse_list, paths)
+            return
+        # spawn：调用方可能是带有 Qt 线程的 GUI 进程，fork 出的子进程不安全
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(parse_list, path) for path in sorted(paths, key=lambda path: stats[path].st_size, reverse=True)]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _add_to_index(self, library_list: LibraryList):
+        index, path = self._index, library_list.path
+        for row, (word, _) in enumerate(library_list.rows):
+            key = normalize_word(word)
+            if key:
+                index.setdefault(key, []).append((path, row))
+
+    def _unindex(self, library_list: LibraryList):
+        index, path = self._index, library_list.path
+        for word, _ in library_list.rows:
+            key = normalize_word(word)
+            locations = index.get(key)
+            if locations is None:
+                continue
+            locations[:] = [location for location in locations if location[0] != path]
+            if not locations:
+                del index[key]
+
+    # --- 查询 ---
+    def locate(self, word: str) -> List[Tuple[str, int]]:
+        """word（忽略大小写和首尾空白）出现在哪些词表的哪些行"""
+        return list(self._index.get(normalize_word(word), ()))
+
+    def entry(self, path: str, row: int) -> Tuple[str, str]:
+        return self._lists[path].rows[row]
+
+    def iter_rows(self) -> Iterator[Tuple[str, str, str]]:
+        """按词表名依次返回所有 (单词, 释义, 词表名)"""
+        for library_list in self.lists:
+            name = library_list.name
+            for word, definition in library_list.rows:
+                yield word, definition, name
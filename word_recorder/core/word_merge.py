@@ -0,0 +1,156 @@
+# word_recorder/core/word_merge.py
+"""
+把多个词表合并为一个，按规范化后的单词（去首尾空白、忽略大小写）去重（不依赖 PySide6 / pandas）。
+
+采用外部排序归并，内存占用只与 run_rows 有关，与输入文件总大小无关：
+    1. 依次读取所有输入，每攒够 run_rows 行就按 (规范化单词, 读入顺序) 排序后写入一个临时有序文件（run）；
+    2. run 太多时先分批归并成更大的 run，保证同时打开的文件不超过 MAX_OPEN_RUNS 个；
+    3. 最后一次多路归并，相邻的同名单词按 policy 合并释义，结果按单词排序写入输出文件。
+临时文件默认放在输出文件所在目录（而不是可能位于内存中的系统临时目录）。
+"""
+import csv
+import heapq
+import itertools
+import os
+import tempfile
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from core.fuzzy_index import normalize_word
+from core.word_store import word_table
+
+DEFAULT_RUN_ROWS = 200000 # 每个 run 在内存中排序的行数
+MAX_OPEN_RUNS = 64        # 一次归并最多同时打开的 run 文件数
+PROGRESS_EVERY = 10000
+DEFINITION_SEPARATOR = "；"
+
+# 同一单词有多个不同释义时的处理方式
+MERGE_POLICIES = {
+    "first": "保留第一个非空释义",
+    "last": "保留最后一个非空释义",
+    "longest": "保留最长的释义",
+    "concat": "合并所有不同的释义",
+}
+DEFAULT_POLICY = "first"
+
+_RUN_ENCODING = "utf-8"
+
+
+class MergeCancelled(Exception):
+    """合并被用户取消"""
+
+
+def _merge_definitions(definitions: List[str], policy: str) -> str:
+    """definitions 按读入顺序排列，已去掉首尾空白"""
+    non_empty = [definition for definition in definitions if definition]
+    if not non_empty:
+        return ""
+    if policy == "first":
+        return non_empty[0]
+    if policy == "last":
+        return non_empty[-1]
+    if policy == "longest":
+        return max(non_empty, key=len) # 一样长时取先出现的
+    return DEFINITION_SEPARATOR.join(dict.fromkeys(non_empty))
+
+
+def _write_run(records: List[Tuple[str, int, str, str]], work_dir: str) -> str:
+    records.sort()
+    handle, run_path = tempfile.mkstemp(prefix="run_", suffix=".csv", dir=work_dir)
+    with open(handle, mode="w", newline="", encoding=_RUN_ENCODING) as file:
+        csv.writer(file).writerows(records)
+    return run_path
+
+
+def _read_run(run_path: str) -> Iterator[Tuple[str, int, str, str]]:
+    with open(run_path, mode="r", newline="", encoding=_RUN_ENCODING) as file:
+        for key, order, word, definition in csv.reader(file):
+            yield key, int(order), word, definition
+
+
+def _merge_runs(run_paths: Sequence[str]) -> Iterator[Tuple[str, int, str, str]]:
+    """(规范化单词, 读入顺序) 是唯一的，元组直接比较即可"""
+    return heapq.merge(*(_read_run(run_path) for run_path in run_paths))
+
+
+def _reduce_runs(run_paths: List[str], work_dir: str) -> List[str]:
+    """run 太多时分批归并，直到剩下的 run 能在最后一次归并中同时打开"""
+    while len(run_paths) > MAX_OPEN_RUNS:
+        merged = []
+        for start in range(0, len(run_paths), MAX_OPEN_RUNS):
+            batch = run_paths[start:start + MAX_OPEN_RUNS]
+            handle, run_path = tempfile.mkstemp(prefix="run_", suffix=".csv", dir=work_dir)
+            with open(handle, mode="w", newline="", encoding=_RUN_ENCODING) as file:
+                csv.writer(file).writerows(_merge_runs(batch))
+            for path in batch:
+                os.remove(path)
+            merged.append(run_path)
+        run_paths = merged
+    return run_paths
+
+
+def merge_word_lists(input_paths: Sequence[str], output_path: str, policy: str = DEFAULT_POLICY,
+                     run_rows: int = DEFAULT_RUN_ROWS, work_dir: Optional[str] = None,
+                     progress: Optional[Callable[[int], None]] = None,
+                     is_cancelled: Optional[Callable[[], bool]] = None) -> Tuple[int, int]:
+    """
+    合并 input_paths 中的词表并写入 output_path（先写临时文件再替换，输出文件也可以是输入之一）。
+    单词的写法取第一次出现时的写法；progress 收到已处理的行数（读入和写出各算一遍）。
+    取消时抛出 MergeCancelled，格式错误时抛出 ValueError（TableFormatError）。
+    返回: (读入的行数, 写出的单词数)
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f"不支持的合并方式: {policy}")
+    if not input_paths:
+        raise ValueError("没有要合并的词表。")
+
+    processed = 0
+
+    def tick():
+        nonlocal processed
+        processed += 1
+        if processed % PROGRESS_EVERY == 0:
+            if is_cancelled is not None and is_cancelled():
+                raise MergeCancelled()
+            if progress is not None:
+                progress(processed)
+
+    parent_dir = work_dir or os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(prefix=".word_merge_", dir=parent_dir) as run_dir:
+        run_paths = []
+        records = []
+        order = itertools.count()
+        for input_path in input_paths:
+            for row in word_table(input_path).iter_rows():
+                word = row[0].strip()
+                key = normalize_word(word)
+                if key:
+                    records.append((key, next(order), word, row[1].strip()))
+                    if len(records) >= run_rows:
+                        run_paths.append(_write_run(records, run_dir))
+                        records = []
+                tick()
+        read = processed
+        if records:
+            run_paths.append(_write_run(records, run_dir))
+        records = None
+        run_paths = _reduce_runs(run_paths, run_dir)
+
+        written = 0
+
+        def merged_rows() -> Iterable[Tuple[str, str]]:
+            nonlocal written
+            for _, group in itertools.groupby(_merge_runs(run_paths), key=lambda record: record[0]):
+                definitions = []
+                word = None
+                for _, _, spelling, definition in group:
+                    if word is None:
+                        word = spelling
+                    definitions.append(definition)
+                    tick()
+                written += 1
+                yield word, _merge_definitions(definitions, policy)
+
+        word_table(output_path).rewrite_rows(merged_rows())
+    if progress is not None:
+        progress(processed)
+    return read, written
@@ -0,0 +1,40 @@
+# word_recorder/core/word_store.py
+"""
+词表 CSV 的纯标准库读写（不依赖 pandas / PySide6）。
+词表的表结构在这里声明，读写由 common.table_store 完成；DataManager 与命令行工具共用。
+"""
+from typing import Iterable, Iterator, List, Sequence
+
+from common.table_store import Column, TableFile, TableSchema
+
+WORD_LIST_SCHEMA = TableSchema([Column("单词"), Column("释义")])
+WORD_LIST_COLUMNS = WORD_LIST_SCHEMA.names
+LIST_EXTENSIONS = (".csv", ".csv.gz", ".csv.zst") # .gz / .zst 为压缩的词表，读写方式相同
+LIST_FILE_FILTER = "CSV 文件 (*.csv *.csv.gz *.csv.zst);;所有文件 (*)"
+
+
+def word_table(file_path: str) -> TableFile:
+    return TableFile(file_path, WORD_LIST_SCHEMA)
+
+
+def is_list_file(file_path: str) -> bool:
+    return file_path.lower().endswith(LIST_EXTENSIONS)
+
+
+def with_list_extension(file_path: str) -> str:
+    """没有词表扩展名时补上 .csv"""
+    return file_path if is_list_file(file_path) else file_path + ".csv"
+
+
+def iter_words(file_path: str) -> Iterator[List[str]]:
+    """逐行读取词表，跳过标准表头和空行；列数不对时抛出 ValueError（TableFormatError）"""
+    return word_table(file_path).iter_rows()
+
+
+def count_words(file_path: str) -> int:
+    return word_table(file_path).count_rows()
+
+
+def append_words(file_path: str, rows: Iterable[Sequence[str]]) -> int:
+    """把 (单词, 释义) 追加到文件末尾；文件不存在或为空时先写入标准表头。返回追加的行数"""
+    return word_table(file_path).append_rows([word, definition] for word, definition in rows if word)
@@ -1,421 +1,851 @@
-﻿# word_recorder/main_window.py
-import sys
-import os
-
-# PySide6 imports
-from PySide6.QtCore import Qt, Slot, QSize
-from PySide6.QtGui import (QAction, QIcon, QKeySequence, QCloseEvent, QGuiApplication, QFont,
-                           QActionGroup) # <-- QActionGroup 被添加到这里
-from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QTabWidget,
-                               QFileDialog, QMessageBox, QLabel, QToolBar, QApplication)
-
-# Local application imports
-from core.settings_manager import SettingsManager
-from core.data_manager import DataManager
-from models.word_list_model import WordListModel
-from tabs.add_word_tab import AddWordTab
-from tabs.preview_tab import PreviewTab
-
-# --- Icon Path Helper ---
-ICON_PATH = os.path.join(os.path.dirname(__file__), "resources", "icons")
-
-def get_icon(name: str) -> QIcon:
-    path = os.path.join(ICON_PATH, name)
-    if os.path.exists(path):
-        return QIcon(path)
-    # Fallback to theme icons if custom icon not found
-    if name == "new_file.png": return QIcon.fromTheme("document-new", QIcon(
-        ":/qt-project.org/styles/commonstyle/images/standardbutton-new-32.png"))
-    if name == "open_file.png": return QIcon.fromTheme("document-open", QIcon(
-        ":/qt-project.org/styles/commonstyle/images/standardbutton-open-32.png"))
-    if name == "save_file.png": return QIcon.fromTheme("document-save", QIcon(
-        ":/qt-project.org/styles/commonstyle/images/standardbutton-save-32.png"))
-    if name == "toggle_theme.png": return QIcon.fromTheme("preferences-desktop-theme", QIcon(
-        ":/qt-project.org/styles/commonstyle/images/standardbutton-িক্যালেন্ডრი-32.png"))  # Placeholder
-    return QIcon()  # Empty icon
-
-
-class MainWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("单词记录本")
-        self.setGeometry(100, 100, 800, 600)  # x, y, width, height
-
-        self.settings_manager = SettingsManager()
-        self.data_manager = DataManager()
-        self.word_model = WordListModel(self.data_manager.get_data())
-
-        self._init_ui()
-        self._load_settings()  # 加载并应用字体和主题
-
-        self._auto_load_last_file()  # <--- 新增调用
-
-        self._update_status_bar()  # 确保在自动加载后更新状态栏
-        self._update_word_count_display()
-
-        if not self.data_manager.filepath:  # 如果没有自动加载文件
-            self.add_tab.stop_random_word_timer()
-            self.add_tab.display_random_word(None, None)
-
-    def _auto_load_last_file(self):
-        """尝试自动加载上次打开的文件"""
-        last_file = self.settings_manager.load_last_opened_file()
-        if last_file and os.path.exists(last_file):
-            # print(f"Attempting to auto-load: {last_file}") # Debugging
-            success, message = self.data_manager.load_csv(last_file)
-            if success:
-                self.word_model.set_data(self.data_manager.get_data())
-                # _update_all_displays() 会在 __init__ 的后续部分被间接调用
-                if self.data_manager.get_word_count() > 0:
-                    self.add_tab.start_random_word_timer()
-                    self._display_random_word_on_tab()
-                # QMessageBox.information(self, "自动加载", f"已自动加载词表: {os.path.basename(last_file)}") # 可选提示
-            else:
-                QMessageBox.warning(self, "自动加载失败",
-                                    f"无法自动加载上次的词表 '{os.path.basename(last_file)}':\n{message}\n\n将清空此记录。")
-                self.settings_manager.save_last_opened_file(None)  # 清除无效路径
-        # else:
-        # print("No last file to load or file does not exist.") # Debugging
-
-# ...
-
-    def _init_ui(self):
-        # --- Central Widget and Layout ---
-        self.central_widget = QWidget()
-        self.main_layout = QVBoxLayout(self.central_widget)
-        self.main_layout.setContentsMargins(0, 0, 0, 0)  # 让infobar和tabwidget紧贴边缘
-        self.main_layout.setSpacing(0)
-        self.setCentralWidget(self.central_widget)
-
-        # --- Info Bar (Status Label) ---
-        self.info_bar_label = QLabel("当前无列表打开")
-        self.info_bar_label.setObjectName("infoBarLabel")  # For QSS styling
-        self.info_bar_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.info_bar_label.setFixedHeight(30)  # 固定高度
-        self.main_layout.addWidget(self.info_bar_label)
-
-        # --- Tab Widget ---
-        self.tab_widget = QTabWidget()
-        self.add_tab = AddWordTab()
-        self.preview_tab = PreviewTab()
-        self.preview_tab.set_model(self.word_model)
-
-        self.tab_widget.addTab(self.add_tab, "新增单词")
-        self.tab_widget.addTab(self.preview_tab, "词表预览")
-        self.main_layout.addWidget(self.tab_widget)
-
-        # --- Connect Signals from Tabs ---
-        self.add_tab.add_word_requested.connect(self._handle_add_word)
-        self.add_tab.random_word_requested.connect(self._display_random_word_on_tab)
-
-        # --- Actions, Menus, Toolbars ---
-        self._create_actions()
-        self._create_menus()
-        self._create_toolbars()
-
-    def _load_settings(self):
-        # Load and apply theme
-        current_theme = self.settings_manager.load_theme()
-        self._apply_theme(current_theme)
-        # Update theme toggle button state
-        self.toggle_theme_action.setChecked(current_theme == "dark")
-
-        # Load and apply font size
-        font_size_str = self.settings_manager.load_font_size()
-        self._apply_font_size(font_size_str)
-        # Update font menu check state
-        if font_size_str == "small":
-            self.small_font_action.setChecked(True)
-        elif font_size_str == "medium":
-            self.medium_font_action.setChecked(True)
-        elif font_size_str == "large":
-            self.large_font_action.setChecked(True)
-
-    def _create_actions(self):
-        # File Actions
-        self.new_action = QAction(get_icon("new_file.png"), "创建单词表 (&N)", self,
-                                  shortcut=QKeySequence.StandardKey.New, statusTip="创建一个新的单词表",
-                                  triggered=self.new_list)
-        self.open_action = QAction(get_icon("open_file.png"), "打开单词表 (&O)", self,
-                                   shortcut=QKeySequence.StandardKey.Open, statusTip="打开一个已存在的单词表",
-                                   triggered=self.open_list)
-        self.save_action = QAction(get_icon("save_file.png"), "保存 (&S)", self,
-                                   shortcut=QKeySequence.StandardKey.Save, statusTip="保存当前单词表",
-                                   triggered=self.save_list)
-        self.save_as_action = QAction("另存为 (&A)...", self,
-                                      shortcut=QKeySequence.StandardKey.SaveAs, triggered=self.save_as_list)
-        self.exit_action = QAction("退出 (&X)", self, shortcut="Ctrl+Q", triggered=self.close)
-
-        # Settings Actions - Font
-        self.small_font_action = QAction("小", self, checkable=True, triggered=lambda: self.update_font_size("small"))
-        self.medium_font_action = QAction("中", self, checkable=True, triggered=lambda: self.update_font_size("medium"))
-        self.large_font_action = QAction("大", self, checkable=True, triggered=lambda: self.update_font_size("large"))
-
-        # Settings Actions - Theme (Toolbar will have a toggle button)
-        self.light_theme_action = QAction("明亮主题", self, checkable=True, triggered=lambda: self._set_theme("light"))
-        self.dark_theme_action = QAction("黑暗主题", self, checkable=True, triggered=lambda: self._set_theme("dark"))
-
-        self.toggle_theme_action = QAction(get_icon("toggle_theme.png"), "切换主题", self,
-                                           checkable=True, statusTip="切换明亮/黑暗主题",
-                                           triggered=self.toggle_theme)
-
-    def _create_menus(self):
-        menu_bar = self.menuBar()
-
-        # File Menu
-        file_menu = menu_bar.addMenu("开始 (&F)")
-        file_menu.addAction(self.new_action)
-        file_menu.addAction(self.open_action)
-        file_menu.addAction(self.save_action)
-        file_menu.addAction(self.save_as_action)
-        file_menu.addSeparator()
-        file_menu.addAction(self.exit_action)
-
-        # Settings Menu
-        settings_menu = menu_bar.addMenu("设置 (&S)")
-        font_menu = settings_menu.addMenu("字体大小")
-        font_menu.addAction(self.small_font_action)
-        font_menu.addAction(self.medium_font_action)
-        font_menu.addAction(self.large_font_action)
-
-        self.font_size_group = QActionGroup(self)  # 不传递父对象
-        self.font_size_group.addAction(self.small_font_action)
-        self.font_size_group.addAction(self.medium_font_action)
-        self.font_size_group.addAction(self.large_font_action)
-        # self.medium_font_action.setChecked(True) # Default, will be overridden by load_settings
-
-        theme_menu = settings_menu.addMenu("程序背景")
-        theme_menu.addAction(self.light_theme_action)
-        theme_menu.addAction(self.dark_theme_action)
-
-        self.theme_group = QActionGroup(self)  # 不传递父对象
-        self.theme_group.addAction(self.light_theme_action)
-        self.theme_group.addAction(self.dark_theme_action)
-        # self.light_theme_action.setChecked(True) # Default, will be overridden by load_settings
-
-    def _create_toolbars(self):
-        file_toolbar = self.addToolBar("File")
-        file_toolbar.setIconSize(QSize(24, 24))  # Set icon size
-        file_toolbar.addAction(self.new_action)
-        file_toolbar.addAction(self.open_action)
-        file_toolbar.addAction(self.save_action)
-
-        settings_toolbar = self.addToolBar("Settings")
-        settings_toolbar.setIconSize(QSize(24, 24))
-        settings_toolbar.addAction(self.toggle_theme_action)
-
-    # --- Action Handlers / Slots ---
-    def _prompt_save_if_dirty(self) -> bool:
-        """如果数据已更改，提示用户保存。返回 True 表示可以继续操作，False 表示用户取消。"""
-        if not self.data_manager.is_dirty:
-            return True  # No changes, proceed
-
-        reply = QMessageBox.warning(
-            self, "未保存的更改",
-            f"词表 '{self.data_manager.get_current_filename()}' 有未保存的更改。是否保存？",
-            QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel
-        )
-        if reply == QMessageBox.StandardButton.Save:
-            return self.save_list()  # save_list returns True on success, False on failure/cancel
-        elif reply == QMessageBox.StandardButton.Cancel:
-            return False  # User cancelled
-        return True  # User chose Discard
-
-    def new_list(self):
-        if not self._prompt_save_if_dirty():
-            return
-
-        # 立即弹出保存对话框让用户命名新词表
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "创建并保存新单词表", # 对话框标题
-            self.data_manager.filepath or "untitled.csv", # 默认文件名或路径
-            "CSV 文件 (*.csv);;所有文件 (*)"
-        )
-
-        if file_path:
-            # 确保文件有 .csv 后缀
-            if not file_path.lower().endswith(".csv"):
-                file_path += ".csv"
-
-            self.data_manager.create_new_list()  # 初始化一个空的DataFrame
-            self.data_manager.filepath = file_path   # 设置文件路径
-
-            # 将这个空的DataFrame（带表头）保存到磁盘，以创建文件
-            # data_manager.save_csv() 会将 is_dirty 设置为 False
-            success, message = self.data_manager.save_csv(file_path)
-
-            if success:
-                self.word_model.set_data(self.data_manager.get_data()) # 更新模型
-                self._update_all_displays() # 更新UI（状态栏会显示新文件名）
-                self.add_tab.clear_inputs()
-                self.add_tab.stop_random_word_timer()
-                self.add_tab.display_random_word(None, None)
-                QMessageBox.information(self, "创建成功", f"词表 '{os.path.basename(file_path)}' 已创建并连接。")
-                # 新创建并保存后，这也是最后操作的文件
-                self.settings_manager.save_last_opened_file(file_path)
-            else:
-                QMessageBox.critical(self, "创建失败", f"无法创建词表文件：{message}")
-                # 创建失败，重置状态，避免程序处于不一致状态
-                self.data_manager.create_new_list() # 回到完全未命名状态
-                self.data_manager.filepath = None
-                self.word_model.set_data(self.data_manager.get_data())
-                self._update_all_displays()
-        # else: 用户取消了文件对话框，不执行任何操作
-
-    def open_list(self):
-        if not self._prompt_save_if_dirty():
-            return
-
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "打开单词表", "", "CSV 文件 (*.csv);;所有文件 (*)"
-        )
-        if file_path:
-            success, message = self.data_manager.load_csv(file_path)
-            if success:
-                self.word_model.set_data(self.data_manager.get_data())
-                QMessageBox.information(self, "打开成功", message)
-                self.settings_manager.save_last_opened_file(file_path)
-                if self.data_manager.get_word_count() > 0:
-                    self.add_tab.start_random_word_timer()
-                    self._display_random_word_on_tab()  # Display one immediately
-                else:
-                    self.add_tab.stop_random_word_timer()
-                    self.add_tab.display_random_word(None, None)
-
-            else:
-                QMessageBox.critical(self, "打开失败", message)
-                if self.data_manager.dataframe is None:
-                    self.data_manager.create_new_list()
-                    self.word_model.set_data(self.data_manager.get_data())
-            self._update_all_displays()
-
-    def save_list(self) -> bool:
-        if not self.data_manager.is_dirty and self.data_manager.filepath:
-            return True
-
-        if not self.data_manager.filepath:
-            return self.save_as_list()
-        else:
-            success, message = self.data_manager.save_csv()
-            if success:
-                QMessageBox.information(self, "保存成功", message)
-                self._update_status_bar()
-                self.settings_manager.save_last_opened_file(self.data_manager.filepath)
-                return True
-            else:
-                QMessageBox.critical(self, "保存失败", message)
-                return False
-
-    def save_as_list(self) -> bool:
-        if self.data_manager.dataframe is None:
-            QMessageBox.warning(self, "另存为", "没有可保存的数据。")
-            return False
-
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "单词表另存为", self.data_manager.filepath or "untitled.csv",
-            "CSV 文件 (*.csv);;所有文件 (*)"
-        )
-        if file_path:
-            success, message = self.data_manager.save_csv(file_path)
-            if success:
-                QMessageBox.information(self, "保存成功", message)
-                self._update_status_bar()
-                self.settings_manager.save_last_opened_file(file_path)
-                return True
-            else:
-                QMessageBox.critical(self, "保存失败", message)
-                return False
-        return False
-
-    @Slot(str, str)
-    def _handle_add_word(self, word: str, definition: str):
-        if self.data_manager.add_word(word, definition):
-            self.word_model.set_data(self.data_manager.get_data())
-            self._update_word_count_display()
-            self.add_tab.clear_inputs()
-            self._update_status_bar()
-            if self.data_manager.get_word_count() == 1:
-                self.add_tab.start_random_word_timer()
-                self._display_random_word_on_tab()
-        else:
-            QMessageBox.warning(self, "添加失败", "无法添加单词（可能是单词为空）。")
-
-    @Slot()
-    def _display_random_word_on_tab(self):
-        random_entry = self.data_manager.get_random_word()
-        if random_entry:
-            self.add_tab.display_random_word(random_entry[0], random_entry[1])
-        else:
-            self.add_tab.display_random_word(None, None)
-
-    def _update_status_bar(self):
-        filename = self.data_manager.get_current_filename()
-        dirty_indicator = "*" if self.data_manager.is_dirty else ""
-        if filename == "未命名" and not self.data_manager.is_dirty and self.data_manager.get_word_count() == 0:
-            self.info_bar_label.setText("当前无列表打开")
-            self.setWindowTitle("单词记录本")
-        else:
-            self.info_bar_label.setText(f"当前词表：{filename}{dirty_indicator}")
-            self.setWindowTitle(f"{filename}{dirty_indicator} - 单词记录本")
-
-    def _update_word_count_display(self):
-        count = self.data_manager.get_word_count()
-        self.add_tab.update_word_count(count)
-
-    def _update_all_displays(self):
-        self._update_status_bar()
-        self._update_word_count_display()
-        if self.preview_tab.table_view.model(): # Check if model exists before calling layoutChanged
-             self.preview_tab.table_view.model().layoutChanged.emit()
-
-
-    # --- Theme and Font Management ---
-    def _apply_theme(self, theme_name: str):
-        stylesheet = self.settings_manager.load_stylesheet(theme_name)
-        QApplication.instance().setStyleSheet(stylesheet)
-        self.settings_manager.save_theme(theme_name)
-        # Update menu check state
-        self.light_theme_action.setChecked(theme_name == "light")
-        self.dark_theme_action.setChecked(theme_name == "dark")
-        self.toggle_theme_action.setChecked(theme_name == "dark")
-
-    def _set_theme(self, theme_name: str):
-        self._apply_theme(theme_name)
-
-    def toggle_theme(self):
-        current_theme = self.settings_manager.load_theme()
-        new_theme = "dark" if current_theme == "light" else "light"
-        self._apply_theme(new_theme)
-
-    def _apply_font_size(self, size_str: str):
-        font = self.settings_manager.get_font(size_str)
-        QApplication.instance().setFont(font) # 设置应用全局字体
-
-        # 尝试强制刷新样式以应用字体更改
-        # 有时，仅仅 QApplication.setFont() 可能不足以更新所有通过QSS设置过字体的控件
-        # 重新应用当前样式表可以帮助解决这个问题
-        current_stylesheet = QApplication.instance().styleSheet()
-        QApplication.instance().setStyleSheet("") # 临时清除
-        QApplication.instance().setStyleSheet(current_stylesheet) # 重新应用
-
-        self.settings_manager.save_font_size(size_str)
-        # Update menu check state
-        self.small_font_action.setChecked(size_str == "small")
-        self.medium_font_action.setChecked(size_str == "medium")
-        self.large_font_action.setChecked(size_str == "large")
-
-    def update_font_size(self, size_str: str):
-        self._apply_font_size(size_str)
-
-    def closeEvent(self, event: QCloseEvent):
-        if self._prompt_save_if_dirty():
-            self.add_tab.stop_random_word_timer()
-            event.accept()
-        else:
-            event.ignore()
-
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
+# word_recorder/main_window.py
+import sys
+import os
+from typing import Optional, Tuple
+
+# 仓库根目录下的 common 包由 word_recorder 与 Bogapp 共享
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+# PySide6 imports
+from PySide6.QtCore import Qt, Slot, QSize, QTimer
+from PySide6.QtGui import (QAction, QIcon, QKeySequence, QCloseEvent, QGuiApplication, QFont,
+                           QActionGroup) # <-- QActionGroup 被添加到这里
+from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QTabWidget,
+                               QFileDialog, QMessageBox, QLabel, QToolBar, QApplication,
+                               QInputDialog, QProgressDialog, QDialog)
+
+# Local application imports
+from core.settings_manager import SettingsManager
+from core.data_manager import DataManager
+from core.dictionary_loader import DictionaryLoader
+from core.list_loader import ListLoader
+from core.merge_worker import MergeWorker
+from core.sync_worker import SyncWorker
+from core.library_loader import LibraryLoader
+from core.word_library import WordLibrary
+from core.word_merge import DEFAULT_POLICY, MERGE_POLICIES
+from core.word_store import LIST_FILE_FILTER, with_list_extension
+from models.word_list_model import WordListModel
+from tabs.add_word_tab import AddWordTab
+from tabs.clean_dialog import CleanPreviewDialog
+from tabs.preview_tab import PreviewTab
+from common.export import EXPORT_FORMATS, format_from_path
+from common.export_worker import ExportWorker, start_export
+from common.instrument import traced
+from common.instrument_panel import add_profiling_actions
+from common.table_store import CHANGE_REPLACED
+
+# --- Icon Path Helper ---
+ICON_PATH = os.path.join(os.path.dirname(__file__), "resources", "icons")
+
+def get_icon(name: str) -> QIcon:
+    path = os.path.join(ICON_PATH, name)
+    if os.path.exists(path):
+        return QIcon(path)
+    # Fallback to theme icons if custom icon not found
+    if name == "new_file.png": return QIcon.fromTheme("document-new", QIcon(
+        ":/qt-project.org/styles/commonstyle/images/standardbutton-new-32.png"))
+    if name == "open_file.png": return QIcon.fromTheme("document-open", QIcon(
+        ":/qt-project.org/styles/commonstyle/images/standardbutton-open-32.png"))
+    if name == "save_file.png": return QIcon.fromTheme("document-save", QIcon(
+        ":/qt-project.org/styles/commonstyle/images/standardbutton-save-32.png"))
+    if name == "toggle_theme.png": return QIcon.fromTheme("preferences-desktop-theme", QIcon(
+        ":/qt-project.org/styles/commonstyle/images/standardbutton-িক্যালেন্ডრი-32.png"))  # Placeholder
+    return QIcon()  # Empty icon
+
+
+class MainWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("单词记录本")
+        self.setGeometry(100, 100, 800, 600)  # x, y, width, height
+
+        self.settings_manager = SettingsManager()
+        self.data_manager = DataManager()
+        self.word_model = None  # 与 PreviewTab 一起在第一次显示“词表预览”时创建
+        self._list_loader = None  # 启动时在后台读取上次打开的词表
+        self._export_worker = None  # 正在运行的后台导出任务
+        self._merge_worker = None  # 正在运行的后台合并任务
+        self.library = None  # 打开的词库目录（WordLibrary）
+        self.library_model = None  # 与词库页一起在第一次打开词库时创建
+        self.library_tab = None
+        self._library_loader = None  # 正在后台刷新的词库
+        self._library_refresh_pending = None  # 刷新期间又请求了刷新：结束后再刷新一次（值为是否重建）
+        self._dictionary = None  # 已加载的离线词典
+        self._dictionary_loader = None  # 正在后台打开的离线词典
+        self._sync_worker = None  # 正在后台同步到同步目录
+        self._sync_pending = False  # 同步期间又保存过，结束后再同步一次
+
+        self._init_ui()
+        self._load_settings()  # 加载并应用字体和主题
+
+        self._update_status_bar()
+        self._update_word_count_display()
+        self._show_next_review()
+
+        # 分阶段启动：先显示窗口，进入事件循环后再在后台读取上次的词表（其中包括导入 pandas）
+        QTimer.singleShot(0, self._auto_load_last_file)
+
+    def _auto_load_last_file(self):
+        """尝试自动加载上次打开的文件"""
+        last_file = self.settings_manager.load_last_opened_file()
+        if not last_file or not os.path.exists(last_file) or self.data_manager.filepath:
+            return
+        self._list_loader = ListLoader(last_file, parent=self)
+        self._list_loader.loaded.connect(self._on_auto_load_finished)
+        self._list_loader.finished.connect(self._list_loader.deleteLater)
+        self.add_tab.setEnabled(False)  # 加载完成前不能添加单词，否则会被加载的词表覆盖
+        self.info_bar_label.setText(f"正在加载：{os.path.basename(last_file)}...")
+        self._list_loader.start()
+
+    @Slot(str, bool, str, object)
+    def _on_auto_load_finished(self, file_path: str, success: bool, message: str, loaded):
+        if self._list_loader is None:  # 已被 _discard_auto_load 放弃（结果可能已经在事件队列中）
+            return
+        self._discard_auto_load()
+        if success:
+            success, message = self.data_manager.apply_loaded(file_path, loaded)
+        if success:
+            self._refresh_word_model()
+            self._show_next_review()
+            # QMessageBox.information(self, "自动加载", f"已自动加载词表: {os.path.basename(file_path)}") # 可选提示
+        else:
+            QMessageBox.warning(self, "自动加载失败",
+                                f"无法自动加载上次的词表 '{os.path.basename(file_path)}':\n{message}\n\n将清空此记录。")
+            self.settings_manager.save_last_opened_file(None)  # 清除无效路径
+        self._update_all_displays()
+
+    def _discard_auto_load(self):
+        """用户在自动加载完成前新建 / 打开了其他词表时，忽略自动加载的结果"""
+        if self._list_loader is not None:
+            self._list_loader.loaded.disconnect(self._on_auto_load_finished)
+            self._list_loader = None
+            self.add_tab.setEnabled(True)
+            self._update_status_bar()
+
+    def _refresh_word_model(self):
+        if self.word_model is not None:  # 还没有显示过“词表预览”时，创建模型时再读取数据
+            self.word_model.set_data(self.data_manager.get_data())
+
+    def _ensure_preview_tab(self) -> PreviewTab:
+        if self.preview_tab is None:
+            self.word_model = WordListModel(self.data_manager.get_data())
+            self.preview_tab = PreviewTab()
+            self.preview_tab.set_model(self.word_model)
+            self._preview_placeholder.layout().addWidget(self.preview_tab)
+        return self.preview_tab
+
+    @Slot(int)
+    def _on_tab_changed(self, index: int):
+        if self.tab_widget.widget(index) is self._preview_placeholder:
+            self._ensure_preview_tab()
+
+# ...
+
+    def _init_ui(self):
+        # --- Central Widget and Layout ---
+        self.central_widget = QWidget()
+        self.main_layout = QVBoxLayout(self.central_widget)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)  # 让infobar和tabwidget紧贴边缘
+        self.main_layout.setSpacing(0)
+        self.setCentralWidget(self.central_widget)
+
+        # --- Info Bar (Status Label) ---
+        self.info_bar_label = QLabel("当前无列表打开")
+        self.info_bar_label.setObjectName("infoBarLabel")  # For QSS styling
+        self.info_bar_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.info_bar_label.setFixedHeight(30)  # 固定高度
+        self.main_layout.addWidget(self.info_bar_label)
+
+        # --- Tab Widget ---
+        self.tab_widget = QTabWidget()
+        self.add_tab = AddWordTab()
+        self.add_tab.set_fuzzy_index(self.data_manager.fuzzy_index)
+        self.preview_tab = None  # 第一次切换到“词表预览”时才创建，见 _ensure_preview_tab
+        self._preview_placeholder = QWidget()
+        placeholder_layout = QVBoxLayout(self._preview_placeholder)
+        placeholder_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.tab_widget.addTab(self.add_tab, "新增单词")
+        self.tab_widget.addTab(self._preview_placeholder, "词表预览")
+        self.tab_widget.currentChanged.connect(self._on_tab_changed)
+        self.main_layout.addWidget(self.tab_widget)
+
+        # --- Connect Signals from Tabs ---
+        self.add_tab.add_word_requested.connect(self._handle_add_word)
+        self.add_tab.next_review_requested.connect(self._show_next_review)
+        self.add_tab.review_graded.connect(self._handle_review_graded)
+
+        # --- Actions, Menus, Toolbars ---
+        self._create_actions()
+        self._create_menus()
+        self._create_toolbars()
+
+    def _load_settings(self):
+        # 按设置快照应用字体和主题，此后由设置的变化信号驱动界面更新
+        self._apply_theme(self.settings_manager.load_theme())
+        self._apply_font_size(self.settings_manager.load_font_size())
+        self.settings_manager.theme_changed.connect(self._apply_theme)
+        self.settings_manager.font_size_changed.connect(self._apply_font_size)
+
+        dictionary_path = self.settings_manager.load_dictionary_path()
+        if dictionary_path and os.path.exists(dictionary_path):
+            self._open_dictionary(dictionary_path)
+        self._update_sync_actions()
+
+    def _create_actions(self):
+        # File Actions
+        self.new_action = QAction(get_icon("new_file.png"), "创建单词表 (&N)", self,
+                                  shortcut=QKeySequence.StandardKey.New, statusTip="创建一个新的单词表",
+                                  triggered=self.new_list)
+        self.open_action = QAction(get_icon("open_file.png"), "打开单词表 (&O)", self,
+                                   shortcut=QKeySequence.StandardKey.Open, statusTip="打开一个已存在的单词表",
+                                   triggered=self.open_list)
+        self.save_action = QAction(get_icon("save_file.png"), "保存 (&S)", self,
+                                   shortcut=QKeySequence.StandardKey.Save, statusTip="保存当前单词表",
+                                   triggered=self.save_list)
+        self.save_as_action = QAction("另存为 (&A)...", self,
+                                      shortcut=QKeySequence.StandardKey.SaveAs, triggered=self.save_as_list)
+        self.export_action = QAction("导出 (&E)...", self, statusTip="将当前单词表导出为 Markdown / HTML / Excel",
+                                     triggered=self.export_list)
+        self.merge_action = QAction("合并词表 (&M)...", self, statusTip="把多个单词表合并为一个并去除重复单词",
+                                    triggered=self.merge_lists)
+        self.clean_action = QAction("整理词表 (&C)...", self,
+                                    statusTip="规范化全角字符和空白，合并大小写不同的重复单词，删除空单词",
+                                    triggered=self.clean_list)
+        self.open_library_action = QAction("打开词库目录 (&L)...", self,
+                                           statusTip="把一个目录中的所有单词表合并预览和搜索",
+                                           triggered=self.open_library)
+        self.refresh_library_action = QAction("刷新词库 (&R)", self, shortcut=QKeySequence.StandardKey.Refresh,
+                                              statusTip="重新读取词库目录中改动过的单词表",
+                                              triggered=self.refresh_library, enabled=False)
+        self.exit_action = QAction("退出 (&X)", self, shortcut="Ctrl+Q", triggered=self.close)
+
+        # Settings Actions - Font
+        self.small_font_action = QAction("小", self, checkable=True, triggered=lambda: self.update_font_size("small"))
+        self.medium_font_action = QAction("中", self, checkable=True, triggered=lambda: self.update_font_size("medium"))
+        self.large_font_action = QAction("大", self, checkable=True, triggered=lambda: self.update_font_size("large"))
+
+        # Settings Actions - Theme (Toolbar will have a toggle button)
+        self.light_theme_action = QAction("明亮主题", self, checkable=True, triggered=lambda: self._set_theme("light"))
+        self.dark_theme_action = QAction("黑暗主题", self, checkable=True, triggered=lambda: self._set_theme("dark"))
+
+        self.dictionary_action = QAction("离线词典 (&D)...", self, statusTip="选择用于自动填写释义的离线词典",
+                                         triggered=self.choose_dictionary)
+        self.sync_dir_action = QAction("同步目录 (&Y)...", self,
+                                       statusTip="保存后把词表的改动部分同步到一个目录（本地路径或共享目录）",
+                                       triggered=self.choose_sync_dir)
+        self.stop_sync_action = QAction("停止同步", self, statusTip="保存后不再同步词表",
+                                        triggered=self.stop_sync)
+
+        self.toggle_theme_action = QAction(get_icon("toggle_theme.png"), "切换主题", self,
+                                           checkable=True, statusTip="切换明亮/黑暗主题",
+                                           triggered=self.toggle_theme)
+
+    def _create_menus(self):
+        menu_bar = self.menuBar()
+
+        # File Menu
+        file_menu = menu_bar.addMenu("开始 (&F)")
+        file_menu.addAction(self.new_action)
+        file_menu.addAction(self.open_action)
+        file_menu.addAction(self.save_action)
+        file_menu.addAction(self.save_as_action)
+        file_menu.addAction(self.export_action)
+        file_menu.addAction(self.merge_action)
+        file_menu.addAction(self.clean_action)
+        file_menu.addSeparator()
+        file_menu.addAction(self.open_library_action)
+        file_menu.addAction(self.refresh_library_action)
+        file_menu.addSeparator()
+        file_menu.addAction(self.exit_action)
+
+        # Settings Menu
+        settings_menu = menu_bar.addMenu("设置 (&S)")
+        font_menu = settings_menu.addMenu("字体大小")
+        font_menu.addAction(self.small_font_action)
+        font_menu.addAction(self.medium_font_action)
+        font_menu.addAction(self.large_font_action)
+
+        self.font_size_group = QActionGroup(self)  # 不传递父对象
+        self.font_size_group.addAction(self.small_font_action)
+        self.font_size_group.addAction(self.medium_font_action)
+        self.font_size_group.addAction(self.large_font_action)
+        # self.medium_font_action.setChecked(True) # Default, will be overridden by load_settings
+
+        theme_menu = settings_menu.addMenu("程序背景")
+        theme_menu.addAction(self.light_theme_action)
+        theme_menu.addAction(self.dark_theme_action)
+
+        self.theme_group = QActionGroup(self)  # 不传递父对象
+        self.theme_group.addAction(self.light_theme_action)
+        self.theme_group.addAction(self.dark_theme_action)
+
+        settings_menu.addAction(self.dictionary_action)
+        settings_menu.addAction(self.sync_dir_action)
+        settings_menu.addAction(self.stop_sync_action)
+
+        settings_menu.addSeparator()
+        self.profiling_action = add_profiling_actions(self, settings_menu)
+        # self.light_theme_action.setChecked(True) # Default, will be overridden by load_settings
+
+    def _create_toolbars(self):
+        file_toolbar = self.addToolBar("File")
+        file_toolbar.setIconSize(QSize(24, 24))  # Set icon size
+        file_toolbar.addAction(self.new_action)
+        file_toolbar.addAction(self.open_action)
+        file_toolbar.addAction(self.save_action)
+
+        settings_toolbar = self.addToolBar("Settings")
+        settings_toolbar.setIconSize(QSize(24, 24))
+        settings_toolbar.addAction(self.toggle_theme_action)
+
+    # --- Action Handlers / Slots ---
+    def _prompt_save_if_dirty(self) -> bool:
+        """如果数据已更改，提示用户保存。返回 True 表示可以继续操作，False 表示用户取消。"""
+        if not self.data_manager.is_dirty:
+            return True  # No changes, proceed
+
+        reply = QMessageBox.warning(
+            self, "未保存的更改",
+            f"词表 '{self.data_manager.get_current_filename()}' 有未保存的更改。是否保存？",
+            QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel
+        )
+        if reply == QMessageBox.StandardButton.Save:
+            return self.save_list()  # save_list returns True on success, False on failure/cancel
+        elif reply == QMessageBox.StandardButton.Cancel:
+            return False  # User cancelled
+        return True  # User chose Discard
+
+    def new_list(self):
+        if not self._prompt_save_if_dirty():
+            return
+
+        # 立即弹出保存对话框让用户命名新词表
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "创建并保存新单词表", # 对话框标题
+            self.data_manager.filepath or "untitled.csv", # 默认文件名或路径
+            LIST_FILE_FILTER
+        )
+
+        if file_path:
+            # 确保文件有 .csv 后缀（.csv.gz / .csv.zst 保存为压缩的词表）
+            file_path = with_list_extension(file_path)
+
+            self._discard_auto_load()
+            self.data_manager.create_new_list()  # 初始化一个空的DataFrame
+            self.data_manager.filepath = file_path   # 设置文件路径
+
+            # 将这个空的DataFrame（带表头）保存到磁盘，以创建文件
+            # data_manager.save_csv() 会将 is_dirty 设置为 False
+            success, message = self.data_manager.save_csv(file_path)
+
+            if success:
+                self._refresh_word_model() # 更新模型
+                self._update_all_displays() # 更新UI（状态栏会显示新文件名）
+                self.add_tab.clear_inputs()
+                self._show_next_review()
+                QMessageBox.information(self, "创建成功", f"词表 '{os.path.basename(file_path)}' 已创建并连接。")
+                # 新创建并保存后，这也是最后操作的文件
+                self.settings_manager.save_last_opened_file(file_path)
+                self._start_sync()
+            else:
+                QMessageBox.critical(self, "创建失败", f"无法创建词表文件：{message}")
+                # 创建失败，重置状态，避免程序处于不一致状态
+                self.data_manager.create_new_list() # 回到完全未命名状态
+                self.data_manager.filepath = None
+                self._refresh_word_model()
+                self._update_all_displays()
+        # else: 用户取消了文件对话框，不执行任何操作
+
+    def open_list(self):
+        if not self._prompt_save_if_dirty():
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "打开单词表", "", LIST_FILE_FILTER
+        )
+        if file_path:
+            self._load_list_file(file_path)
+
+    def _load_list_file(self, file_path: str):
+        self._discard_auto_load()
+        success, message = self.data_manager.load_csv(file_path)
+        if success:
+            self._refresh_word_model()
+            QMessageBox.information(self, "打开成功", message)
+            self.settings_manager.save_last_opened_file(file_path)
+            self._show_next_review()  # Display one immediately
+
+        else:
+            QMessageBox.critical(self, "打开失败", message)
+            if self.data_manager.dataframe is None:
+                self.data_manager.create_new_list()
+                self._refresh_word_model()
+                self._show_next_review()
+        self._update_all_displays()
+
+    def save_list(self) -> bool:
+        if not self.data_manager.is_dirty and self.data_manager.filepath:
+            return True
+
+        if not self.data_manager.filepath:
+            return self.save_as_list()
+        else:
+            success, message = self.data_manager.save_csv()
+            if not success and self.data_manager.external_change() == CHANGE_REPLACED:
+                success, message = self._resolve_save_conflict()
+                if message is None:  # 用户取消
+                    return False
+            if success:
+                self._sync_word_model()  # 保存时可能合并了其他程序追加的单词
+                QMessageBox.information(self, "保存成功", message)
+                self._update_status_bar()
+                self.settings_manager.save_last_opened_file(self.data_manager.filepath)
+                self.refresh_library()  # 词表在词库目录中时，词库随之更新
+                self._start_sync()
+                return True
+            else:
+                QMessageBox.critical(self, "保存失败", message)
+                return False
+
+    def _resolve_save_conflict(self) -> Tuple[bool, Optional[str]]:
+        """词表文件被其他程序（或另一个窗口）重写过：让用户选择合并、覆盖或取消。返回 (是否保存成功, 消息)，取消时消息为 None"""
+        box = QMessageBox(QMessageBox.Icon.Warning, "词表已被修改",
+                          f"词表 '{self.data_manager.get_current_filename()}' 在打开之后被其他程序修改过。\n\n"
+                          "合并：读取文件中的内容，再加上本次新增的单词后保存。\n"
+                          "覆盖：用当前的词表覆盖文件，其他程序的修改会丢失。", parent=self)
+        merge_button = box.addButton("合并后保存", QMessageBox.ButtonRole.AcceptRole)
+        overwrite_button = box.addButton("覆盖", QMessageBox.ButtonRole.DestructiveRole)
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        box.setDefaultButton(merge_button)
+        box.exec()
+        if box.clickedButton() is merge_button:
+            success, message = self.data_manager.merge_from_disk()
+            self._refresh_word_model()
+            self._update_all_displays()
+            if not success:
+                return False, message
+            return self.data_manager.save_csv()
+        if box.clickedButton() is overwrite_button:
+            return self.data_manager.save_csv(overwrite=True)
+        return False, None
+
+    def _sync_word_model(self):
+        if self.word_model is not None and self.word_model.rowCount() != self.data_manager.get_word_count():
+            self._refresh_word_model()
+        self._update_word_count_display()
+
+    def save_as_list(self) -> bool:
+        if self.data_manager.dataframe is None:
+            QMessageBox.warning(self, "另存为", "没有可保存的数据。")
+            return False
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "单词表另存为", self.data_manager.filepath or "untitled.csv",
+            LIST_FILE_FILTER
+        )
+        if file_path:
+            success, message = self.data_manager.save_csv(file_path)
+            if success:
+                self._sync_word_model()
+                QMessageBox.information(self, "保存成功", message)
+                self._update_status_bar()
+                self.settings_manager.save_last_opened_file(file_path)
+                self.refresh_library()
+                self._start_sync()
+                return True
+            else:
+                QMessageBox.critical(self, "保存失败", message)
+                return False
+        return False
+
+    def export_list(self):
+        if self._export_worker is not None:
+            QMessageBox.information(self, "导出", "已有导出任务正在进行。")
+            return
+        if self.data_manager.get_word_count() == 0:
+            QMessageBox.warning(self, "导出", "当前词表为空，没有可导出的数据。")
+            return
+
+        base_name = os.path.splitext(self.data_manager.get_current_filename())[0]
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "导出单词表", f"{base_name}.md", ";;".join(EXPORT_FORMATS.values())
+        )
+        if not file_path:
+            return
+        fmt = format_from_path(file_path)
+        if fmt is None: # 没有写扩展名时按所选过滤器补全
+            fmt = next((key for key, name in EXPORT_FORMATS.items() if name == selected_filter), "md")
+            file_path += f".{fmt}"
+
+        self._export_worker = ExportWorker(file_path, fmt, self.data_manager.get_columns(),
+                                           self.data_manager.iter_rows, title=base_name, parent=self)
+        self._export_worker.finished.connect(self._on_export_finished)
+        start_export(self, self._export_worker, self.data_manager.get_word_count())
+
+    @Slot()
+    def _on_export_finished(self):
+        self._export_worker = None
+
+    def merge_lists(self):
+        if self._merge_worker is not None:
+            QMessageBox.information(self, "合并词表", "已有合并任务正在进行。")
+            return
+        input_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择要合并的单词表", os.path.dirname(self.data_manager.filepath or ""),
+            LIST_FILE_FILTER
+        )
+        if not input_paths:
+            return
+        labels = list(MERGE_POLICIES.values())
+        label, ok = QInputDialog.getItem(self, "合并词表", "同一单词有多个释义时：", labels,
+                                         labels.index(MERGE_POLICIES[DEFAULT_POLICY]), False)
+        if not ok:
+            return
+        policy = next(name for name, text in MERGE_POLICIES.items() if text == label)
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "保存合并后的单词表", os.path.join(os.path.dirname(input_paths[0]), "merged.csv"),
+            LIST_FILE_FILTER
+        )
+        if not output_path:
+            return
+        output_path = with_list_extension(output_path)
+
+        current = self.data_manager.filepath
+        involved = [os.path.abspath(path) for path in input_paths + [output_path]]
+        if current and os.path.abspath(current) in involved and not self._prompt_save_if_dirty():
+            return # 当前词表参与合并时，先保存未保存的修改
+
+        self._merge_worker = MergeWorker(input_paths, output_path, policy, parent=self)
+        dialog = QProgressDialog("正在合并...", "取消", 0, 0, self)
+        dialog.setWindowTitle("合并词表")
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+        dialog.canceled.connect(self._merge_worker.cancel)
+        self._merge_worker.progress.connect(lambda count: dialog.setLabelText(f"正在合并... 已处理 {count} 行"))
+        for signal in (self._merge_worker.succeeded, self._merge_worker.failed, self._merge_worker.cancelled):
+            signal.connect(dialog.close) # 先关闭进度对话框，再显示结果
+        self._merge_worker.succeeded.connect(self._on_merge_succeeded)
+        self._merge_worker.failed.connect(lambda message: QMessageBox.critical(self, "合并失败", message))
+        self._merge_worker.finished.connect(dialog.deleteLater)
+        self._merge_worker.finished.connect(self._on_merge_finished)
+        self._merge_worker.start()
+
+    @Slot(int, int)
+    def _on_merge_succeeded(self, read: int, written: int):
+        output_path = self._merge_worker.output_path
+        summary = f"读入 {read} 行，合并后共 {written} 个单词。"
+        current = self.data_manager.filepath
+        if current and os.path.abspath(current) == os.path.abspath(output_path):
+            # 当前打开的词表已被合并结果替换，重新加载
+            self._load_list_file(output_path)
+            self.statusBar().showMessage(summary, 5000)
+            return
+        answer = QMessageBox.question(self, "合并完成", f"{summary}\n\n是否打开合并后的单词表？")
+        if answer == QMessageBox.StandardButton.Yes and self._prompt_save_if_dirty():
+            self._load_list_file(output_path)
+
+    @Slot()
+    def _on_merge_finished(self):
+        self._merge_worker.deleteLater()
+        self._merge_worker = None
+
+    def clean_list(self):
+        if self.data_manager.get_word_count() == 0:
+            QMessageBox.information(self, "整理词表", "当前词表中没有单词。")
+            return
+        dialog = CleanPreviewDialog(self.data_manager.get_data(), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted or dialog.result is None:
+            return
+        self.data_manager.replace_data(dialog.result.frame) # 整个词表一次替换，模型只重置一次
+        self._refresh_word_model()
+        self._update_word_count_display()
+        self._update_status_bar()
+        self._show_next_review()
+        self.statusBar().showMessage(dialog.result.summary(), 5000)
+
+    def open_library(self):
+        directory = QFileDialog.getExistingDirectory(
+            self, "选择词库目录", self.library.directory if self.library else os.path.dirname(self.data_manager.filepath or "")
+        )
+        if directory:
+            self.library = WordLibrary(directory)
+            self._start_library_refresh(rebuild=True)
+
+    def refresh_library(self):
+        if self.library is not None:
+            self._start_library_refresh()
+
+    def _start_library_refresh(self, rebuild: bool = False):
+        if self._library_loader is not None:
+            # 正在进行的刷新可能已经读过刚保存的文件，结束后再刷新一次
+            self._library_refresh_pending = rebuild or bool(self._library_refresh_pending)
+            return
+        self._library_loader = LibraryLoader(self.library, rebuild, parent=self)
+        self._library_loader.progress.connect(self._on_library_progress)
+        self._library_loader.loaded.connect(self._on_library_loaded)
+        self._library_loader.failed.connect(self._on_library_failed)
+        self._library_loader.finished.connect(self._on_library_loader_finished)
+        self.statusBar().showMessage(f"正在读取词库: {self.library.directory}")
+        self._library_loader.start()
+
+    @Slot(int, int)
+    def _on_library_progress(self, done: int, total: int):
+        self.statusBar().showMessage(f"正在读取词库... {done}/{total} 个单词表")
+
+    @Slot(object, int)
+    def _on_library_loaded(self, frame, changed: int):
+        if self.library_tab is None:
+            self.library_model = WordListModel()
+            self.library_tab = PreviewTab()
+            self.library_tab.set_model(self.library_model)
+            self.tab_widget.addTab(self.library_tab, "词库")
+        if frame is not None:
+            self.library_model.set_data(frame)
+        self.tab_widget.setTabText(self.tab_widget.indexOf(self.library_tab),
+                                   f"词库 ({os.path.basename(self.library.directory)})")
+        self.refresh_library_action.setEnabled(True)
+        failed = [library_list.name for library_list in self.library.lists if library_list.error]
+        message = f"词库: {len(self.library.lists)} 个单词表，{len(self.library)} 个单词，{changed} 个单词表有变化"
+        if failed:
+            message += f"；无法读取: {'、'.join(failed)}"
+        self.statusBar().showMessage(message, 8000)
+
+    @Slot(str)
+    def _on_library_failed(self, message: str):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "词库", f"无法读取词库目录:\n{message}")
+
+    @Slot()
+    def _on_library_loader_finished(self):
+        self._library_loader.deleteLater()
+        self._library_loader = None
+        if self._library_refresh_pending is not None and self.library is not None:
+            rebuild, self._library_refresh_pending = self._library_refresh_pending, None
+            self._start_library_refresh(rebuild)
+
+    def _report_library_duplicates(self, word: str):
+        """新增的单词已在词库的其他单词表中时，在状态栏中提示"""
+        if self.library is None or self._library_loader is not None:
+            return
+        current = os.path.abspath(self.data_manager.filepath) if self.data_manager.filepath else None
+        names = sorted({os.path.basename(path) for path, _ in self.library.locate(word)
+                        if os.path.abspath(path) != current})
+        if names:
+            self.statusBar().showMessage(f"“{word}”也在词库的 {'、'.join(names)} 中", 5000)
+
+    def choose_dictionary(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择离线词典", os.path.dirname(self.settings_manager.load_dictionary_path() or ""),
+            "词典文件 (*.csv *.txt *.tab *.tsv);;所有文件 (*)"
+        )
+        if file_path:
+            self._open_dictionary(file_path)
+
+    def _open_dictionary(self, file_path: str):
+        if self._dictionary_loader is not None:
+            return
+        self.statusBar().showMessage(f"正在打开离线词典: {os.path.basename(file_path)}（首次打开需要建立索引）...")
+        self._dictionary_loader = DictionaryLoader(file_path, parent=self)
+        self._dictionary_loader.progress.connect(self._on_dictionary_progress)
+        self._dictionary_loader.loaded.connect(self._on_dictionary_loaded)
+        self._dictionary_loader.failed.connect(self._on_dictionary_failed)
+        self._dictionary_loader.finished.connect(self._on_dictionary_loader_finished)
+        self._dictionary_loader.start()
+
+    @Slot(int)
+    def _on_dictionary_progress(self, count: int):
+        self.statusBar().showMessage(f"正在建立离线词典索引: 已扫描 {count} 个词条...")
+
+    @Slot(object)
+    def _on_dictionary_loaded(self, dictionary):
+        if self._dictionary is not None:
+            self._dictionary.close()
+        self._dictionary = dictionary
+        self.add_tab.set_dictionary(dictionary)
+        self.settings_manager.save_dictionary_path(dictionary.dictionary_path)
+        self.statusBar().showMessage(f"离线词典已加载: {len(dictionary)} 个词条", 5000)
+
+    @Slot(str)
+    def _on_dictionary_failed(self, message: str):
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "离线词典", f"无法打开离线词典:\n{message}")
+
+    @Slot()
+    def _on_dictionary_loader_finished(self):
+        self._dictionary_loader.deleteLater()
+        self._dictionary_loader = None
+
+    def choose_sync_dir(self):
+        directory = QFileDialog.getExistingDirectory(self, "选择同步目录", self.settings_manager.load_sync_dir() or "")
+        if directory:
+            self.settings_manager.save_sync_dir(directory)
+            self._update_sync_actions()
+            self._start_sync()  # 立即同步一次当前词表
+
+    def stop_sync(self):
+        self.settings_manager.save_sync_dir(None)
+        self._update_sync_actions()
+
+    def _update_sync_actions(self):
+        self.stop_sync_action.setEnabled(bool(self.settings_manager.load_sync_dir()))
+
+    def _start_sync(self):
+        """保存后在后台同步当前词表；正在同步时记下，结束后再同步一次"""
+        sync_dir = self.settings_manager.load_sync_dir()
+        list_path = self.data_manager.filepath
+        if not sync_dir or not list_path or not os.path.exists(list_path):
+            return
+        if self._sync_worker is not None:
+            self._sync_pending = True
+            return
+        self._sync_worker = SyncWorker(list_path, sync_dir, parent=self)
+        self._sync_worker.synced.connect(self._on_sync_succeeded)
+        self._sync_worker.failed.connect(self._on_sync_failed)
+        self._sync_worker.finished.connect(self._on_sync_finished)
+        self._sync_worker.start()
+
+    @Slot(object)
+    def _on_sync_succeeded(self, results):
+        copied = sum(result.copied_bytes for _, result in results)
+        total = sum(result.total_bytes for _, result in results)
+        self.statusBar().showMessage(f"已同步到 {self._sync_worker.sync_dir}: 复制 {copied / 1024:.1f} KiB"
+                                     f"（共 {total / 1024:.1f} KiB）", 5000)
+
+    @Slot(str)
+    def _on_sync_failed(self, message: str):
+        self.statusBar().showMessage(f"同步失败: {message}", 8000)
+
+    @Slot()
+    def _on_sync_finished(self):
+        self._sync_worker.deleteLater()
+        self._sync_worker = None
+        if self._sync_pending:
+            self._sync_pending = False
+            self._start_sync()
+
+    @Slot(str, str)
+    def _handle_add_word(self, word: str, definition: str):
+        if self.data_manager.add_word(word, definition):
+            self._refresh_word_model()
+            self._update_word_count_display()
+            self.add_tab.clear_inputs()
+            self._update_status_bar()
+            self._show_next_review() # 之前没有可复习的单词时，新单词会立即出现
+            self._report_library_duplicates(word)
+        else:
+            QMessageBox.warning(self, "添加失败", "无法添加单词（可能是单词为空）。")
+
+    @Slot()
+    def _show_next_review(self):
+        entry = self.data_manager.get_next_review_word()
+        if entry:
+            self.add_tab.display_review_word(*entry)
+            if not self.add_tab.review_timer.isActive():
+                self.add_tab.start_review_timer()
+        else:
+            self.add_tab.stop_review_timer()
+            self.add_tab.display_review_word(None, None)
+
+    @Slot(str, int)
+    def _handle_review_graded(self, word: str, quality: int):
+        success, message = self.data_manager.record_review(word, quality)
+        if success:
+            self.statusBar().showMessage(message, 3000)
+        else:
+            QMessageBox.warning(self, "复习记录", message)
+        self._show_next_review()
+
+    def _update_status_bar(self):
+        filename = self.data_manager.get_current_filename()
+        dirty_indicator = "*" if self.data_manager.is_dirty else ""
+        if filename == "未命名" and not self.data_manager.is_dirty and self.data_manager.get_word_count() == 0:
+            self.info_bar_label.setText("当前无列表打开")
+            self.setWindowTitle("单词记录本")
+        else:
+            self.info_bar_label.setText(f"当前词表：{filename}{dirty_indicator}")
+            self.setWindowTitle(f"{filename}{dirty_indicator} - 单词记录本")
+
+    def _update_word_count_display(self):
+        count = self.data_manager.get_word_count()
+        self.add_tab.update_word_count(count)
+
+    def _update_all_displays(self):
+        self._update_status_bar()
+        self._update_word_count_display()
+        if self.preview_tab is not None and self.preview_tab.table_view.model(): # Check if model exists before calling layoutChanged
+             self.preview_tab.table_view.model().layoutChanged.emit()
+
+
+    # --- Theme and Font Management ---
+    @traced("MainWindow._apply_theme")
+    def _apply_theme(self, theme_name: str):
+        # 主题 QSS 已缓存在内存中；只有主题真正变化时才设置应用样式表（会重新 polish 所有控件）
+        stylesheet = self.settings_manager.load_stylesheet(theme_name)
+        app = QApplication.instance()
+        if app.styleSheet() != stylesheet:
+            app.setStyleSheet(stylesheet)
+        # Update menu check state
+        self.light_theme_action.setChecked(theme_name == "light")
+        self.dark_theme_action.setChecked(theme_name == "dark")
+        self.toggle_theme_action.setChecked(theme_name == "dark")
+
+    def _set_theme(self, theme_name: str):
+        self.settings_manager.save_theme(theme_name) # 通过 theme_changed 信号应用
+
+    def toggle_theme(self):
+        current_theme = self.settings_manager.load_theme()
+        new_theme = "dark" if current_theme == "light" else "light"
+        self.settings_manager.save_theme(new_theme)
+
+    @traced("MainWindow._apply_font_size")
+    def _apply_font_size(self, size_str: str):
+        # 字号以 QSS 规则的形式设置在主窗口上：只重新 polish 主窗口及其子控件（包括以它为父对象的对话框），
+        # 不必清除再重新应用整个应用样式表，也不设置应用字体（那会向程序中的每个控件发送字体变化事件）
+        font_stylesheet = self.settings_manager.get_font_stylesheet(size_str)
+        if self.styleSheet() != font_stylesheet:
+            self.setStyleSheet(font_stylesheet)
+
+        # Update menu check state
+        self.small_font_action.setChecked(size_str == "small")
+        self.medium_font_action.setChecked(size_str == "medium")
+        self.large_font_action.setChecked(size_str == "large")
+
+    def update_font_size(self, size_str: str):
+        self.settings_manager.save_font_size(size_str) # 通过 font_size_changed 信号应用
+
+    def closeEvent(self, event: QCloseEvent):
+        if self._prompt_save_if_dirty():
+            self.add_tab.stop_review_timer()
+            self.add_tab.stop_similar_words_search()
+            if self._export_worker is not None: # 退出前停止后台导出，避免线程在窗口销毁后继续运行
+                self._export_worker.cancel()
+                self._export_worker.wait()
+            if self._merge_worker is not None:
+                self._merge_worker.cancel()
+                self._merge_worker.wait()
+            if self._library_loader is not None:
+                self._library_refresh_pending = None
+                self._library_loader.wait()
+            for list_loader in self.findChildren(ListLoader):  # 包括已被放弃但仍在读取的
+                list_loader.wait()
+            if self._dictionary_loader is not None:
+                self._dictionary_loader.wait()
+            if self._sync_worker is not None:  # 不中断同步：清单总是在块写完之后才替换
+                self._sync_pending = False
+                self._sync_worker.wait()
+            if self._dictionary is not None:
+                self._dictionary.close()
+            self.settings_manager.flush()
+            event.accept()
+        else:
+            event.ignore()
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -1,63 +1,96 @@
-﻿# word_recorder/models/word_list_model.py
-from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
-from PySide6.QtGui import QColor
-import pandas as pd
-from typing import Any, Optional
-
-
-class WordListModel(QAbstractTableModel):
-    def __init__(self, data: Optional[pd.DataFrame] = None, parent=None):
-        super().__init__(parent)
-        self._data = data if data is not None else pd.DataFrame(columns=["单词", "释义"])
-        self._display_column_name = "词条"  # 单列显示的表头
-
-    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        if parent.isValid() or self._data is None:
-            return 0
-        return len(self._data)
-
-    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        if parent.isValid() or self._data is None:
-            return 0
-        return 1  # 我们只显示一列："单词：释义"
-
-    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
-        if not index.isValid() or self._data is None:
-            return None
-
-        row = index.row()
-        # col = index.column() # col is always 0
-
-        if role == Qt.ItemDataRole.DisplayRole:
-            try:
-                word = str(self._data.iloc[row, 0])  # "单词"列
-                definition = str(self._data.iloc[row, 1])  # "释义"列
-                return f"{word}：{definition}"
-            except IndexError:
-                return None  # 数据可能不完整
-
-        # Pandas-like alternating row colors (optional, can also be done via QSS on QTableView)
-        # if role == Qt.ItemDataRole.BackgroundRole:
-        #     return QColor(Qt.GlobalColor.lightGray) if row % 2 == 0 else QColor(Qt.GlobalColor.white)
-
-        return None
-
-    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
-        if role == Qt.ItemDataRole.DisplayRole:
-            if orientation == Qt.Orientation.Horizontal:
-                if section == 0:
-                    return self._display_column_name
-            # Можно добавить и вертикальные заголовки (номера строк), если нужно
-            # if orientation == Qt.Orientation.Vertical:
-            #     return str(section + 1)
-        return None
-
-    def set_data(self, data: Optional[pd.DataFrame]):
-        """更新模型数据并刷新视图"""
-        self.beginResetModel()
-        self._data = data if data is not None else pd.DataFrame(columns=["单词", "释义"])
-        self.endResetModel()
-
-    def get_underlying_data(self) -> Optional[pd.DataFrame]:
-        """获取内部的DataFrame对象"""
-        return self._data
+# word_recorder/models/word_list_model.py
+from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex
+from PySide6.QtGui import QColor
+from typing import TYPE_CHECKING, Any, Optional
+from common.instrument import traced
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+class WordListModel(QAbstractTableModel):
+    def __init__(self, data: Optional["pd.DataFrame"] = None, parent=None):
+        super().__init__(parent)
+        self._data = data  # None 表示没有数据（不需要为空表导入 pandas）
+        self._display_column_name = "词条"  # 单列显示的表头
+        self._filter_text = ""
+        self._rows: Optional["np.ndarray"] = None  # 过滤后可见的行号，None 表示显示全部
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid() or self._data is None:
+            return 0
+        return len(self._data) if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid() or self._data is None:
+            return 0
+        # 我们只显示一列："单词：释义"；词库的表格多一列 "词表"，单独显示来源
+        return 2 if self._data.shape[1] > 2 else 1
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or self._data is None:
+            return None
+
+        row = index.row() if self._rows is None else int(self._rows[index.row()])
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            try:
+                # iat 取单个值比 iloc 快得多，滚动时每个可见的单元格都要取一次
+                if index.column() == 1:
+                    return str(self._data.iat[row, 2])  # "词表"列
+                word = str(self._data.iat[row, 0])  # "单词"列
+                definition = str(self._data.iat[row, 1])  # "释义"列
+                return f"{word}：{definition}"
+            except IndexError:
+                return None  # 数据可能不完整
+
+        # Pandas-like alternating row colors (optional, can also be done via QSS on QTableView)
+        # if role == Qt.ItemDataRole.BackgroundRole:
+        #     return QColor(Qt.GlobalColor.lightGray) if row % 2 == 0 else QColor(Qt.GlobalColor.white)
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole:
+            if orientation == Qt.Orientation.Horizontal:
+                if section == 0:
+                    return self._display_column_name
+                if section == 1 and self._data is not None and self._data.shape[1] > 2:
+                    return str(self._data.columns[2])
+            # Можно добавить и вертикальные заголовки (номера строк), если нужно
+            # if orientation == Qt.Orientation.Vertical:
+            #     return str(section + 1)
+        return None
+
+    @traced("WordListModel.set_data")
+    def set_data(self, data: Optional["pd.DataFrame"]):
+        """更新模型数据并刷新视图（保留当前的过滤条件）"""
+        self.beginResetModel()
+        self._data = data
+        self._rows = self._matching_rows(self._filter_text)
+        self.endResetModel()
+
+    @traced("WordListModel.set_filter")
+    def set_filter(self, text: str):
+        """只显示单词或释义中包含 text（不区分大小写）的行；空字符串显示全部"""
+        text = text.strip()
+        if text == self._filter_text:
+            return
+        self.beginResetModel()
+        self._filter_text = text
+        self._rows = self._matching_rows(text)
+        self.endResetModel()
+
+    def _matching_rows(self, text: str) -> Optional["np.ndarray"]:
+        if not text or self._data is None:
+            return None
+        import numpy as np
+        mask = np.zeros(len(self._data), dtype=bool)
+        for column in range(min(self._data.shape[1], 2)): # 对整列做向量化的子串匹配
+            mask |= self._data.iloc[:, column].astype(str).str.contains(text, case=False, regex=False).to_numpy()
+        return np.flatnonzero(mask)
+
+    def get_underlying_data(self) -> Optional["pd.DataFrame"]:
+        """获取内部的DataFrame对象"""
+        return self._data
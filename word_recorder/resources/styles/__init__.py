@@ -1 +1 @@
-﻿
+
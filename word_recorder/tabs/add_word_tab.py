@@ -1,141 +1,276 @@
-﻿# word_recorder/tabs/add_word_tab.py
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                               QLineEdit, QPushButton, QFrame, QLCDNumber, QTextEdit)
-from PySide6.QtCore import Qt, Signal, QTimer
-from PySide6.QtGui import QFont
-from typing import Optional # <--- 添加这一行
-
-
-class AddWordTab(QWidget):
-    # 信号：当用户点击“添加到词表”按钮时发出，参数为 (单词, 释义)
-    add_word_requested = Signal(str, str)
-    # 信号：当需要随机单词时发出 (由内部定时器触发)
-    random_word_requested = Signal()
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self._init_ui()
-
-        self.random_word_timer = QTimer(self)
-        self.random_word_timer.timeout.connect(self.request_random_word_display)
-        # 每分钟 (60000 ms) 刷新一次
-        # self.random_word_timer.start(60000) # 由MainWindow控制何时启动
-
-    def _init_ui(self):
-        main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(15, 15, 15, 15)  # 增加一些边距
-        main_layout.setSpacing(10)  # 增加控件间距
-
-        # --- 上半部分：单词数和随机单词 ---
-        top_section_layout = QVBoxLayout()
-
-        # 水平布局1: 单词数目表盘 和 随机单词显示区
-        h_layout1 = QHBoxLayout()
-
-        # 单词数目
-        self.word_count_lcd = QLCDNumber(self)
-        self.word_count_lcd.setSegmentStyle(QLCDNumber.SegmentStyle.Flat)  # 扁平风格
-        self.word_count_lcd.setDigitCount(5)  # 最多显示5位数
-        self.word_count_lcd.setToolTip("当前词表中的单词总数")
-
-        # 为了让LCD不占据太多空间，可以把它放在一个小布局里
-        lcd_container = QVBoxLayout()
-        lcd_label = QLabel("当前单词数:")
-        lcd_container.addWidget(lcd_label)
-        lcd_container.addWidget(self.word_count_lcd)
-        lcd_container.addStretch()  # 将LCD推到顶部
-
-        h_layout1.addLayout(lcd_container, 1)  # 比例为1
-
-        # 随机单词显示区
-        random_word_group = QFrame(self)
-        random_word_group.setFrameShape(QFrame.Shape.StyledPanel)
-        random_word_layout = QVBoxLayout(random_word_group)
-
-        random_word_title_label = QLabel("随机词条：")
-        font_title = QFont()
-        font_title.setBold(True)
-        random_word_title_label.setFont(font_title)
-
-        self.random_word_label = QLabel("单词： N/A")
-        self.random_definition_label = QTextEdit("释义： N/A")  # 使用QTextEdit以便换行和滚动
-        self.random_definition_label.setReadOnly(True)
-        self.random_definition_label.setFixedHeight(80)  # 限制释义区高度
-
-        random_word_layout.addWidget(random_word_title_label)
-        random_word_layout.addWidget(self.random_word_label)
-        random_word_layout.addWidget(self.random_definition_label)
-
-        h_layout1.addWidget(random_word_group, 2)  # 比例为2，占据更多空间
-
-        top_section_layout.addLayout(h_layout1)
-        main_layout.addLayout(top_section_layout)
-
-        # --- 分隔线 ---
-        separator = QFrame(self)
-        separator.setFrameShape(QFrame.Shape.HLine)
-        separator.setFrameShadow(QFrame.Shadow.Sunken)
-        main_layout.addWidget(separator)
-
-        # --- 下半部分：输入和提交 ---
-        bottom_section_layout = QVBoxLayout()
-        bottom_section_layout.setSpacing(10)
-
-        input_layout = QHBoxLayout()
-        self.word_input = QLineEdit(self)
-        self.word_input.setPlaceholderText("输入单词...")
-        self.word_input.setClearButtonEnabled(True)
-        input_layout.addWidget(self.word_input, 1)  # 参数1代表拉伸因子
-
-        self.definition_input = QLineEdit(self)  # 或者 QTextEdit 如果释义很长
-        self.definition_input.setPlaceholderText("输入释义...")
-        self.definition_input.setClearButtonEnabled(True)
-        input_layout.addWidget(self.definition_input, 2)  # 参数2代表拉伸因子
-
-        bottom_section_layout.addLayout(input_layout)
-
-        self.submit_button = QPushButton("添加到词表", self)
-        self.submit_button.clicked.connect(self._on_submit)
-        # 可以给按钮加个icon
-        # from PySide6.QtGui import QIcon
-        # self.submit_button.setIcon(QIcon.fromTheme("list-add"))
-
-        bottom_section_layout.addWidget(self.submit_button, 0, Qt.AlignmentFlag.AlignRight)  # 按钮靠右
-
-        main_layout.addLayout(bottom_section_layout)
-        main_layout.addStretch()  # 添加伸缩，使得内容更紧凑
-
-    def _on_submit(self):
-        word = self.word_input.text().strip()
-        definition = self.definition_input.text().strip()
-        if word:  # 确保单词不为空
-            self.add_word_requested.emit(word, definition)
-        else:
-            # 可以弹出一个小提示，或者让主窗口处理
-            print("单词不能为空")  # 简单打印，实际应用中应有更友好的提示
-
-    def update_word_count(self, count: int):
-        self.word_count_lcd.display(count)
-
-    def display_random_word(self, word: Optional[str], definition: Optional[str]):
-        if word is not None and definition is not None:  # 更安全的检查
-            self.random_word_label.setText(f"<b>单词：</b>{word}")
-            self.random_definition_label.setPlainText(f"{definition}")  # QTextEdit用setPlainText
-        else:
-            self.random_word_label.setText("<b>单词：</b> N/A")
-            self.random_definition_label.setPlainText("释义： 词表为空或无法获取。")
-
-    def clear_inputs(self):
-        self.word_input.clear()
-        self.definition_input.clear()
-        self.word_input.setFocus()  # 将焦点设置回单词输入框
-
-    def request_random_word_display(self):
-        """由定时器调用，发出请求信号"""
-        self.random_word_requested.emit()
-
-    def start_random_word_timer(self):
-        self.random_word_timer.start(60000)  # 1 minute
-
-    def stop_random_word_timer(self):
-        self.random_word_timer.stop()
+# word_recorder/tabs/add_word_tab.py
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                               QLineEdit, QPushButton, QFrame, QLCDNumber, QTextEdit)
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtGui import QFont
+from typing import Optional # <--- 添加这一行
+import time
+
+from core.fuzzy_match_worker import FuzzyMatchWorker
+from core.review_scheduler import QUALITY_FORGOT, QUALITY_HARD, QUALITY_GOOD
+
+SIMILAR_WORDS_DEBOUNCE_MS = 150 # 停止输入这么久之后才查找相似单词
+SIMILAR_WORDS_LIMIT = 5
+REVIEW_REFRESH_MS = 60000 # 每分钟刷新一次复习单词（让到期的单词及时出现）
+
+
+class AddWordTab(QWidget):
+    # 信号：当用户点击“添加到词表”按钮时发出，参数为 (单词, 释义)
+    add_word_requested = Signal(str, str)
+    # 信号：当需要刷新复习单词时发出 (由内部定时器触发)
+    next_review_requested = Signal()
+    # 信号：用户为当前复习单词评分，参数为 (单词, SM-2 评分 0~5)
+    review_graded = Signal(str, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._dictionary = None       # OfflineDictionary，未加载时为 None
+        self._auto_definition = None  # 最近一次从词典自动填入的释义
+        self._fuzzy_index = None      # 当前词表的 TrigramIndex
+        self._fuzzy_worker = None     # 正在运行的相似单词查询
+        self._fuzzy_query_pending = False
+        self._review_word = None      # 当前显示的复习单词
+        self._init_ui()
+
+        self.similar_words_timer = QTimer(self)
+        self.similar_words_timer.setSingleShot(True)
+        self.similar_words_timer.setInterval(SIMILAR_WORDS_DEBOUNCE_MS)
+        self.similar_words_timer.timeout.connect(self._find_similar_words)
+        self.word_input.textChanged.connect(self.similar_words_timer.start)
+
+        self.review_timer = QTimer(self)
+        self.review_timer.timeout.connect(self.request_next_review)
+        # 由MainWindow控制何时启动
+
+    def _init_ui(self):
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(15, 15, 15, 15)  # 增加一些边距
+        main_layout.setSpacing(10)  # 增加控件间距
+
+        # --- 上半部分：单词数和随机单词 ---
+        top_section_layout = QVBoxLayout()
+
+        # 水平布局1: 单词数目表盘 和 随机单词显示区
+        h_layout1 = QHBoxLayout()
+
+        # 单词数目
+        self.word_count_lcd = QLCDNumber(self)
+        self.word_count_lcd.setSegmentStyle(QLCDNumber.SegmentStyle.Flat)  # 扁平风格
+        self.word_count_lcd.setDigitCount(5)  # 最多显示5位数
+        self.word_count_lcd.setToolTip("当前词表中的单词总数")
+
+        # 为了让LCD不占据太多空间，可以把它放在一个小布局里
+        lcd_container = QVBoxLayout()
+        lcd_label = QLabel("当前单词数:")
+        lcd_container.addWidget(lcd_label)
+        lcd_container.addWidget(self.word_count_lcd)
+        lcd_container.addStretch()  # 将LCD推到顶部
+
+        h_layout1.addLayout(lcd_container, 1)  # 比例为1
+
+        # 复习单词显示区
+        random_word_group = QFrame(self)
+        random_word_group.setFrameShape(QFrame.Shape.StyledPanel)
+        random_word_layout = QVBoxLayout(random_word_group)
+
+        random_word_title_label = QLabel("复习：")
+        font_title = QFont()
+        font_title.setBold(True)
+        random_word_title_label.setFont(font_title)
+
+        self.random_word_label = QLabel("单词： N/A")
+        self.random_definition_label = QTextEdit("释义： N/A")  # 使用QTextEdit以便换行和滚动
+        self.random_definition_label.setReadOnly(True)
+        self.random_definition_label.setFixedHeight(80)  # 限制释义区高度
+
+        random_word_layout.addWidget(random_word_title_label)
+        random_word_layout.addWidget(self.random_word_label)
+        random_word_layout.addWidget(self.random_definition_label)
+
+        self.review_status_label = QLabel("", self)
+        self.review_status_label.setObjectName("reviewStatusLabel")
+        random_word_layout.addWidget(self.review_status_label)
+
+        review_buttons_layout = QHBoxLayout()
+        review_buttons_layout.addStretch()
+        self.review_buttons = []
+        for text, quality in (("忘记了", QUALITY_FORGOT), ("模糊", QUALITY_HARD), ("记住了", QUALITY_GOOD)):
+            button = QPushButton(text, self)
+            button.setEnabled(False)  # 显示复习单词后才可以评分
+            button.clicked.connect(lambda _checked=False, quality=quality: self._on_review_graded(quality))
+            review_buttons_layout.addWidget(button)
+            self.review_buttons.append(button)
+        random_word_layout.addLayout(review_buttons_layout)
+
+        h_layout1.addWidget(random_word_group, 2)  # 比例为2，占据更多空间
+
+        top_section_layout.addLayout(h_layout1)
+        main_layout.addLayout(top_section_layout)
+
+        # --- 分隔线 ---
+        separator = QFrame(self)
+        separator.setFrameShape(QFrame.Shape.HLine)
+        separator.setFrameShadow(QFrame.Shadow.Sunken)
+        main_layout.addWidget(separator)
+
+        # --- 下半部分：输入和提交 ---
+        bottom_section_layout = QVBoxLayout()
+        bottom_section_layout.setSpacing(10)
+
+        input_layout = QHBoxLayout()
+        self.word_input = QLineEdit(self)
+        self.word_input.setPlaceholderText("输入单词...")
+        self.word_input.setClearButtonEnabled(True)
+        input_layout.addWidget(self.word_input, 1)  # 参数1代表拉伸因子
+
+        self.definition_input = QLineEdit(self)  # 或者 QTextEdit 如果释义很长
+        self.definition_input.setPlaceholderText("输入释义...")
+        self.definition_input.setClearButtonEnabled(True)
+        input_layout.addWidget(self.definition_input, 2)  # 参数2代表拉伸因子
+
+        bottom_section_layout.addLayout(input_layout)
+
+        self.similar_words_label = QLabel("", self) # 词表中与输入相似的单词（可能重复或拼错）
+        self.similar_words_label.setObjectName("similarWordsLabel")
+        self.similar_words_label.setWordWrap(True)
+        bottom_section_layout.addWidget(self.similar_words_label)
+
+        self.dictionary_hint_label = QLabel("", self)
+        self.dictionary_hint_label.setObjectName("dictionaryHintLabel")
+        bottom_section_layout.addWidget(self.dictionary_hint_label)
+
+        # 输入单词时从离线词典查找释义；查询是一次二分查找，不需要防抖
+        self.word_input.textChanged.connect(self._suggest_definition)
+        self.definition_input.textEdited.connect(self._on_definition_edited)
+
+        self.submit_button = QPushButton("添加到词表", self)
+        self.submit_button.clicked.connect(self._on_submit)
+        # 可以给按钮加个icon
+        # from PySide6.QtGui import QIcon
+        # self.submit_button.setIcon(QIcon.fromTheme("list-add"))
+
+        bottom_section_layout.addWidget(self.submit_button, 0, Qt.AlignmentFlag.AlignRight)  # 按钮靠右
+
+        main_layout.addLayout(bottom_section_layout)
+        main_layout.addStretch()  # 添加伸缩，使得内容更紧凑
+
+    def _on_submit(self):
+        word = self.word_input.text().strip()
+        definition = self.definition_input.text().strip()
+        if word:  # 确保单词不为空
+            self.add_word_requested.emit(word, definition)
+        else:
+            # 可以弹出一个小提示，或者让主窗口处理
+            print("单词不能为空")  # 简单打印，实际应用中应有更友好的提示
+
+    def set_dictionary(self, dictionary):
+        """设置用于自动填写释义的离线词典（None 表示不使用）"""
+        self._dictionary = dictionary
+        self._suggest_definition(self.word_input.text())
+
+    def _suggest_definition(self, text: str):
+        if self._dictionary is None:
+            return
+        current = self.definition_input.text()
+        if current and current != self._auto_definition:
+            return # 不覆盖用户手动输入的释义
+        definition = self._dictionary.lookup(text)
+        if definition:
+            self._auto_definition = definition
+            self.definition_input.setText(definition)
+            self.definition_input.setCursorPosition(0)
+            self.dictionary_hint_label.setText("释义来自离线词典，可直接修改。")
+        else:
+            if current:
+                self.definition_input.clear()
+            self._auto_definition = None
+            self.dictionary_hint_label.clear()
+
+    def _on_definition_edited(self, _text: str):
+        self._auto_definition = None # 用户改过释义后不再自动替换
+        self.dictionary_hint_label.clear()
+
+    def set_fuzzy_index(self, index):
+        """设置用于查找相似单词的 TrigramIndex（None 表示不查找）"""
+        self._fuzzy_index = index
+        self.similar_words_label.clear()
+
+    def _find_similar_words(self):
+        text = self.word_input.text().strip()
+        if self._fuzzy_index is None or not text:
+            self.similar_words_label.clear()
+            return
+        if self._fuzzy_worker is not None: # 同一时间只运行一个查询，结束后再查最新的输入
+            self._fuzzy_query_pending = True
+            return
+        self._fuzzy_worker = FuzzyMatchWorker(self._fuzzy_index, text, SIMILAR_WORDS_LIMIT, parent=self)
+        self._fuzzy_worker.matched.connect(self._show_similar_words)
+        self._fuzzy_worker.finished.connect(self._on_fuzzy_worker_finished)
+        self._fuzzy_worker.start()
+
+    def _on_fuzzy_worker_finished(self):
+        self._fuzzy_worker.deleteLater()
+        self._fuzzy_worker = None
+        if self._fuzzy_query_pending:
+            self._fuzzy_query_pending = False
+            self._find_similar_words()
+
+    def _show_similar_words(self, text: str, matches: list):
+        if text != self.word_input.text().strip():
+            return # 输入已经变了，等待新的查询结果
+        if not matches:
+            self.similar_words_label.clear()
+        elif matches[0][1] >= 1.0:
+            self.similar_words_label.setText(f"“{matches[0][0]}”已在词表中。")
+        else:
+            similar = "、".join(f"{word} ({similarity:.0%})" for word, similarity in matches)
+            self.similar_words_label.setText(f"词表中的相似单词：{similar}")
+
+    def stop_similar_words_search(self):
+        """退出前调用：停止防抖定时器并等待正在运行的查询结束"""
+        self.similar_words_timer.stop()
+        self._fuzzy_query_pending = False
+        if self._fuzzy_worker is not None:
+            self._fuzzy_worker.wait()
+
+    def update_word_count(self, count: int):
+        self.word_count_lcd.display(count)
+
+    def display_review_word(self, word: Optional[str], definition: Optional[str], due: Optional[float] = None):
+        """显示要复习的单词；due 为到期时间（None 表示从未复习过的新单词）"""
+        if word is not None and definition is not None:  # 更安全的检查
+            self._review_word = word
+            self.random_word_label.setText(f"<b>单词：</b>{word}")
+            self.random_definition_label.setPlainText(f"{definition}")  # QTextEdit用setPlainText
+            if due is None:
+                self.review_status_label.setText("新单词")
+            elif due <= time.time():
+                self.review_status_label.setText("到期复习")
+            else:
+                self.review_status_label.setText(f"暂无到期单词，提前复习（原定 {time.strftime('%m-%d %H:%M', time.localtime(due))}）")
+        else:
+            self._review_word = None
+            self.random_word_label.setText("<b>单词：</b> N/A")
+            self.random_definition_label.setPlainText("释义： 词表为空或无法获取。")
+            self.review_status_label.clear()
+        for button in self.review_buttons:
+            button.setEnabled(self._review_word is not None)
+
+    def _on_review_graded(self, quality: int):
+        if self._review_word is not None:
+            self.review_graded.emit(self._review_word, quality)
+
+    def clear_inputs(self):
+        self.word_input.clear()
+        self.definition_input.clear()
+        self.word_input.setFocus()  # 将焦点设置回单词输入框
+
+    def request_next_review(self):
+        """由定时器调用，发出请求信号"""
+        self.next_review_requested.emit()
+
+    def start_review_timer(self):
+        self.review_timer.start(REVIEW_REFRESH_MS)
+
+    def stop_review_timer(self):
+        self.review_timer.stop()
@@ -0,0 +1,74 @@
+# word_recorder/tabs/clean_dialog.py
+from typing import TYPE_CHECKING, Optional
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QApplication, QComboBox, QDialog, QDialogButtonBox, QFormLayout, QLabel,
+                               QMessageBox, QVBoxLayout, QWidget)
+
+from core.word_clean import CleanResult, clean_words
+from core.word_merge import DEFAULT_POLICY, MERGE_POLICIES
+from models.word_list_model import WordListModel
+from tabs.preview_tab import PreviewTab
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class CleanPreviewDialog(QDialog):
+    """预览整理词表的结果：列出每个被改写、合并或删除的行，确认后由调用方一次应用 result"""
+
+    def __init__(self, frame: "pd.DataFrame", parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.frame = frame
+        self.result: Optional[CleanResult] = None
+        self.setWindowTitle("整理词表")
+        self.resize(720, 520)
+
+        layout = QVBoxLayout(self)
+        form = QFormLayout()
+        self.policy_combo = QComboBox(self)
+        for name, label in MERGE_POLICIES.items():
+            self.policy_combo.addItem(label, name)
+        self.policy_combo.setCurrentIndex(list(MERGE_POLICIES).index(DEFAULT_POLICY))
+        self.policy_combo.currentIndexChanged.connect(self._update_preview)
+        form.addRow("同一单词有多个释义时：", self.policy_combo)
+        layout.addLayout(form)
+
+        self.summary_label = QLabel(self)
+        layout.addWidget(self.summary_label)
+
+        self.changes_model = WordListModel(parent=self)
+        self.preview = PreviewTab(self) # 复用词表预览的搜索框和表格，改动很多时可以按单词查找
+        self.preview.layout().setContentsMargins(0, 0, 0, 0)
+        self.preview.set_model(self.changes_model)
+        layout.addWidget(self.preview)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+                                        self)
+        self.buttons.button(QDialogButtonBox.StandardButton.Ok).setText("应用")
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+        self._update_preview()
+
+    def _update_preview(self):
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            self.result = clean_words(self.frame, self.policy_combo.currentData())
+        except Exception as e:
+            self.result = None
+            QMessageBox.critical(self, "整理失败", str(e))
+        finally:
+            QApplication.restoreOverrideCursor()
+        if self.result is None:
+            self.summary_label.setText("整理失败。")
+            self.changes_model.set_data(None)
+        elif self.result.is_empty:
+            self.summary_label.setText("词表中没有需要整理的内容。")
+            self.changes_model.set_data(None)
+        else:
+            self.summary_label.setText(self.result.summary())
+            self.changes_model.set_data(self.result.changes)
+        self.buttons.button(QDialogButtonBox.StandardButton.Ok).setEnabled(
+            self.result is not None and not self.result.is_empty)